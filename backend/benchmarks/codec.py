@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the WebSocket audio codecs: CPU cost vs bandwidth saved.
+
+Encodes and decodes synthetic speech-like 16-bit PCM in WebSocket-sized
+chunks and reports the time per second of audio (as a share of one core),
+the wire bitrate and the SNR. Run it on the target device (e.g. a
+Raspberry Pi wall display) to see what a codec costs there.
+
+    python -m backend.benchmarks.codec [--sample-rate 24000] [--seconds 10] [--chunk-ms 40]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.tts.codec import mulaw_decode, mulaw_encode
+
+
+def speech_like(sample_rate: int, seconds: float) -> bytes:
+    """Harmonic tones under a syllable-rate envelope, with pauses; roughly speech-shaped levels."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) * (np.sin(2 * np.pi * 0.25 * t) > -0.6)
+    signal = 0.25 * voiced * envelope + 0.01 * rng.standard_normal(t.size)
+    return (np.clip(signal, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def time_per_audio_second(fn, chunks, seconds: float, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for chunk in chunks:
+            fn(chunk)
+    return (time.perf_counter() - start) / repeats / seconds
+
+
+def snr_db(reference: bytes, decoded: bytes) -> float:
+    ref = np.frombuffer(reference, dtype="<i2").astype(np.float64)
+    out = np.frombuffer(decoded, dtype="<i2").astype(np.float64)
+    noise = np.sum((ref - out) ** 2)
+    return float("inf") if noise == 0 else 10 * np.log10(np.sum(ref ** 2) / noise)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--chunk-ms", type=float, default=40.0, help="audio per WebSocket frame")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    pcm = speech_like(args.sample_rate, args.seconds)
+    chunk_bytes = int(args.sample_rate * args.chunk_ms / 1000) * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+    encoded = [mulaw_encode(c) for c in chunks]
+
+    encode_s = time_per_audio_second(mulaw_encode, chunks, args.seconds, args.repeats)
+    decode_s = time_per_audio_second(mulaw_decode, encoded, args.seconds, args.repeats)
+    pcm_kbps = args.sample_rate * 16 / 1000
+    mulaw_kbps = args.sample_rate * 8 / 1000
+
+    print(f"audio: {args.seconds:.0f}s at {args.sample_rate} Hz in {len(chunks)} frames of {args.chunk_ms:.0f} ms")
+    print(f"{'codec':8} {'kbit/s':>8} {'encode':>14} {'decode':>14} {'SNR':>8}")
+    print(f"{'pcm':8} {pcm_kbps:8.0f} {'-':>14} {'-':>14} {'inf':>8}")
+    print(f"{'mulaw':8} {mulaw_kbps:8.0f} {encode_s * 100:11.3f} %cpu {decode_s * 100:10.3f} %cpu "
+          f"{snr_db(pcm, mulaw_decode(mulaw_encode(pcm))):6.1f}dB")
+    print(f"bandwidth saved: {pcm_kbps - mulaw_kbps:.0f} kbit/s per stream "
+          f"({1 - mulaw_kbps / pcm_kbps:.0%}); per frame {encode_s * args.chunk_ms * 1000:.1f} us encode")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark of the chat backend.
+
+Starts a stub OpenAI-compatible server (streamed chat completions with a
+configurable time to first token, token rate and tool calls, and
+/v1/audio/speech streaming PCM with a configurable time to first byte and
+bitrate), then `backend.main:app` pointed at it, each in its own process.
+Scripted conversations are driven over /ws/chat by one or more concurrent
+clients. Reports time to first token, time to first audio, audio frames/s
+and the backend's CPU and RSS, and writes everything to JSON so runs can
+be compared across commits (`--compare` prints the change from an earlier
+run). CPU and RSS are read from /proc, so they are only reported on Linux.
+Turns are uploaded as conversation deltas (`conversation_id` and
+`base_version`) like the desktop client. Server output goes to a .log file
+next to the results, and tracebacks in it are counted. Exits non-zero if a
+turn times out or fails, or TTS is on and no audio arrives.
+
+    python -m backend.benchmarks.e2e [--clients 4] [--ttft-ms 300] [--tokens-per-s 60]
+                                     [--tts-ttfb-ms 150] [--tts-bytes-per-s 192000]
+                                     [--script conversations.json] [--output e2e.json] [--compare old.json]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+import websockets
+
+from backend.tts.framing import FRAME_HEADER, FRAME_VERSION, FLAG_END_OF_STREAM
+
+# Each conversation is a list of user messages sent one turn after another.
+# The stub answers "time" questions with a get_time tool call when tool calls are on.
+DEFAULT_SCRIPT = [
+    ["Hi there, how are you today?", "Tell me something interesting about Orlando.", "Thanks, that's all."],
+    ["What time is it?", "And what should I cook for dinner tonight?"],
+    ["Give me a quick tip for sleeping better.", "What time is it right now?", "Okay, goodnight."],
+]
+
+WORDS = ("the quick answer is that it depends on a few things like the weather the time of day "
+         "and how you feel about it so let us keep it short and simple for now").split()
+
+STUB_SAMPLE_RATE = 24000  # matches the OpenAI "pcm" response format
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# ------------------------------------------------------------------------------
+# Stub provider
+# ------------------------------------------------------------------------------
+def stub_app(args: argparse.Namespace):
+    """OpenAI-compatible chat completions and speech endpoints with scripted timing."""
+    from fastapi import FastAPI, Request, Response
+    from fastapi.responses import StreamingResponse
+
+    app = FastAPI()
+    t = np.arange(STUB_SAMPLE_RATE) / STUB_SAMPLE_RATE
+    # One second of a voiced-sounding tone; silence would be trimmed by the phrase shaper.
+    tone = (0.2 * (np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 360 * t)) * 32767).astype("<i2").tobytes()
+    looped = tone * 2  # any chunk up to a second long is a slice of this
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra) -> bytes:
+        body = {
+            "id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": "stub", "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        body.update(extra)
+        return f"data: {json.dumps(body)}\n\n".encode()
+
+    async def stream_reply(body: Dict[str, Any]):
+        await asyncio.sleep(args.ttft_ms / 1000)
+        messages = body.get("messages") or []
+        last = messages[-1] if messages else {}
+        wants_tool = (args.tool_calls and body.get("tools") and last.get("role") == "user"
+                      and "time" in str(last.get("content", "")).lower())
+        if wants_tool:
+            yield chunk({"role": "assistant", "tool_calls": [{
+                "index": 0, "id": "call_stub", "type": "function",
+                "function": {"name": "get_time", "arguments": ""},
+            }]})
+            for part in ('{"lat": 28.5', '383, "lon": -81', '.3792}'):
+                await asyncio.sleep(1 / args.tokens_per_s)
+                yield chunk({"tool_calls": [{"index": 0, "function": {"arguments": part}}]})
+            yield chunk({}, "tool_calls")
+        else:
+            yield chunk({"role": "assistant", "content": ""})
+            for i in range(args.reply_tokens):
+                word = WORDS[i % len(WORDS)]
+                text = (word.capitalize() if i == 0 else " " + word) + ("." if i % 12 == 11 else "")
+                yield chunk({"content": text})
+                await asyncio.sleep(1 / args.tokens_per_s)
+            yield chunk({}, "stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            completion = 4 if wants_tool else args.reply_tokens
+            usage = {"prompt_tokens": 20 * len(messages), "completion_tokens": completion,
+                     "total_tokens": 20 * len(messages) + completion}
+            yield f"data: {json.dumps({'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': int(time.time()), 'model': 'stub', 'choices': [], 'usage': usage})}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    @app.head("/")
+    async def head():
+        return Response(status_code=200)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if body.get("stream"):
+            return StreamingResponse(stream_reply(body), media_type="text/event-stream")
+        # Background summaries are the only non-streamed requests.
+        return {
+            "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()), "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": "The user chatted about their day."}}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 8, "total_tokens": 108},
+        }
+
+    @app.post("/v1/audio/speech")
+    async def speech(request: Request):
+        body = await request.json()
+        # About 14 characters of speech per second of audio.
+        total = int(len(body.get("input", "")) / 14 * STUB_SAMPLE_RATE) * 2
+
+        async def pcm():
+            await asyncio.sleep(args.tts_ttfb_ms / 1000)
+            sent = 0
+            while sent < total:
+                size = min(args.tts_chunk_bytes, total - sent)
+                offset = sent % len(tone)
+                yield looped[offset:offset + size]
+                sent += size
+                await asyncio.sleep(size / args.tts_bytes_per_s)
+
+        return StreamingResponse(pcm(), media_type="audio/pcm")
+
+    return app
+
+
+def stub_phrase_synthesizer(base_url: str):
+    """
+    Per-phrase synthesis against the stub's /v1/audio/speech, read with
+    httpx on the backend's shared connection pool. Stands in for
+    openai_phrase_synthesizer so audio does not depend on the openai SDK
+    version having streaming responses.
+    """
+    from backend.config.client import CLIENT_MANAGER
+    from backend.config.config import CONFIG
+    from backend.tts.cache import PHRASE_CACHE
+
+    settings = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+
+    async def synthesize(phrase: str, stop_event: asyncio.Event):
+        audio_buffer = bytearray()
+        request = {"model": settings["TTS_MODEL"], "voice": settings["TTS_VOICE"], "input": phrase.strip(),
+                   "speed": settings["TTS_SPEED"], "response_format": settings["AUDIO_RESPONSE_FORMAT"]}
+        async with CLIENT_MANAGER.http_client.stream("POST", f"{base_url}/audio/speech", json=request) as response:
+            response.raise_for_status()
+            async for audio_chunk in response.aiter_bytes(settings["TTS_CHUNK_SIZE"]):
+                if stop_event.is_set():
+                    return
+                audio_buffer.extend(audio_chunk)
+                if len(audio_buffer) >= settings["BUFFER_SIZE"]:
+                    yield bytes(audio_buffer)
+                    audio_buffer.clear()
+        if audio_buffer:
+            yield bytes(audio_buffer)
+
+    if CONFIG["TTS_CACHE"]["ENABLED"]:
+        return PHRASE_CACHE.wrap(synthesize, "openai", settings["TTS_VOICE"],
+                                 {"model": settings["TTS_MODEL"], "speed": settings["TTS_SPEED"]},
+                                 settings["AUDIO_RESPONSE_FORMAT"])
+    return synthesize
+
+
+def serve_backend(args: argparse.Namespace) -> None:
+    """Run backend.main:app with every provider pointed at the stub."""
+    from backend.config.config import CONFIG
+    CONFIG["API_SERVICES"]["openai"]["BASE_URL"] = f"http://127.0.0.1:{args.stub_port}/v1"
+    CONFIG["API_SETTINGS"]["FALLBACK_HOSTS"] = []
+    CONFIG["API_SETTINGS"]["HEDGE_AFTER_MS"] = None
+    CONFIG["TTS_MODELS"]["PROVIDER"] = "openai"
+    CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"] = not args.no_tts
+    # Every phrase goes to the stub, so runs measure synthesis rather than cache hits.
+    CONFIG["TTS_CACHE"]["ENABLED"] = args.tts_cache
+    CONFIG["FILLERS"]["ENABLED"] = args.fillers
+
+    import uvicorn
+    import backend.main
+    import backend.tts.processor
+    # Both the TTS pipeline and the filler warm-up look the factory up by name.
+    build = lambda: stub_phrase_synthesizer(CONFIG["API_SERVICES"]["openai"]["BASE_URL"])
+    backend.tts.processor.build_phrase_synthesizer = build
+    backend.main.build_phrase_synthesizer = build
+    uvicorn.run(backend.main.app, host="127.0.0.1", port=args.backend_port, log_level="warning")
+
+
+# ------------------------------------------------------------------------------
+# Measurement
+# ------------------------------------------------------------------------------
+class ProcessSampler:
+    """CPU time and RSS of one process, from /proc; all None elsewhere."""
+    def __init__(self, pid: int, interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.rss_samples: List[int] = []
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    def cpu_seconds(self) -> Optional[float]:
+        try:
+            with open(f"/proc/{self.pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            return (int(fields[11]) + int(fields[12])) / self._ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_bytes(self) -> Optional[int]:
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError):
+            pass
+        return None
+
+    async def run(self) -> None:
+        while True:
+            rss = self.rss_bytes()
+            if rss is not None:
+                self.rss_samples.append(rss)
+            await asyncio.sleep(self.interval)
+
+
+class ScriptedConversation:
+    """Client-side copy of one conversation, uploaded as deltas the way the desktop client does."""
+    def __init__(self):
+        self.conversation_id = uuid.uuid4().hex
+        self.version: Optional[int] = None
+        self.history: List[Dict[str, str]] = []
+
+    def payload(self, user_message: Optional[str] = None) -> Dict[str, Any]:
+        # Only the new message once the server holds a copy; otherwise the whole history.
+        if self.version is not None and user_message is not None:
+            return {"action": "chat", "conversation_id": self.conversation_id, "base_version": self.version,
+                    "messages": [{"sender": "user", "text": user_message}]}
+        return {"action": "chat", "conversation_id": self.conversation_id, "resync": True,
+                "messages": self.history}
+
+
+async def run_turn(ws, conversation: ScriptedConversation, user_message: str, timeout: float,
+                   last_turn: int = 0) -> Dict[str, Any]:
+    """
+    Send one chat message and read until its end-of-stream audio frame, final
+    text and new version, or an error. Audio frames of turns up to `last_turn`
+    are leftovers of earlier turns and are skipped.
+    """
+    sent = time.perf_counter()
+    payload = conversation.payload(user_message)
+    conversation.history.append({"sender": "user", "text": user_message})
+    await ws.send(json.dumps(payload))
+    result: Dict[str, Any] = {"ttft": None, "ttfa": None, "frames": 0, "audio_bytes": 0, "sample_rate": 0,
+                              "text": "", "trace_id": None, "last_audio": None, "resyncs": 0, "error": None}
+    turn_id = None
+    got_final = got_eos = got_version = False
+    deadline = sent + timeout
+    # A failed turn reports its error last and may never end its audio stream.
+    while result["error"] is None and not (got_eos and got_version and (got_final or not result["text"])):
+        message = await asyncio.wait_for(ws.recv(), max(0.01, deadline - time.perf_counter()))
+        now = time.perf_counter() - sent
+        if isinstance(message, bytes):
+            _, _, flags, frame_turn, _, sample_rate, _, _, _ = FRAME_HEADER.unpack_from(message)
+            if frame_turn <= last_turn:
+                continue
+            if turn_id is None:
+                turn_id = frame_turn
+            elif frame_turn != turn_id:
+                continue
+            if flags & FLAG_END_OF_STREAM:
+                got_eos = True
+                continue
+            result["frames"] += 1
+            result["audio_bytes"] += len(message) - FRAME_HEADER.size
+            result["sample_rate"] = sample_rate
+            result["last_audio"] = now
+            if result["ttfa"] is None:
+                result["ttfa"] = now
+            continue
+        data = json.loads(message)
+        if data.get("type") == "resync":
+            # The server lost or disagrees with its copy; it ran no turn, so upload everything.
+            result["resyncs"] += 1
+            conversation.version = None
+            await ws.send(json.dumps(conversation.payload()))
+        elif data.get("type") == "conversation":
+            conversation.version = data.get("version")
+            got_version = True
+        elif data.get("type") == "error":
+            result["error"] = data.get("message")
+        elif data.get("is_chunk"):
+            if result["ttft"] is None:
+                result["ttft"] = now
+            result["text"] += data.get("content", "")
+        elif data.get("is_final"):
+            got_final = True
+            result["text"] = data.get("content", result["text"])
+            result["trace_id"] = data.get("trace_id")
+    result["total"] = time.perf_counter() - sent
+    result["turn_id"] = turn_id
+    conversation.history.append({"sender": "assistant", "text": result["text"]})
+    return result
+
+
+async def run_client(url: str, conversations: List[List[str]], timeout: float) -> List[Dict[str, Any]]:
+    results = []
+    async with websockets.connect(url, max_size=None) as ws:
+        json.loads(await ws.recv())  # session id
+        await ws.send(json.dumps({"action": "hello", "audio_protocol": FRAME_VERSION, "codecs": ["pcm"]}))
+        json.loads(await ws.recv())  # negotiated audio format
+        last_turn = 0
+        for index, script in enumerate(conversations):
+            conversation = ScriptedConversation()
+            for user_message in script:
+                try:
+                    turn = await run_turn(ws, conversation, user_message, timeout, last_turn)
+                except asyncio.TimeoutError:
+                    print(f"Turn timed out after {timeout:.0f}s; skipping the rest of this client's script")
+                    results.append({"conversation": index, "timed_out": True})
+                    return results
+                turn["conversation"] = index
+                last_turn = turn["turn_id"] or last_turn
+                results.append(turn)
+    return results
+
+
+async def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Process exited with code {process.returncode} before listening on {port}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def summarize(turns: List[Dict[str, Any]], wall: float, cpu: Optional[float],
+              rss: List[int]) -> Dict[str, Any]:
+    timed_out = sum(1 for t in turns if t.get("timed_out"))
+    turns = [t for t in turns if not t.get("timed_out")]
+    failed = sum(1 for t in turns if t["error"])
+    ttft = [t["ttft"] * 1000 for t in turns if t["ttft"] is not None]
+    ttfa = [t["ttfa"] * 1000 for t in turns if t["ttfa"] is not None]
+    frames = sum(t["frames"] for t in turns)
+    audio_seconds = sum(t["audio_bytes"] / (t["sample_rate"] * 2) for t in turns if t["sample_rate"])
+    audio_wall = sum(t["last_audio"] - t["ttfa"] for t in turns if t["ttfa"] is not None)
+    return {
+        "turns": len(turns),
+        "timed_out_turns": timed_out,
+        "failed_turns": failed,
+        "resyncs": sum(t["resyncs"] for t in turns),
+        "wall_seconds": wall,
+        "turns_per_second": len(turns) / wall if wall else None,
+        "ttft_ms": {"p50": percentile(ttft, 0.5), "p95": percentile(ttft, 0.95), "max": max(ttft, default=None)},
+        "ttfa_ms": {"p50": percentile(ttfa, 0.5), "p95": percentile(ttfa, 0.95), "max": max(ttfa, default=None)},
+        "audio_frames": frames,
+        "audio_frames_per_second": frames / audio_wall if audio_wall else None,
+        "audio_seconds": audio_seconds,
+        "backend_cpu_seconds": cpu,
+        "backend_cpu_percent": 100 * cpu / wall if cpu is not None and wall else None,
+        "backend_rss_peak_mb": max(rss) / 2 ** 20 if rss else None,
+        "backend_rss_end_mb": rss[-1] / 2 ** 20 if rss else None,
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(summary: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    rows = [("ttft_ms", "p50"), ("ttft_ms", "p95"), ("ttfa_ms", "p50"), ("ttfa_ms", "p95"),
+            ("audio_frames_per_second", None), ("backend_cpu_percent", None), ("backend_rss_peak_mb", None)]
+    old_summary = previous.get("summary", {})
+    print(f"Compared with {previous.get('commit') or 'previous run'}:")
+    for key, sub in rows:
+        new, old = summary.get(key), old_summary.get(key)
+        if sub:
+            new, old = (new or {}).get(sub), (old or {}).get(sub)
+        if new is None or old is None:
+            continue
+        change = f"{100 * (new - old) / old:+.1f}%" if old else "n/a"
+        print(f"  {key}{'.' + sub if sub else ''}: {old:.1f} -> {new:.1f} ({change})")
+
+
+async def drive(args: argparse.Namespace, conversations: List[List[str]], backend_pid: int) -> Dict[str, Any]:
+    sampler = ProcessSampler(backend_pid)
+    sampling = asyncio.create_task(sampler.run())
+    cpu_start = sampler.cpu_seconds()
+    url = f"ws://127.0.0.1:{args.backend_port}/ws/chat"
+    start = time.perf_counter()
+    per_client = await asyncio.gather(*(run_client(url, conversations, args.turn_timeout)
+                                        for _ in range(args.clients)))
+    wall = time.perf_counter() - start
+    cpu_end = sampler.cpu_seconds()
+    sampling.cancel()
+
+    async with aiohttp.ClientSession() as http:
+        async with http.get(f"http://127.0.0.1:{args.backend_port}/api/stats") as resp:
+            stats = await resp.json()
+
+    turns = [dict(turn, client=client) for client, results in enumerate(per_client) for turn in results]
+    cpu = cpu_end - cpu_start if cpu_start is not None and cpu_end is not None else None
+    return {
+        "commit": git_commit(),
+        "timestamp": time.time(),
+        "settings": {key: value for key, value in vars(args).items()
+                     if key not in ("serve", "output", "compare", "script")},
+        "summary": summarize(turns, wall, cpu, sampler.rss_samples),
+        "turn_stage_seconds": stats.get("turn_stage_seconds", []),
+        "turns": [{key: value for key, value in turn.items() if key != "text"} for turn in turns],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=1, help="concurrent /ws/chat connections")
+    parser.add_argument("--script", help="JSON list of conversations, each a list of user messages")
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-s", type=float, default=60.0)
+    parser.add_argument("--reply-tokens", type=int, default=48)
+    parser.add_argument("--no-tool-calls", dest="tool_calls", action="store_false")
+    parser.add_argument("--tts-ttfb-ms", type=float, default=150.0)
+    parser.add_argument("--tts-bytes-per-s", type=float, default=4 * STUB_SAMPLE_RATE * 2,
+                        help="stub PCM delivery rate (default 4x real time for 24 kHz int16)")
+    parser.add_argument("--tts-chunk-bytes", type=int, default=4096)
+    parser.add_argument("--no-tts", action="store_true")
+    parser.add_argument("--tts-cache", action="store_true", help="leave the phrase cache on")
+    parser.add_argument("--fillers", action="store_true", help="leave filler audio on")
+    parser.add_argument("--turn-timeout", type=float, default=60.0)
+    parser.add_argument("--output", default="e2e_benchmark.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--serve", choices=["stub", "backend"], help=argparse.SUPPRESS)
+    parser.add_argument("--stub-port", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--backend-port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve == "stub":
+        import uvicorn
+        uvicorn.run(stub_app(args), host="127.0.0.1", port=args.stub_port, log_level="warning")
+        return
+    if args.serve == "backend":
+        serve_backend(args)
+        return
+
+    conversations = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script) as f:
+            conversations = json.load(f)
+    args.stub_port = args.stub_port or free_port()
+    args.backend_port = args.backend_port or free_port()
+
+    # The key only reaches the stub; nothing here talks to a real provider.
+    env = dict(os.environ, OPENAI_API_KEY="benchmark")
+    argv = [sys.executable, "-m", "backend.benchmarks.e2e"] + [a for a in sys.argv[1:]] + [
+        "--stub-port", str(args.stub_port), "--backend-port", str(args.backend_port)]
+    # Server output (including tracebacks) goes to a log next to the results.
+    log_path = os.path.splitext(args.output)[0] + ".log"
+    processes: List[subprocess.Popen] = []
+    with open(log_path, "w") as log:
+        try:
+            stub = subprocess.Popen(argv + ["--serve", "stub"], env=env, stdout=log, stderr=subprocess.STDOUT)
+            processes.append(stub)
+            backend = subprocess.Popen(argv + ["--serve", "backend"], env=env, stdout=log, stderr=subprocess.STDOUT)
+            processes.append(backend)
+
+            async def run():
+                await wait_for_port(args.stub_port, stub)
+                await wait_for_port(args.backend_port, backend)
+                return await drive(args, conversations, backend.pid)
+            results = asyncio.run(run())
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+    # Errors the backend caught and logged never reach the client; count them here.
+    with open(log_path) as f:
+        tracebacks = f.read().count("Traceback (most recent call last)")
+    results["server_log"] = log_path
+    results["server_tracebacks"] = tracebacks
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    summary = results["summary"]
+    def ms(value):
+        return f"{value:.0f} ms" if value is not None else "n/a"
+    print(f"{summary['turns']} turns on {args.clients} client(s) in {summary['wall_seconds']:.1f}s")
+    print(f"  time to first token: p50 {ms(summary['ttft_ms']['p50'])}, p95 {ms(summary['ttft_ms']['p95'])}")
+    print(f"  time to first audio: p50 {ms(summary['ttfa_ms']['p50'])}, p95 {ms(summary['ttfa_ms']['p95'])}")
+    if summary["audio_frames_per_second"] is not None:
+        print(f"  audio: {summary['audio_frames']} frames, {summary['audio_frames_per_second']:.1f} frames/s, "
+              f"{summary['audio_seconds']:.1f}s of audio")
+    if summary["backend_cpu_percent"] is not None:
+        print(f"  backend: {summary['backend_cpu_seconds']:.2f} CPU s ({summary['backend_cpu_percent']:.0f}% of one core), "
+              f"RSS peak {summary['backend_rss_peak_mb']:.0f} MB")
+    if summary["timed_out_turns"]:
+        print(f"  {summary['timed_out_turns']} turn(s) timed out")
+    if summary["failed_turns"]:
+        print(f"  {summary['failed_turns']} turn(s) failed")
+    if summary["resyncs"]:
+        print(f"  {summary['resyncs']} conversation resync(s) requested by the server")
+    if tracebacks:
+        print(f"WARNING: {tracebacks} traceback(s) in the server output; see {log_path}")
+    print(f"Results written to {args.output}, server output to {log_path}")
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(summary, json.load(f))
+
+    failed = False
+    if summary["timed_out_turns"]:
+        print("FAIL: turns timed out")
+        failed = True
+    if summary["failed_turns"]:
+        print(f"FAIL: turns ended with an error; see {log_path}")
+        failed = True
+    if not args.no_tts and not summary["audio_frames"]:
+        print(f"FAIL: TTS is enabled but no audio frames arrived; see {log_path}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
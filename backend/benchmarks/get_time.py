@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the get_time tool.
+
+Compares the old per-call TimezoneFinder construction with the shared
+TimezoneResolver (first call on a cold resolver, then warm cached calls).
+
+    python -m backend.benchmarks.get_time [--iterations N]
+"""
+import argparse
+import time
+from datetime import datetime
+
+import pytz
+from timezonefinder import TimezoneFinder
+
+from backend.tools.functions import get_time
+from backend.tools.timezones import TIMEZONE_RESOLVER
+
+ORLANDO = (28.5383, -81.3792)
+
+
+def get_time_uncached(lat=ORLANDO[0], lon=ORLANDO[1]):
+    """get_time as it was before the shared resolver."""
+    tf = TimezoneFinder()
+    tz_name = tf.timezone_at(lat=lat, lng=lon)
+    local_tz = pytz.timezone(tz_name)
+    return datetime.now(local_tz).strftime("%H:%M:%S")
+
+
+def per_call_us(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(*ORLANDO)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20, help="calls for the uncached variant")
+    parser.add_argument("--warm-iterations", type=int, default=100000, help="calls for the warm resolver")
+    args = parser.parse_args()
+
+    before = per_call_us(get_time_uncached, args.iterations)
+    cold = per_call_us(get_time, 1)
+    warm = per_call_us(get_time, args.warm_iterations)
+
+    print(f"new TimezoneFinder per call : {before:12.1f} us/call ({args.iterations} calls)")
+    print(f"shared resolver, cold       : {cold:12.1f} us (first call, loads polygons)")
+    print(f"shared resolver, warm       : {warm:12.1f} us/call ({args.warm_iterations} calls)")
+    print(f"speed-up (warm vs before)   : {before / warm:12.0f}x")
+    print(f"lookup cache                : {TIMEZONE_RESOLVER.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
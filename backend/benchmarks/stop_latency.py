@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Stop-to-silence check for the chat turn cancellation path.
+
+Runs TTS turns through the real pipeline, audio queue and WebSocket
+forwarder against a simulated provider (streaming chunks, or synthesis
+blocking on an executor thread) and a socket with a per-frame send delay.
+Each turn is stopped mid-speech; the time from the stop request to the
+end-of-stream frame is measured and must stay within
+CONFIG["CANCELLATION"]["STOP_TO_SILENCE_BUDGET_MS"]. Exits non-zero if it
+does not, or if any audio frame is sent after end of stream.
+
+    python -m backend.benchmarks.stop_latency [--turns 20] [--provider streaming|executor]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+
+# backend.main builds its model clients at import; no request is made here.
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from backend.config.config import CONFIG
+from backend.endpoints.state import ChatSession
+from backend.main import forward_audio_to_websocket
+from backend.tts.framing import AudioFramer, FRAME_HEADER, FLAG_END_OF_STREAM
+from backend.tts.processor import process_streams
+
+CHUNK_BYTES = 4800  # 100 ms of 24 kHz int16
+
+
+class RecordingSocket:
+    """Stands in for the WebSocket: records frames, with a send delay per frame."""
+    def __init__(self, send_delay: float):
+        self.send_delay = send_delay
+        self.frames = []
+
+    async def send_bytes(self, data: bytes) -> None:
+        await asyncio.sleep(self.send_delay)
+        self.frames.append((time.perf_counter(), bytes(data)))
+
+
+def streaming_provider(chunk_interval: float):
+    async def synthesize(phrase: str, stop_event: asyncio.Event):
+        for _ in range(20):
+            await asyncio.sleep(chunk_interval)
+            yield b"\x10\x00" * (CHUNK_BYTES // 2)
+    return synthesize
+
+
+def executor_provider(phrase_seconds: float):
+    # Like Azure: the whole phrase is synthesized on a worker thread.
+    async def synthesize(phrase: str, stop_event: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, time.sleep, phrase_seconds)
+        for _ in range(20):
+            yield b"\x10\x00" * (CHUNK_BYTES // 2)
+    return synthesize
+
+
+async def run_turn(synthesize, send_delay: float, stop_after: float):
+    session = ChatSession()
+    session.session_id = "benchmark"
+    session.begin_turn()
+    scope = session.scope
+    for i in range(8):
+        await session.phrase_queue.put(f"Phrase number {i}.")
+    session.phrase_queue.force_put(None)
+
+    socket = RecordingSocket(send_delay)
+    tts = scope.attach_audio(asyncio.create_task(
+        process_streams(session.phrase_queue, session.audio_queue, scope.tts_stop, synthesize)))
+    forward = scope.attach_audio(asyncio.create_task(
+        forward_audio_to_websocket(session.audio_queue, socket, scope, framer=AudioFramer(2, 1))))
+
+    await asyncio.sleep(stop_after)
+    stopped_at = time.perf_counter()
+    session.stop_generation()
+    await asyncio.gather(tts, forward, return_exceptions=True)
+    session.end_turn()
+
+    eos = [i for i, (_, frame) in enumerate(socket.frames) if FRAME_HEADER.unpack_from(frame)[2] & FLAG_END_OF_STREAM]
+    if len(eos) != 1 or eos[0] != len(socket.frames) - 1:
+        return None, len(socket.frames)
+    return socket.frames[-1][0] - stopped_at, len(socket.frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--provider", choices=["streaming", "executor"], default="streaming")
+    parser.add_argument("--send-delay-ms", type=float, default=2.0)
+    parser.add_argument("--budget-ms", type=float, default=CONFIG["CANCELLATION"]["STOP_TO_SILENCE_BUDGET_MS"])
+    args = parser.parse_args()
+
+    CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"] = True
+    CONFIG["FILLERS"]["ENABLED"] = False
+    synthesize = streaming_provider(0.02) if args.provider == "streaming" else executor_provider(0.4)
+    rng = random.Random(0)
+
+    async def run():
+        results = []
+        for _ in range(args.turns):
+            results.append(await run_turn(synthesize, args.send_delay_ms / 1000, rng.uniform(0.1, 0.6)))
+        return results
+
+    results = asyncio.run(run())
+    broken = sum(1 for elapsed, _ in results if elapsed is None)
+    latencies = sorted(elapsed * 1000 for elapsed, _ in results if elapsed is not None)
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{args.provider} provider, {len(results)} turns: stop to silence p50 {p50:.1f} ms, "
+              f"p95 {p95:.1f} ms, max {latencies[-1]:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if broken:
+        print(f"FAIL: {broken} turn(s) did not end with exactly one end-of-stream frame")
+    if not latencies or latencies[-1] > args.budget_ms:
+        print("FAIL: stop-to-silence over budget")
+    sys.exit(1 if broken or not latencies or latencies[-1] > args.budget_ms else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,140 @@
 import os
+import time
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
 import openai
 from dotenv import load_dotenv
 from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 def setup_chat_client():
     """Initialize and return the appropriate chat client based on configuration."""
     api_host = CONFIG["API_SETTINGS"]["API_HOST"].lower()
 
     if api_host == "openai":
-        client = openai.AsyncOpenAI(
+        client = CLIENT_MANAGER.openai_client(
             api_key=os.getenv("OPENAI_API_KEY"),
             base_url=CONFIG["API_SERVICES"]["openai"]["BASE_URL"]
         )
         deployment_name = CONFIG["API_SERVICES"]["openai"]["MODEL"]
 
     elif api_host == "openrouter":
-        client = openai.AsyncOpenAI(
+        client = CLIENT_MANAGER.openai_client(
             api_key=os.getenv("OPENROUTER_API_KEY"),
             base_url=CONFIG["API_SERVICES"]["openrouter"]["BASE_URL"]
         )
         deployment_name = CONFIG["API_SERVICES"]["openrouter"]["MODEL"]
-    
+
     else:
         raise ValueError(f"Unsupported API_HOST: {api_host}")
 
     return client, deployment_name
+
+
+class TracingTransport(httpx.AsyncHTTPTransport):
+    """
+    HTTP transport that uses httpcore trace events to tell whether a request
+    opened a new connection or reused a pooled one, and how long the
+    TCP + TLS handshake took.
+    """
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.last_request_at = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        state = {"connect_started": None, "new": False}
+
+        async def trace(event_name, info):
+            if event_name == "connection.connect_tcp.started":
+                state["connect_started"] = time.perf_counter()
+            elif event_name == "connection.connect_tcp.complete":
+                state["new"] = True
+            elif event_name == "connection.start_tls.complete" and state["connect_started"] is not None:
+                METRICS.histogram("http_handshake_seconds", "TCP+TLS handshake time for new connections",
+                                  {"host": host}).observe(time.perf_counter() - state["connect_started"])
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self.last_request_at = time.monotonic()
+        response = await super().handle_async_request(request)
+        if state["new"]:
+            METRICS.counter("http_connections_new_total", "Requests that opened a new connection", {"host": host}).inc()
+        else:
+            METRICS.counter("http_connections_reused_total", "Requests served on a pooled connection", {"host": host}).inc()
+        return response
+
+
+class HTTPClientManager:
+    """
+    Process-wide HTTP connection pool shared by the chat and TTS clients.
+    Connections to every registered API origin are opened at startup and
+    re-opened after idle periods, so a turn does not pay for a handshake
+    before its first token or audio byte.
+    """
+    def __init__(self, settings: Dict):
+        self.settings = settings
+        self.transport = TracingTransport(
+            limits=httpx.Limits(
+                max_connections=settings["MAX_CONNECTIONS"],
+                max_keepalive_connections=settings["MAX_KEEPALIVE_CONNECTIONS"],
+                keepalive_expiry=settings["KEEPALIVE_EXPIRY_S"],
+            ),
+        )
+        self.http_client = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=httpx.Timeout(settings["TIMEOUT_S"], connect=settings["CONNECT_TIMEOUT_S"]),
+        )
+        self._openai_clients: Dict[Tuple[Optional[str], str], openai.AsyncOpenAI] = {}
+        self._origins = set()
+        self._keep_warm_task: Optional[asyncio.Task] = None
+
+    def openai_client(self, api_key: Optional[str], base_url: str) -> openai.AsyncOpenAI:
+        """Shared AsyncOpenAI client for this key and base URL, backed by the common pool."""
+        key = (api_key, base_url)
+        client = self._openai_clients.get(key)
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+            self._openai_clients[key] = client
+            parts = urlsplit(base_url)
+            self._origins.add(f"{parts.scheme}://{parts.netloc}")
+        return client
+
+    async def _warm_origin(self, origin: str) -> None:
+        try:
+            await self.http_client.head(origin)
+        except Exception as e:
+            logger.warning(f"Could not pre-open connection to {origin}: {e}")
+
+    async def prewarm(self) -> None:
+        """Open (or refresh) one pooled connection to every known API origin."""
+        await asyncio.gather(*(self._warm_origin(origin) for origin in self._origins))
+
+    async def _keep_warm(self) -> None:
+        interval = self.settings["REWARM_INTERVAL_S"]
+        while True:
+            await asyncio.sleep(interval)
+            if time.monotonic() - self.transport.last_request_at >= interval:
+                await self.prewarm()
+
+    async def start(self) -> None:
+        if not self.settings["PREWARM"]:
+            return
+        await self.prewarm()
+        if self._keep_warm_task is None:
+            self._keep_warm_task = asyncio.create_task(self._keep_warm())
+
+    async def aclose(self) -> None:
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            self._keep_warm_task = None
+        await self.http_client.aclose()
+
+
+CLIENT_MANAGER = HTTPClientManager(CONFIG["HTTP_CLIENT"])
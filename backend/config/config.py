@@ -26,28 +26,142 @@ def setup_chat_client():
 
 CONFIG: Dict[str, Any] = {
     "API_SETTINGS": {
-        "API_HOST": "openai"
+        "API_HOST": "openai",
+        "FALLBACK_HOSTS": ["openrouter"],  # tried in order on errors; skipped when their API key is not set
+        "FAILOVER": True,
+        "HEDGE_AFTER_MS": 1500,  # send the request to the next host too if no first token by then; None disables
     },
     "API_SERVICES": {
         "openai": {
             "BASE_URL": "https://api.openai.com/v1",
-            "MODEL": "gpt-4o-mini"
+            "MODEL": "gpt-4o-mini",
+            "API_KEY_ENV": "OPENAI_API_KEY"
         },
         "openrouter": {
             "BASE_URL": "https://openrouter.ai/api/v1",
-            "MODEL": "meta-llama/llama-3.1-70b-instruct"
+            "MODEL": "meta-llama/llama-3.1-70b-instruct",
+            "API_KEY_ENV": "OPENROUTER_API_KEY"
         },
     },
     "SYSTEM_PROMPT": {
         "CONTENT": "You sarcastic but helpful assistant that uses short replies. Users live in Orlando, Fl"
     },
+    "CONVERSATIONS": {
+        "MAX_CONVERSATIONS": 64,  # server-side conversation copies kept for delta uploads (LRU)
+    },
+    "CONTEXT_WINDOW": {
+        "ENABLED": True,
+        "TOKEN_BUDGET": 6000,  # prompt tokens sent to the model, system prompt and summary included
+        "SUMMARIZE_AT_RATIO": 0.75,  # start a background summary once unsummarized history passes this share of the budget
+        "KEEP_RECENT_MESSAGES": 6,  # newest messages never folded into the summary
+        "SUMMARY_MAX_TOKENS": 300,
+        "TOKENIZER_ENCODING": "o200k_base",  # used when tiktoken is installed, otherwise ~4 chars per token
+    },
     "GENERAL_AUDIO": {
         "TTS_ENABLED": True,  # Set to False by default
     },
     "PROCESSING_PIPELINE": {
         "USE_SEGMENTATION": True,
         "DELIMITERS": ["\n", ". ", "? ", "! ", "* "],
-        "CHARACTER_MAXIMUM": 50,  # will only segment for the initial characters listed here, the rest will just stream
+        "CLAUSE_DELIMITERS": [", ", "; ", ": ", " - "],
+        "ABBREVIATIONS": ["Mr", "Mrs", "Ms", "Dr", "Prof", "Sr", "Jr", "St", "Mt", "Ave", "vs", "e.g", "i.e", "approx"],
+        "PHRASE_SIZE_SCHEDULE": [8, 40, 80, 140],  # minimum characters for the 1st, 2nd, 3rd... phrase; the last value repeats
+        "MAX_PHRASE_CHARS": 300,  # cut at the best boundary seen once a phrase grows past this
+        "FLUSH_DEADLINE_MS": 700,  # force a clause-level flush when text has been pending this long
+    },
+    "TOOLS": {
+        "MAX_WORKERS": 4,  # thread pool for blocking tools
+        "TIMEOUT_S": 10.0,
+        "TIMEOUTS": {  # per-tool overrides
+            "fetch_weather": 8.0,
+            "get_time": 3.0,
+        },
+    },
+    "TOOL_CACHE": {
+        "fetch_weather": {
+            "TTL_S": 600,  # serve cached weather without a request for this long
+            "STALE_TTL_S": 1800,  # then serve it stale for this long while refreshing in the background
+            "MAX_ENTRIES": 128,
+            "COORD_PRECISION": 2,  # decimal places kept in the cache key (~1 km)
+        },
+    },
+    "TIMEZONE_RESOLVER": {
+        "COORD_PRECISION": 2,  # decimal places kept in the lookup cache key
+        "CACHE_SIZE": 1024,
+        "IN_MEMORY": True,  # load timezone polygons into memory once at startup
+    },
+    "HTTP_CLIENT": {
+        "MAX_CONNECTIONS": 20,
+        "MAX_KEEPALIVE_CONNECTIONS": 10,
+        "KEEPALIVE_EXPIRY_S": 120,  # idle pooled connections are closed after this long
+        "TIMEOUT_S": 60,
+        "CONNECT_TIMEOUT_S": 5,
+        "PREWARM": True,  # open a connection to each API host at startup
+        "REWARM_INTERVAL_S": 60,  # re-open connections after this long without traffic
+    },
+    "TEXT_STREAMING": {
+        "COALESCE": True,  # batch model deltas into fewer WebSocket text frames
+        "FLUSH_INTERVAL_MS": 40,  # flush a batch at most this long after its first delta
+        "MAX_CHARS": 48,  # ...or once it holds this many characters
+        "FLUSH_ON_PHRASE_BOUNDARY": True,  # ...or when a delta ends a phrase
+        "BOUNDARY_CHARS": ".!?\n",
+    },
+    "TTS_PIPELINE": {
+        "LOOKAHEAD": 3,  # phrases synthesized concurrently ahead of playback
+        "MAX_BUFFERED_BYTES": 2 * 1024 * 1024,  # audio held for phrases not yet playing
+    },
+    "QUEUES": {
+        # Per-turn queue bounds. A producer blocks at HIGH and resumes once the
+        # consumer has drained the queue to LOW, so a slow client or stalled
+        # sink backs up to the model and TTS reads instead of into memory.
+        "CHUNK": {"HIGH": 1024, "LOW": 256},  # model text deltas awaiting segmentation
+        "PHRASE": {"HIGH": 64, "LOW": 16},  # phrases awaiting TTS
+        "AUDIO": {"HIGH": 1024 * 1024, "LOW": 256 * 1024, "BYTES": True},  # PCM awaiting the socket
+    },
+    "PCM_PROCESSING": {
+        "ENABLED": True,  # applies to raw 16-bit mono PCM output only
+        "FRAME_MS": 10,  # energy is measured per frame of this length
+        "SILENCE_THRESHOLD_DBFS": -45,  # frames quieter than this count as silence
+        "PREROLL_MS": 20,  # silence kept before speech starts
+        "TRAILING_KEEP_MS": 40,  # silence kept after speech ends
+        "GAP_MS": 120,  # silence inserted between phrases
+        "CROSSFADE_MS": 5,  # fade in/out at phrase edges
+        "TARGET_DBFS": -20,  # speech loudness target
+        "MAX_GAIN_DB": 12,
+        "MIN_GAIN_DB": -12,
+        "LOUDNESS_SMOOTHING": 0.05,  # per-frame weight of the running loudness estimate
+    },
+    "TRACING": {
+        # Ask for a usage chunk at the end of each stream (stream_options.include_usage);
+        # without it completion tokens are estimated from the streamed deltas.
+        "STREAM_USAGE": True,
+    },
+    "CANCELLATION": {
+        # Stop request to end-of-stream frame; checked by backend/benchmarks/stop_latency.py.
+        "STOP_TO_SILENCE_BUDGET_MS": 100,
+    },
+    "AUDIO_CODECS": {
+        # Codecs a client may negotiate for TTS audio frames; raw PCM is always available.
+        "ALLOWED": ["mulaw"],
+    },
+    "FILLERS": {
+        "ENABLED": True,
+        "TTFA_THRESHOLD_MS": 1200,  # play an acknowledgement if no audio has started by then
+        # Pre-synthesized at startup; a tool call plays its own category, else "tool".
+        "PHRASES": {
+            "acknowledge": ["One moment.", "Let me think.", "Sure, one second."],
+            "tool": ["Let me check that."],
+            "fetch_weather": ["Let me check the weather."],
+            "get_time": ["Let me check the time."],
+            "error": ["Sorry, something went wrong."],
+        },
+    },
+    "TTS_CACHE": {
+        "ENABLED": True,
+        "DIRECTORY": os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "tts"),
+        "MAX_BYTES": 256 * 1024 * 1024,  # live PCM kept on disk
+        "SEGMENT_BYTES": 16 * 1024 * 1024,  # audio is appended to segment files of this size
+        "READ_CHUNK_BYTES": 16384,  # cached audio is streamed in chunks of this size
     },
     "TTS_MODELS": {
         "PROVIDER": "azure",  # "azure" or "openai"
@@ -78,6 +192,8 @@ CONFIG: Dict[str, Any] = {
                 "Raw48Khz16BitMonoPcm": 48000
             },
             "PLAYBACK_RATE": 24000,
+            "POOL_SIZE": 3,  # long-lived synthesizers (and executor threads) per voice/format
+            "PRECONNECT": True,  # open the synthesizers' service connections at startup
             "ENABLE_PROFANITY_FILTER": False,
             "STABILITY": 0,
             "PROSODY": {
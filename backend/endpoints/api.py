@@ -1,7 +1,8 @@
 import logging
 from fastapi import APIRouter, HTTPException, Response
 from backend.config.config import CONFIG
-from backend.endpoints.state import GEN_STOP_EVENT, TTS_STOP_EVENT
+from backend.endpoints.state import SESSIONS, ChatSession
+from backend.telemetry.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api")
@@ -10,6 +11,16 @@ router = APIRouter(prefix="/api")
 async def openai_options():
     return Response(status_code=200)
 
+@router.get("/stats")
+async def get_stats():
+    """Return a JSON snapshot of the backend's runtime counters and histograms"""
+    return METRICS.snapshot()
+
+@router.get("/metrics")
+async def get_metrics():
+    """Return the same metrics in Prometheus text format, for scraping"""
+    return Response(content=METRICS.prometheus_text(), media_type="text/plain; version=0.0.4")
+
 @router.get("/tts-state")
 async def get_tts_state():
     """Return the current TTS state from config"""
@@ -27,17 +38,46 @@ async def toggle_tts():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to toggle TTS: {str(e)}")
 
+def _get_session_or_404(session_id: str) -> ChatSession:
+    session = SESSIONS.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return session
+
+@router.get("/sessions")
+async def list_sessions():
+    """Return the chat sessions currently connected over /ws/chat"""
+    return {"sessions": [session.describe() for session in SESSIONS.all()]}
+
+@router.post("/sessions/{session_id}/stop-audio")
+async def stop_session_tts(session_id: str):
+    logger.info(f"Stop TTS requested for session {session_id}")
+    _get_session_or_404(session_id).stop_audio()
+    return {"status": "success", "message": "TTS stopped", "session_id": session_id}
+
+@router.post("/sessions/{session_id}/stop-generation")
+async def stop_session_generation(session_id: str):
+    """
+    Stop text generation for a single session only.
+    Other screens connected to the same backend keep streaming.
+    """
+    _get_session_or_404(session_id).stop_generation()
+    return {"detail": "Generation stop event triggered.", "session_id": session_id}
+
 @router.post("/stop-audio")
 async def stop_tts():
-    logger.info("Stop TTS requested")
-    TTS_STOP_EVENT.set()
+    """Legacy endpoint: stop TTS on every connected session."""
+    logger.info("Stop TTS requested for all sessions")
+    for session in SESSIONS.all():
+        session.stop_audio()
     return {"status": "success", "message": "TTS stopped"}
 
 @router.post("/stop-generation")
 async def stop_generation():
     """
-    Manually set the global GEN_STOP_EVENT.
-    Any ongoing streaming text generation will stop soon after it checks the event.
+    Legacy endpoint: stop text generation on every connected session.
+    Prefer /api/sessions/{session_id}/stop-generation so other screens keep streaming.
     """
-    GEN_STOP_EVENT.set()
+    for session in SESSIONS.all():
+        session.stop_generation()
     return {"detail": "Generation stop event triggered. Ongoing text generation will exit soon."}
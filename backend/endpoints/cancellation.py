@@ -0,0 +1,108 @@
+# backend/endpoints/cancellation.py
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Optional, Set
+
+from backend.telemetry.metrics import METRICS
+from backend.telemetry.tracing import TurnTrace
+
+logger = logging.getLogger(__name__)
+
+STOP_TO_SILENCE_BUCKETS = (0.005, 0.01, 0.02, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+
+class TurnScope:
+    """
+    Cancellation scope of one chat turn.
+
+    Stopping audio cancels the TTS and audio-forwarding tasks attached to
+    the scope, which tears down in-flight provider streams and executor
+    synthesis through their own cleanup. Stopping generation also stops
+    audio and ends the model stream at its next await, not its next chunk.
+    """
+    def __init__(self, turn_id: int, trace: Optional[TurnTrace] = None):
+        self.turn_id = turn_id
+        self.trace = trace
+        self.gen_stop = asyncio.Event()
+        self.tts_stop = asyncio.Event()
+        self.stop_requested_at: Optional[float] = None
+        self._audio_tasks: Set[asyncio.Task] = set()
+
+    def attach_audio(self, task: asyncio.Task) -> asyncio.Task:
+        """Cancel `task` when this turn's audio is stopped."""
+        self._audio_tasks.add(task)
+        task.add_done_callback(self._audio_tasks.discard)
+        if self.tts_stop.is_set():
+            task.cancel()
+        return task
+
+    def stop_audio(self) -> None:
+        if self.tts_stop.is_set():
+            return
+        self.stop_requested_at = time.perf_counter()
+        self.tts_stop.set()
+        for task in list(self._audio_tasks):
+            task.cancel()
+        logger.info(f"Turn {self.turn_id}: audio stopped, {len(self._audio_tasks)} task(s) cancelled")
+
+    def stop_generation(self) -> None:
+        self.gen_stop.set()
+        self.stop_audio()
+
+    def record_silence(self) -> Optional[float]:
+        """Called once the final audio frame is sent; returns stop-to-silence seconds if stopped."""
+        if self.stop_requested_at is None:
+            return None
+        elapsed = time.perf_counter() - self.stop_requested_at
+        METRICS.histogram("turn_stop_to_silence_seconds", "Stop request to end-of-stream frame sent",
+                          buckets=STOP_TO_SILENCE_BUCKETS).observe(elapsed)
+        return elapsed
+
+
+async def unless_stopped(awaitable: Awaitable[Any], stop_event: asyncio.Event) -> Optional[Any]:
+    """Await `awaitable`, or cancel it and return None as soon as `stop_event` is set."""
+    task = asyncio.ensure_future(awaitable)
+    stopper = asyncio.ensure_future(stop_event.wait())
+    try:
+        await asyncio.wait({task, stopper}, return_when=asyncio.FIRST_COMPLETED)
+    except BaseException:
+        task.cancel()
+        raise
+    finally:
+        stopper.cancel()
+    if task.done():
+        return task.result()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return None
+
+
+async def until_stopped(iterable: Optional[AsyncIterable[Any]], stop_event: asyncio.Event) -> AsyncIterator[Any]:
+    """
+    Iterate `iterable` until it ends or `stop_event` is set. A read that is
+    still pending when the event fires is cancelled rather than waited out.
+    None (e.g. a stream whose opening was stopped) yields nothing.
+    """
+    if iterable is None:
+        return
+    iterator = iterable.__aiter__()
+    while not stop_event.is_set():
+        step = asyncio.ensure_future(iterator.__anext__())
+        stopper = asyncio.ensure_future(stop_event.wait())
+        try:
+            await asyncio.wait({step, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            step.cancel()
+            raise
+        finally:
+            stopper.cancel()
+        if not step.done():
+            step.cancel()
+            await asyncio.gather(step, return_exceptions=True)
+            return
+        try:
+            item = step.result()
+        except StopAsyncIteration:
+            return
+        yield item
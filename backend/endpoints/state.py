@@ -1,4 +1,116 @@
 # backend/endpoints/state.py
+import time
+import uuid
 import asyncio
-TTS_STOP_EVENT = asyncio.Event()
-GEN_STOP_EVENT = asyncio.Event()
\ No newline at end of file
+from typing import Any, Dict, List, Optional
+
+from backend.endpoints.cancellation import TurnScope
+from backend.telemetry.queues import WatermarkQueue
+from backend.telemetry.tracing import TurnTrace
+
+
+class ChatSession:
+    """
+    State owned by a single /ws/chat connection.
+    Each connected screen gets its own turn scope, queues and turn state so
+    stopping or starting a turn on one screen never touches another.
+    """
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or uuid.uuid4().hex
+        self.created_at = time.time()
+        self.scope: Optional[TurnScope] = None
+        self.phrase_queue: Optional[WatermarkQueue] = None
+        self.audio_queue: Optional[WatermarkQueue] = None
+        self.turn_active = False
+        self.turn_count = 0
+        # Sink format the client declared at connect (an AudioFormat); None means provider format.
+        self.audio_format = None
+        # Codec negotiated for audio frames on this connection ("pcm" or e.g. "mulaw").
+        self.audio_codec = "pcm"
+        # Binary audio frame protocol: 1 = legacy "audio:" prefix, 2 = versioned header.
+        self.audio_protocol = 1
+        # Chat requests received; a turn that is no longer the latest skips itself.
+        self.chat_requests = 0
+        self.playback_completed_at: Optional[float] = None
+
+    def begin_turn(self, trace: Optional[TurnTrace] = None) -> None:
+        """Open a new cancellation scope and fresh bounded queues for a new turn."""
+        self.turn_count += 1
+        self.scope = TurnScope(self.turn_count, trace)
+        self.phrase_queue = WatermarkQueue.from_config("phrase")
+        self.audio_queue = WatermarkQueue.from_config("audio")
+        self.turn_active = True
+
+    def end_turn(self) -> None:
+        self.turn_active = False
+        for queue in (self.phrase_queue, self.audio_queue):
+            if queue is not None:
+                queue.close()
+
+    def stop_generation(self) -> None:
+        if self.scope is not None and self.turn_active:
+            self.scope.stop_generation()
+
+    def stop_audio(self) -> None:
+        if self.scope is not None and self.turn_active:
+            self.scope.stop_audio()
+
+    def playback_complete(self) -> None:
+        self.playback_completed_at = time.time()
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "turn_active": self.turn_active,
+            "turn_count": self.turn_count,
+            "audio_format": self.audio_format.to_dict() if self.audio_format else None,
+            "audio_codec": self.audio_codec,
+            "audio_protocol": self.audio_protocol,
+            "playback_completed_at": self.playback_completed_at,
+            "last_trace": self.scope.trace.describe() if self.scope and self.scope.trace else None,
+        }
+
+
+class SessionSocket:
+    """
+    Serializes sends on one WebSocket. The reader, the turn task and the
+    audio forwarder all write to the socket, one whole message at a time.
+    """
+    def __init__(self, websocket: Any):
+        self.websocket = websocket
+        self._lock = asyncio.Lock()
+
+    async def send_json(self, data: Dict[str, Any]) -> None:
+        async with self._lock:
+            await self.websocket.send_json(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        async with self._lock:
+            await self.websocket.send_bytes(data)
+
+
+class SessionRegistry:
+    """Process-wide lookup of live chat sessions by id."""
+    def __init__(self):
+        self._sessions: Dict[str, ChatSession] = {}
+
+    def create(self) -> ChatSession:
+        session = ChatSession()
+        self._sessions[session.session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[ChatSession]:
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+    def all(self) -> List[ChatSession]:
+        return list(self._sessions.values())
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+SESSIONS = SessionRegistry()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Bytes a text frame costs on the wire before its content.
+FRAME_OVERHEAD_BYTES = len(json.dumps({"content": "", "is_chunk": True}))
+
+_END = object()
+
+
+class CoalescerStats:
+    """Per-turn counts of text deltas received versus frames actually sent."""
+    def __init__(self):
+        self.frames_in = 0
+        self.frames_out = 0
+        self.chars = 0
+
+    @property
+    def frames_saved(self) -> int:
+        return self.frames_in - self.frames_out
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.frames_saved * FRAME_OVERHEAD_BYTES
+
+    def record(self) -> None:
+        METRICS.counter("ws_text_deltas_total", "Text deltas produced by the model").inc(self.frames_in)
+        METRICS.counter("ws_text_frames_total", "Text frames sent over /ws/chat").inc(self.frames_out)
+        METRICS.counter("ws_text_bytes_saved_total", "Frame overhead bytes avoided by coalescing").inc(self.bytes_saved)
+        logger.info(
+            f"Text coalescing: {self.frames_in} deltas -> {self.frames_out} frames "
+            f"({self.frames_saved} frames, ~{self.bytes_saved} bytes saved)"
+        )
+
+
+def _ends_at_boundary(text: str, boundary_chars: str) -> bool:
+    stripped = text.rstrip(" ")
+    return bool(stripped) and stripped[-1] in boundary_chars
+
+
+async def coalesce_text_stream(source: AsyncIterator[str],
+                               stats: Optional[CoalescerStats] = None,
+                               flush_interval_ms: Optional[float] = None,
+                               max_chars: Optional[int] = None,
+                               flush_on_boundary: Optional[bool] = None) -> AsyncIterator[str]:
+    """
+    Batches text deltas from `source` into larger frames.
+    A batch is flushed at the earliest of `flush_interval_ms` after its first
+    delta, once it holds `max_chars` characters, or at a phrase boundary.
+    """
+    settings = CONFIG["TEXT_STREAMING"]
+    stats = stats or CoalescerStats()
+    if not settings["COALESCE"]:
+        async for text in source:
+            stats.frames_in += 1
+            stats.frames_out += 1
+            stats.chars += len(text)
+            yield text
+        return
+
+    interval = (flush_interval_ms if flush_interval_ms is not None else settings["FLUSH_INTERVAL_MS"]) / 1000.0
+    max_chars = max_chars if max_chars is not None else settings["MAX_CHARS"]
+    if flush_on_boundary is None:
+        flush_on_boundary = settings["FLUSH_ON_PHRASE_BOUNDARY"]
+    boundary_chars = settings["BOUNDARY_CHARS"]
+
+    inbox: asyncio.Queue = asyncio.Queue()
+
+    async def pump():
+        try:
+            async for text in source:
+                await inbox.put(text)
+        except Exception as e:
+            await inbox.put(e)
+        finally:
+            await inbox.put(_END)
+
+    pump_task = asyncio.create_task(pump())
+    loop = asyncio.get_running_loop()
+    parts = []
+    size = 0
+    deadline = None
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(inbox.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is _END:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            if item:
+                stats.frames_in += 1
+                stats.chars += len(item)
+                parts.append(item)
+                size += len(item)
+                if deadline is None:
+                    deadline = loop.time() + interval
+
+            due = deadline is not None and loop.time() >= deadline
+            if parts and (due or size >= max_chars or
+                          (flush_on_boundary and item and _ends_at_boundary(item, boundary_chars))):
+                stats.frames_out += 1
+                yield "".join(parts)
+                parts, size, deadline = [], 0, None
+
+        if parts:
+            stats.frames_out += 1
+            yield "".join(parts)
+    finally:
+        pump_task.cancel()
@@ -11,12 +11,31 @@ import openai
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
-from backend.config.config import CONFIG, setup_chat_client
+from backend.config.config import CONFIG
+from backend.config.client import CLIENT_MANAGER
 from backend.tools.functions import get_tools, get_available_functions
-from backend.models.openaisdk import validate_messages_for_ws, stream_openai_completion
+from backend.tools.executor import TOOL_EXECUTOR
+from backend.tools.timezones import TIMEZONE_RESOLVER
+from backend.models.openaisdk import validate_message_list, stream_openai_completion
+from backend.models.conversations import CONVERSATIONS, ConversationVersionMismatch
+from backend.models.context import CONTEXT_WINDOW
+from backend.models.providers import ProviderPool
 from backend.endpoints.api import router as api_router
-from backend.endpoints.state import GEN_STOP_EVENT
-from backend.tts.processor import process_streams
+from backend.endpoints.state import SESSIONS, ChatSession, SessionSocket
+from backend.endpoints.cancellation import TurnScope
+from backend.endpoints.streaming import CoalescerStats, coalesce_text_stream
+from backend.telemetry.metrics import METRICS
+from backend.telemetry.queues import WatermarkQueue
+from backend.telemetry.tracing import TurnTrace
+from backend.tts.processor import process_streams, build_phrase_synthesizer
+from backend.tts.fillers import CANNED_AUDIO
+from backend.tts.openaitts import shared_tts_client
+from backend.tts.azuretts import get_synthesizer_pool, shutdown_synthesizer_pools
+from backend.tts.cache import PHRASE_CACHE
+from backend.tts.pcm import pcm_sample_rate
+from backend.tts.resample import AudioConverter, AudioFormat, make_converter
+from backend.tts.codec import AudioEncoder, negotiate_codec
+from backend.tts.framing import AudioFramer, FRAME_VERSION
 
 from contextlib import asynccontextmanager
 
@@ -24,10 +43,16 @@ from contextlib import asynccontextmanager
 # Global Initialization
 # ------------------------------------------------------------------------------
 load_dotenv()
-client, DEPLOYMENT_NAME = setup_chat_client()
+provider_pool = ProviderPool.from_config()
+
+def log_task_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background task {task.get_name()} failed: {task.exception()!r}")
 
 def shutdown():
-    pass
+    TOOL_EXECUTOR.shutdown()
+    shutdown_synthesizer_pools()
+    PHRASE_CACHE.close()
 
 # ------------------------------------------------------------------------------
 # Global Variables
@@ -39,8 +64,26 @@ logger = logging.getLogger(__name__)
 # ------------------------------------------------------------------------------
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Load timezone polygons before the first "what time is it" question.
+    await asyncio.to_thread(TIMEZONE_RESOLVER.warm)
+    # Open the LLM and TTS connections now instead of on the first turn.
+    if CONFIG["TTS_MODELS"]["PROVIDER"].lower() == "openai":
+        shared_tts_client()
+    await CLIENT_MANAGER.start()
+    if CONFIG["TTS_MODELS"]["PROVIDER"].lower() == "azure" and CONFIG["TTS_MODELS"]["AZURE_TTS"]["PRECONNECT"]:
+        await get_synthesizer_pool().warm()
+    warm_task = None
+    if CONFIG["FILLERS"]["ENABLED"]:
+        synthesize = build_phrase_synthesizer()
+        if synthesize is not None:
+            warm_task = asyncio.create_task(CANNED_AUDIO.warm(synthesize), name="filler-warm")
+            warm_task.add_done_callback(log_task_failure)
     yield
+    if warm_task is not None:
+        warm_task.cancel()
+        await asyncio.gather(warm_task, return_exceptions=True)
     shutdown()
+    await CLIENT_MANAGER.aclose()
 
 app = FastAPI(lifespan=lifespan)
 app.add_middleware(
@@ -56,103 +99,288 @@ app.add_middleware(
 # ------------------------------------------------------------------------------
 @app.websocket("/ws/chat")
 async def unified_chat_websocket(websocket: WebSocket):
+    """
+    Full-duplex chat socket. This coroutine only reads: each chat turn runs
+    as its own task, so control messages are handled while a turn streams
+    and a new chat message preempts the turn in progress.
+    """
     await websocket.accept()
-    print("New WebSocket connection established")
+    session = SESSIONS.create()
+    socket = SessionSocket(websocket)
+    turn_task: Optional[asyncio.Task] = None
+    print(f"New WebSocket connection established (session {session.session_id})")
 
     try:
+        await socket.send_json({"type": "session", "session_id": session.session_id})
+
         while True:
             data = await websocket.receive_json()
             action = data.get("action")
 
-            if action == "chat":
-                print("\nProcessing new chat message...")                
-                # Clear event for the new chat.
-                GEN_STOP_EVENT.clear()
-
-                messages = data.get("messages", [])
-                validated = await validate_messages_for_ws(messages)
-
-                phrase_queue = asyncio.Queue()
-                audio_queue = asyncio.Queue()
+            if action == "hello":
+                # The client declares the PCM format its audio sink plays.
+                try:
+                    session.audio_format = AudioFormat.from_dict(data.get("audio_format") or {})
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"Ignoring invalid audio format from client: {e}")
+                    session.audio_format = None
+                sink_sample_format = session.audio_format.sample_format if session.audio_format else "int16"
+                session.audio_protocol = min(int(data.get("audio_protocol") or 1), FRAME_VERSION)
+                session.audio_codec = negotiate_codec(
+                    data.get("codecs"), CONFIG["AUDIO_CODECS"]["ALLOWED"], sink_sample_format
+                )
+                await socket.send_json({
+                    "type": "audio_format",
+                    "audio_format": session.audio_format.to_dict() if session.audio_format else None,
+                    "codec": session.audio_codec,
+                    "audio_protocol": session.audio_protocol
+                })
 
-                process_streams_task = asyncio.create_task(process_streams(
-                    phrase_queue, audio_queue, GEN_STOP_EVENT
-                ))
+            elif action == "chat":
+                trace = TurnTrace()
+                session.chat_requests += 1
+                if turn_task is not None and not turn_task.done():
+                    print(f"New chat message preempts turn {session.turn_count}")
+                    METRICS.counter("chat_turns_preempted_total", "Turns cut short by a newer chat message").inc()
+                    session.stop_generation()
+                turn_task = asyncio.create_task(
+                    run_chat_turn(socket, session, data, session.chat_requests, trace, turn_task)
+                )
 
-                audio_forward_task = asyncio.create_task(forward_audio_to_websocket(
-                    audio_queue, websocket, GEN_STOP_EVENT
-                ))
+            elif action in CONTROL_ACTIONS:
+                await handle_control(socket, session, action)
 
-                try:
-                    async for content in stream_openai_completion(
-                        client, 
-                        DEPLOYMENT_NAME, 
-                        validated, 
-                        phrase_queue,
-                        GEN_STOP_EVENT
-                    ):
-                        if GEN_STOP_EVENT.is_set():
-                            break
-                        print(f"Sending content chunk: {content[:50]}...")
-                        await websocket.send_json({"content": content, "is_chunk": True})
-                finally:
-                    print("Chat stream finished, cleaning up...")
-                    # Send a final signal to indicate streaming is complete
-                    try:
-                        if not GEN_STOP_EVENT.is_set():
-                            # Get the accumulated content from the last message
-                            # and mark it as complete
-                            last_message = next((m for m in validated[::-1] if m.get("role") == "assistant"), None)
-                            if last_message:
-                                await websocket.send_json({"content": last_message.get("content", ""), "is_final": True})
-                    except Exception as e:
-                        print(f"Error sending final message: {e}")
-                        
-                    await phrase_queue.put(None)
-                    await process_streams_task
-                    await audio_forward_task
-                    print("Cleanup completed")
+            else:
+                print(f"Ignoring unknown action: {action}")
     except WebSocketDisconnect:
         pass
     except Exception as e:
         print(f"WebSocket error: {e}")
     finally:
+        if turn_task is not None and not turn_task.done():
+            session.stop_generation()
+            await asyncio.gather(turn_task, return_exceptions=True)
+        SESSIONS.remove(session.session_id)
         await websocket.close()
 
 # ------------------------------------------------------------------------------
-# Audio Forwarding Function
+# In-band Control Messages
 # ------------------------------------------------------------------------------
-async def forward_audio_to_websocket(
-    audio_queue: asyncio.Queue, 
-    websocket: WebSocket,
-    stop_event: asyncio.Event
-):
+CONTROL_ACTIONS = ("stop", "stop-generation", "stop-audio", "toggle-tts", "get-state", "playback-complete")
+
+async def handle_control(socket: SessionSocket, session: ChatSession, action: str):
+    """
+    Same effect as the matching /api endpoint, scoped to this session.
+    Every action except playback-complete is answered with a "state" message.
+    """
+    if action in ("stop", "stop-generation"):
+        # Also drops a chat message still waiting for the previous turn to wind down.
+        session.chat_requests += 1
+        session.stop_generation()
+    elif action == "stop-audio":
+        session.stop_audio()
+    elif action == "toggle-tts":
+        CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"] = not CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"]
+    elif action == "playback-complete":
+        session.playback_complete()
+        return
+    state = session.describe()
+    state.update({"type": "state", "action": action, "tts_enabled": CONFIG["GENERAL_AUDIO"]["TTS_ENABLED"]})
+    await socket.send_json(state)
+
+# ------------------------------------------------------------------------------
+# Chat Turn
+# ------------------------------------------------------------------------------
+async def run_chat_turn(socket: SessionSocket, session: ChatSession, data: Dict,
+                        request_no: int, trace: TurnTrace, previous: Optional[asyncio.Task] = None):
+    """One chat turn: LLM text to the socket, phrases to TTS, audio to the socket."""
+    if previous is not None:
+        # Let a preempted turn finish its cleanup before this one opens its scope.
+        await asyncio.gather(previous, return_exceptions=True)
+    if request_no != session.chat_requests:
+        print("Chat message superseded before its turn started")
+        return
     try:
-        while True:
+        await _run_chat_turn(socket, session, data, trace)
+    except Exception as e:
+        message = getattr(e, "detail", None) or str(e) or type(e).__name__
+        print(f"Chat turn error: {message}")
+        METRICS.counter("chat_turns_failed_total", "Chat turns that ended with an error").inc()
+        try:
+            if data.get("conversation_id"):
+                await forget_conversation(socket, data["conversation_id"])
+            await socket.send_json({"type": "error", "message": message, "trace_id": trace.trace_id})
+        except Exception as send_error:
+            print(f"Error sending turn error: {send_error}")
+    finally:
+        trace.finish()
+
+async def forget_conversation(socket: SessionSocket, conversation_id: str):
+    """
+    A turn that was stopped or failed has no confirmed reply, so the server
+    drops its copy rather than guess what the client kept. Version None tells
+    the client to send its own history as a resync with the next message.
+    """
+    CONVERSATIONS.forget(conversation_id)
+    await socket.send_json({"type": "conversation", "conversation_id": conversation_id, "version": None})
+
+async def _run_chat_turn(socket: SessionSocket, session: ChatSession, data: Dict, trace: TurnTrace):
+    print(f"\nProcessing new chat message (trace {trace.trace_id})...")
+    conversation_id = data.get("conversation_id")
+    if conversation_id:
+        # Delta upload: only new messages are sent against a known version.
+        try:
+            if data.get("resync"):
+                conversation = CONVERSATIONS.resync(conversation_id, data.get("messages", []))
+            else:
+                conversation = CONVERSATIONS.apply_delta(
+                    conversation_id, data.get("base_version"), data.get("messages", [])
+                )
+        except ConversationVersionMismatch as e:
+            print(f"Conversation {conversation_id} out of sync, requesting resync")
+            await socket.send_json({
+                "type": "resync",
+                "conversation_id": conversation_id,
+                "version": e.server_version
+            })
+            return
+        history = conversation.messages
+    else:
+        conversation = None
+        history = validate_message_list(data.get("messages", []))
+
+    # Fit the history into the token budget; older turns are summarized in the background.
+    validated = CONTEXT_WINDOW.prepare(
+        history, conversation, provider_pool.primary.client, provider_pool.primary.model
+    )
+    trace.mark("validated")
+
+    # Open this turn's cancellation scope and queues.
+    session.begin_turn(trace)
+    scope = session.scope
+    stop_event = scope.gen_stop
+    phrase_queue = session.phrase_queue
+    audio_queue = session.audio_queue
+
+    process_streams_task = scope.attach_audio(asyncio.create_task(process_streams(
+        phrase_queue, audio_queue, scope.tts_stop, trace=trace
+    )))
+
+    source_rate = pcm_sample_rate(CONFIG["TTS_MODELS"]["PROVIDER"].lower())
+    converter = make_converter(source_rate, session.audio_format)
+    framer = AudioFramer(
+        session.audio_protocol, session.turn_count, session.audio_codec,
+        session.audio_format.sample_rate if session.audio_format else (source_rate or 0),
+        session.audio_format.channels if session.audio_format else 1
+    )
+    audio_forward_task = scope.attach_audio(asyncio.create_task(forward_audio_to_websocket(
+        audio_queue, socket, scope, converter, AudioEncoder(session.audio_codec), framer
+    )))
+
+    response_parts = []
+    coalescer_stats = CoalescerStats()
+    completed = False
+    try:
+        # Deltas are batched into time-windowed frames before hitting the socket.
+        async for content in coalesce_text_stream(
+            stream_openai_completion(
+                provider_pool, 
+                None, 
+                validated, 
+                phrase_queue,
+                stop_event,
+                trace
+            ),
+            coalescer_stats
+        ):
             if stop_event.is_set():
-                print("Audio forwarding stopped by stop event")
-                await websocket.send_bytes(b'audio:')  # Send empty audio marker
                 break
+            response_parts.append(content)
+            await socket.send_json({"content": content, "is_chunk": True})
+        completed = not stop_event.is_set()
+    finally:
+        print("Chat stream finished, cleaning up...")
+        coalescer_stats.record()
+        response_text = "".join(response_parts)
+        # Send a final signal to indicate streaming is complete
+        try:
+            if not stop_event.is_set() and response_text:
+                await socket.send_json({"content": response_text, "is_final": True, "trace_id": trace.trace_id})
+        except Exception as e:
+            print(f"Error sending final message: {e}")
 
+        # Keep the server-side copy in step with what the user saw: only a
+        # reply that reached is_final is stored; anything else forces a resync.
+        if conversation is not None:
             try:
-                audio_data = await audio_queue.get()
-                if audio_data is None:
-                    print("Received None in audio queue, sending audio end marker")
-                    await websocket.send_bytes(b'audio:')
-                    break
-                # Prepend "audio:" if not already present.
-                message = b'audio:' + audio_data if not audio_data.startswith(b'audio:') else audio_data
-                await websocket.send_bytes(message)
+                if completed and response_text:
+                    CONVERSATIONS.append_assistant(conversation_id, response_text)
+                    await socket.send_json({
+                        "type": "conversation",
+                        "conversation_id": conversation_id,
+                        "version": conversation.version
+                    })
+                else:
+                    await forget_conversation(socket, conversation_id)
             except Exception as e:
-                print(f"Error forwarding audio to websocket: {e}")
+                print(f"Error sending conversation version: {e}")
+            
+        phrase_queue.force_put(None)
+        # Either task may have been cancelled by a stop.
+        await asyncio.gather(process_streams_task, audio_forward_task, return_exceptions=True)
+        session.end_turn()
+        print("Cleanup completed")
+
+# ------------------------------------------------------------------------------
+# Audio Forwarding Function
+# ------------------------------------------------------------------------------
+async def forward_audio_to_websocket(
+    audio_queue: WatermarkQueue, 
+    websocket: SessionSocket,
+    scope: Optional[TurnScope] = None,
+    converter: Optional[AudioConverter] = None,
+    encoder: Optional[AudioEncoder] = None,
+    framer: Optional[AudioFramer] = None
+):
+    """
+    Send the turn's audio until the TTS end marker. A stop cancels this
+    task wherever it is waiting; queued audio is then discarded and the
+    single end-of-stream frame goes out straight away.
+    """
+    framer = framer or AudioFramer()
+    try:
+        while True:
+            audio_data = await audio_queue.get()
+            if audio_data is None:
+                print("Received None in audio queue, sending audio end marker")
                 break
+            if converter is not None:
+                audio_data = converter.convert(audio_data)
+            if encoder is not None:
+                audio_data = encoder.encode(audio_data)
+            if not audio_data:
+                continue
+            await websocket.send_bytes(framer.frame(audio_data))
+            if scope is not None and scope.trace is not None:
+                scope.trace.mark("first_audio_frame")
+                scope.trace.mark("last_audio_frame", last=True)
+    except asyncio.CancelledError:
+        print("Audio forwarding stopped")
     except Exception as e:
-        print(f"Forward audio task error: {e}")
+        print(f"Error forwarding audio to websocket: {e}")
     finally:
+        # Nothing reads the queue past this point; don't leave TTS blocked on it.
+        if audio_queue.size:
+            METRICS.counter("tts_audio_discarded_bytes_total", "Queued audio dropped by a stop").inc(audio_queue.size)
+        audio_queue.close()
         try:
-            await websocket.send_bytes(b'audio:')
+            await websocket.send_bytes(framer.end_of_stream())
         except Exception as e:
             print(f"Error sending final empty message: {e}")
+        if scope is not None:
+            elapsed = scope.record_silence()
+            if elapsed is not None:
+                print(f"Stop to silence: {elapsed * 1000:.1f} ms")
 
 # ------------------------------------------------------------------------------
 # Include Additional API Routes & Run Uvicorn
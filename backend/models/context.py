@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.config.config import CONFIG
+from backend.models.openaisdk import build_model_messages
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation below for use as context in later turns. "
+    "Keep names, places, numbers, preferences and open questions. "
+    "Reply with the summary only."
+)
+
+
+@lru_cache(maxsize=1)
+def _get_encoding(encoding_name: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning(f"Falling back to estimated token counts: {e}")
+        return None
+
+
+@lru_cache(maxsize=4096)
+def count_text_tokens(text: str) -> int:
+    """Token count for a piece of text, cached so each message is only encoded once."""
+    encoding = _get_encoding(CONFIG["CONTEXT_WINDOW"]["TOKENIZER_ENCODING"])
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(message: Dict[str, Any]) -> int:
+    content = message.get("content")
+    return MESSAGE_OVERHEAD_TOKENS + (count_text_tokens(content) if isinstance(content, str) else 0)
+
+
+class ContextWindowManager:
+    """
+    Keeps the prompt sent to the model under a token budget.
+    Older turns are folded into a running summary that is computed in the
+    background and cached on the conversation; until it is ready the oldest
+    turns are simply left out, so the hot path never waits on summarization.
+    """
+    def __init__(self, token_budget: int, summarize_ratio: float,
+                 keep_recent_messages: int, summary_max_tokens: int, enabled: bool = True):
+        self.token_budget = token_budget
+        self.summarize_ratio = summarize_ratio
+        self.keep_recent_messages = keep_recent_messages
+        self.summary_max_tokens = summary_max_tokens
+        self.enabled = enabled
+
+    def prepare(self, history: Sequence[Dict[str, Any]], conversation=None,
+                client=None, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Build the model message list for `history` (validated, no system prompt).
+        `conversation` is the server-side Conversation when one exists; it
+        carries the cached summary and is where new summaries are stored.
+        """
+        if not self.enabled:
+            return build_model_messages(history)
+
+        summary_upto = conversation.summary_upto if conversation else 0
+        summary = conversation.summary if conversation else None
+        if summary_upto > len(history):
+            summary, summary_upto = None, 0
+
+        prefix = build_model_messages([])
+        if summary:
+            prefix.append(self._summary_message(summary))
+        remaining = self.token_budget - sum(count_message_tokens(m) for m in prefix)
+
+        pending = history[summary_upto:]
+        pending_tokens = [count_message_tokens(m) for m in pending]
+
+        # Walk back from the newest message; the latest one is always sent.
+        start = len(pending)
+        used = 0
+        while start > 0:
+            cost = pending_tokens[start - 1]
+            if used + cost > remaining and start < len(pending):
+                break
+            used += cost
+            start -= 1
+
+        if start > 0:
+            logger.info(f"Context window: dropped {start} message(s) not yet covered by the summary")
+
+        if conversation is not None and client is not None and model:
+            if sum(pending_tokens) > self.token_budget * self.summarize_ratio or start > 0:
+                self._schedule_summary(conversation, client, model)
+
+        return prefix + list(pending[start:])
+
+    def _summary_message(self, summary: str) -> Dict[str, str]:
+        return {"role": "system", "content": f"Summary of the earlier conversation: {summary}"}
+
+    def _schedule_summary(self, conversation, client, model: str) -> None:
+        task = conversation.summary_task
+        if task is not None and not task.done():
+            return
+        fold_upto = len(conversation.messages) - self.keep_recent_messages
+        if fold_upto <= conversation.summary_upto:
+            return
+        conversation.summary_task = asyncio.create_task(
+            self._summarize(conversation, client, model, fold_upto, conversation.epoch)
+        )
+
+    async def _summarize(self, conversation, client, model: str, fold_upto: int, epoch: int) -> None:
+        to_fold = conversation.messages[conversation.summary_upto:fold_upto]
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in to_fold)
+        if conversation.summary:
+            transcript = f"Earlier summary: {conversation.summary}\n{transcript}"
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": transcript},
+                ],
+                max_tokens=self.summary_max_tokens,
+                temperature=0.2,
+            )
+            summary = (response.choices[0].message.content or "").strip()
+        except Exception as e:
+            logger.warning(f"Background summarization failed: {e}")
+            return
+
+        # The client may have resynced the conversation while we were waiting.
+        if not summary or conversation.epoch != epoch:
+            return
+        conversation.summary = summary
+        conversation.summary_upto = fold_upto
+        logger.info(f"Folded {len(to_fold)} message(s) into the summary of {conversation.conversation_id}")
+
+
+CONTEXT_WINDOW = ContextWindowManager(
+    token_budget=CONFIG["CONTEXT_WINDOW"]["TOKEN_BUDGET"],
+    summarize_ratio=CONFIG["CONTEXT_WINDOW"]["SUMMARIZE_AT_RATIO"],
+    keep_recent_messages=CONFIG["CONTEXT_WINDOW"]["KEEP_RECENT_MESSAGES"],
+    summary_max_tokens=CONFIG["CONTEXT_WINDOW"]["SUMMARY_MAX_TOKENS"],
+    enabled=CONFIG["CONTEXT_WINDOW"]["ENABLED"],
+)
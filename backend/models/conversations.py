@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from backend.config.config import CONFIG
+from backend.models.openaisdk import validate_message, validate_message_list
+
+
+class ConversationVersionMismatch(Exception):
+    """Raised when a client's delta does not apply to the server's copy."""
+    def __init__(self, conversation_id: str, server_version: int):
+        super().__init__(f"Conversation {conversation_id} is at version {server_version}")
+        self.conversation_id = conversation_id
+        self.server_version = server_version
+
+
+class Conversation:
+    """
+    Server-side copy of a conversation.
+    `messages` holds validated role/content dicts (no system prompt) and
+    `version` is bumped every time messages are appended or replaced.
+    The rolling summary of older turns is cached here as well; `epoch`
+    changes on a full replace so stale background summaries are discarded.
+    """
+    def __init__(self, conversation_id: str):
+        self.conversation_id = conversation_id
+        self.messages: List[Dict[str, Any]] = []
+        self.version = 0
+        self.updated_at = time.time()
+        self.summary: Optional[str] = None
+        self.summary_upto = 0
+        self.summary_task: Optional[asyncio.Task] = None
+        self.epoch = 0
+
+    def append(self, messages: List[Dict[str, Any]]) -> None:
+        if not messages:
+            return
+        self.messages.extend(messages)
+        self.version += 1
+        self.updated_at = time.time()
+
+    def replace(self, messages: List[Dict[str, Any]]) -> None:
+        self.messages = list(messages)
+        self.version += 1
+        self.updated_at = time.time()
+        self.summary = None
+        self.summary_upto = 0
+        self.epoch += 1
+
+
+class ConversationStore:
+    """
+    LRU-bounded store of conversations keyed by the client's conversation id.
+    Clients upload only new messages against a known version and fall back
+    to a full resync when the versions disagree.
+    """
+    def __init__(self, max_conversations: int = 64):
+        self.max_conversations = max_conversations
+        self._conversations: "OrderedDict[str, Conversation]" = OrderedDict()
+
+    def get(self, conversation_id: str) -> Optional[Conversation]:
+        conversation = self._conversations.get(conversation_id)
+        if conversation is not None:
+            self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def _get_or_create(self, conversation_id: str) -> Conversation:
+        conversation = self.get(conversation_id)
+        if conversation is None:
+            conversation = Conversation(conversation_id)
+            self._conversations[conversation_id] = conversation
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+        return conversation
+
+    def apply_delta(self, conversation_id: str, base_version: Any,
+                    new_messages: List[Dict[str, Any]]) -> Conversation:
+        """
+        Validate and append `new_messages` if the client's `base_version`
+        matches ours. A client may start an unknown conversation at version 0.
+        """
+        conversation = self.get(conversation_id)
+        server_version = conversation.version if conversation else 0
+        if base_version != server_version:
+            raise ConversationVersionMismatch(conversation_id, server_version)
+        offset = len(conversation.messages) if conversation else 0
+        if not isinstance(new_messages, list):
+            new_messages = [new_messages]
+        validated = [validate_message(msg, offset + idx) for idx, msg in enumerate(new_messages)]
+        conversation = self._get_or_create(conversation_id)
+        conversation.append(validated)
+        return conversation
+
+    def resync(self, conversation_id: str, messages: List[Dict[str, Any]]) -> Conversation:
+        """Replace the server's copy with a full history uploaded by the client."""
+        validated = validate_message_list(messages)
+        conversation = self._get_or_create(conversation_id)
+        conversation.replace(validated)
+        return conversation
+
+    def append_assistant(self, conversation_id: str, text: str) -> Optional[Conversation]:
+        conversation = self.get(conversation_id)
+        if conversation is None or not text.strip():
+            return conversation
+        conversation.append([{"role": "assistant", "content": text}])
+        return conversation
+
+    def forget(self, conversation_id: str) -> None:
+        """Drop the server's copy; the client's next message resyncs it."""
+        self._conversations.pop(conversation_id, None)
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+
+CONVERSATIONS = ConversationStore(CONFIG["CONVERSATIONS"]["MAX_CONVERSATIONS"])
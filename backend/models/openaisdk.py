@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 import json
-import re
 from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
 import asyncio
 from fastapi import HTTPException
 
 from backend.config.config import CONFIG
 from backend.tools.functions import get_tools, get_available_functions
-from backend.tools.helpers import get_function_and_args
+from backend.tools.executor import TOOL_EXECUTOR
+from backend.tools.assembler import ToolCallAssembler
+from backend.models.segmentation import PhraseSegmenter
+from backend.models.providers import ProviderPool
+from backend.tts.fillers import FillerCue
+from backend.telemetry.queues import WatermarkQueue
+from backend.endpoints.cancellation import unless_stopped, until_stopped
+from backend.telemetry.tracing import TurnTrace
 
 def log_segment(segment: str) -> None:
     """Prints the segment if logging is enabled in the config."""
@@ -32,164 +38,215 @@ def extract_content_from_openai_chunk(chunk: Any) -> Optional[str]:
     except (IndexError, AttributeError):
         return None
 
-def compile_delimiter_pattern(delimiters: List[str]) -> Optional[re.Pattern]:
-    if not delimiters:
-        return None
-    sorted_delims = sorted(delimiters, key=len, reverse=True)
-    escaped = map(re.escape, sorted_delims)
-    pattern = "|".join(escaped)
-    return re.compile(pattern)
-
-async def process_chunks(chunk_queue: asyncio.Queue,
-                         phrase_queue: asyncio.Queue,
-                         delimiter_pattern: Optional[re.Pattern],
-                         use_segmentation: bool,
-                         character_max: int):
-    working_string = ""
-    chars_processed = 0
-    segmentation_active = use_segmentation
+async def process_chunks(chunk_queue: WatermarkQueue,
+                         phrase_queue: WatermarkQueue,
+                         segmenter: Optional[PhraseSegmenter],
+                         flush_deadline: Optional[float],
+                         trace: Optional[TurnTrace] = None):
+    """
+    Turns streamed text from `chunk_queue` into phrases on `phrase_queue`.
+    If text has been pending for `flush_deadline` seconds without a phrase
+    being emitted, a clause-level flush is forced so TTS keeps moving.
+    Putting a phrase blocks while `phrase_queue` is full, which in turn
+    holds back the model stream feeding `chunk_queue`.
+    """
+    try:
+        await _process_chunks(chunk_queue, phrase_queue, segmenter, flush_deadline, trace)
+    finally:
+        chunk_queue.close()
+
+async def _process_chunks(chunk_queue: WatermarkQueue,
+                          phrase_queue: WatermarkQueue,
+                          segmenter: Optional[PhraseSegmenter],
+                          flush_deadline: Optional[float],
+                          trace: Optional[TurnTrace]):
+    loop = asyncio.get_running_loop()
+    pending_since = None
+
+    async def emit(phrase: Optional[str]):
+        nonlocal pending_since
+        if phrase:
+            log_segment(phrase)
+            if trace is not None:
+                trace.mark("first_phrase")
+            await phrase_queue.put(phrase)
+            pending_since = loop.time() if segmenter.pending else None
 
+    working_string = ""
     while True:
-        chunk = await chunk_queue.get()
-        if chunk is None:
-            if working_string.strip():
-                phrase = working_string.strip()
-                log_segment(phrase)
-                await phrase_queue.put(phrase)
-            await phrase_queue.put(None)
+        timeout = None
+        if segmenter and flush_deadline and pending_since is not None:
+            timeout = max(0.0, pending_since + flush_deadline - loop.time())
+        try:
+            content = await asyncio.wait_for(chunk_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            phrase = segmenter.flush_stalled()
+            if phrase:
+                await emit(phrase)
+            else:
+                # Nothing to cut at yet; wait for the next boundary before retrying.
+                pending_since = None
+            continue
+
+        if content is None:
+            remainder = segmenter.finish() if segmenter else working_string.strip()
+            if remainder:
+                log_segment(remainder)
+                if trace is not None:
+                    trace.mark("first_phrase")
+                await phrase_queue.put(remainder)
+            phrase_queue.force_put(None)
             break
 
-        content = extract_content_from_openai_chunk(chunk)
-        if content:
-            working_string += content
-            if segmentation_active and delimiter_pattern:
-                while True:
-                    match = delimiter_pattern.search(working_string)
-                    if match:
-                        end_idx = match.end()
-                        phrase = working_string[:end_idx].strip()
-                        if phrase:
-                            log_segment(phrase)
-                            await phrase_queue.put(phrase)
-                            chars_processed += len(phrase)
-                        working_string = working_string[end_idx:]
-                        if chars_processed >= character_max:
-                            segmentation_active = False
-                            break
-                    else:
-                        break
+        if isinstance(content, FillerCue):
+            # Speak any lead-in text before the cue, then hand the cue to TTS.
+            remainder = segmenter.finish() if segmenter else None
+            if remainder:
+                await emit(remainder)
+            pending_since = None
+            phrase_queue.force_put(content)
+            continue
 
-async def validate_messages_for_ws(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if segmenter is None:
+            working_string += content
+            continue
+        if pending_since is None:
+            pending_since = loop.time()
+        for phrase in segmenter.feed(content):
+            await emit(phrase)
+
+def validate_message(msg: Any, idx: int) -> Dict[str, str]:
+    """Validate a single client message and convert it to a role/content dict."""
+    if not isinstance(msg, dict):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} must be a dictionary.")
+    sender = msg.get("sender")
+    text = msg.get("text")
+    if not sender or not isinstance(sender, str):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'sender'.")
+    if not text or not isinstance(text, str):
+        raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'text'.")
+    role = 'user' if sender.lower() == 'user' else 'assistant' if sender.lower() == 'assistant' else None
+    if role is None:
+        raise HTTPException(status_code=400, detail=f"Invalid sender at index {idx}.")
+    return {"role": role, "content": text}
+
+def validate_message_list(messages: Any) -> List[Dict[str, str]]:
+    """Validate a list of client messages without adding the system prompt."""
     if not isinstance(messages, list):
         raise HTTPException(status_code=400, detail="'messages' must be a list.")
-    prepared = []
-    for idx, msg in enumerate(messages):
-        if not isinstance(msg, dict):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} must be a dictionary.")
-        sender = msg.get("sender")
-        text = msg.get("text")
-        if not sender or not isinstance(sender, str):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'sender'.")
-        if not text or not isinstance(text, str):
-            raise HTTPException(status_code=400, detail=f"Message at index {idx} missing valid 'text'.")
-        role = 'user' if sender.lower() == 'user' else 'assistant' if sender.lower() == 'assistant' else None
-        if role is None:
-            raise HTTPException(status_code=400, detail=f"Invalid sender at index {idx}.")
-        prepared.append({"role": role, "content": text})
-    system_prompt = {"role": "system", "content": CONFIG["SYSTEM_PROMPT"]["CONTENT"]}
-    prepared.insert(0, system_prompt)
+    return [validate_message(msg, idx) for idx, msg in enumerate(messages)]
+
+def build_model_messages(history: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Prefix already-validated history with the system prompt for a model call."""
+    prepared = [{"role": "system", "content": CONFIG["SYSTEM_PROMPT"]["CONTENT"]}]
+    prepared.extend(history)
     return prepared
 
+async def validate_messages_for_ws(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return build_model_messages(validate_message_list(messages))
+
+def _tool_filler_category(tc_chunk: Any) -> str:
+    """Filler category for a tool call: its function name, if that has phrases of its own."""
+    name = tc_chunk.function.name if tc_chunk.function is not None else None
+    return name if name and name in CONFIG["FILLERS"]["PHRASES"] else "tool"
+
 async def stream_openai_completion(client, model: str, messages: Sequence[Dict[str, Union[str, Any]]],
-                                   phrase_queue: asyncio.Queue,
-                                   stop_event: asyncio.Event) -> AsyncIterator[str]:
-    delimiter_pattern = compile_delimiter_pattern(CONFIG["PROCESSING_PIPELINE"]["DELIMITERS"])
+                                   phrase_queue: WatermarkQueue,
+                                   stop_event: asyncio.Event,
+                                   trace: Optional[TurnTrace] = None) -> AsyncIterator[str]:
     use_segmentation = CONFIG["PROCESSING_PIPELINE"]["USE_SEGMENTATION"]
-    character_max = CONFIG["PROCESSING_PIPELINE"]["CHARACTER_MAXIMUM"]
+    segmenter = PhraseSegmenter.from_config() if use_segmentation else None
+    flush_deadline = CONFIG["PROCESSING_PIPELINE"]["FLUSH_DEADLINE_MS"] / 1000.0
 
-    chunk_queue = asyncio.Queue()
+    trace = trace or TurnTrace()
+    chunk_queue = WatermarkQueue.from_config("chunk")
     chunk_processor_task = asyncio.create_task(
-        process_chunks(chunk_queue, phrase_queue, delimiter_pattern, use_segmentation, character_max)
+        process_chunks(chunk_queue, phrase_queue, segmenter, flush_deadline, trace)
     )
+    usage_request = {"extra_body": {"stream_options": {"include_usage": True}}} \
+        if CONFIG["TRACING"]["STREAM_USAGE"] else {}
 
+    assembler = None
+    response = follow_up = None
     try:
-        response = await client.chat.completions.create(
-            model=model,
+        # `client` may be a ProviderPool (hedging/failover) or a plain AsyncOpenAI client.
+        pool = client if isinstance(client, ProviderPool) else ProviderPool.single(client, model)
+        # A stop abandons whichever network read or tool call is pending.
+        trace.mark("llm_request")
+        response = await unless_stopped(pool.open_stream(
             messages=messages,
             tools=get_tools(),
             tool_choice="auto",
-            stream=True,
             temperature=0.7,
             top_p=1.0,
-        )
-
-        tool_calls = []
+            **usage_request,
+        ), stop_event)
 
-        async for chunk in response:
-            if stop_event.is_set():
-                try:
-                    await response.close()
-                except Exception:
-                    pass
-                break
+        # Tool calls start running as soon as their arguments are complete.
+        assembler = ToolCallAssembler(TOOL_EXECUTOR, get_available_functions())
+        tool_calls = assembler.tool_calls
 
+        async for chunk in until_stopped(response, stop_event):
+            trace.count_tokens(usage=getattr(chunk, "usage", None))
             delta = chunk.choices[0].delta if chunk.choices and chunk.choices[0].delta else None
             if delta and delta.content:
+                trace.mark("first_token")
+                trace.mark("last_token", last=True)
+                trace.count_tokens(deltas=1)
                 yield delta.content
-                await chunk_queue.put(chunk)
+                await chunk_queue.put(delta.content)
             elif delta and delta.tool_calls:
-                tc_list = delta.tool_calls
-                for tc_chunk in tc_list:
-                    while len(tool_calls) <= tc_chunk.index:
-                        tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
-                    tc = tool_calls[tc_chunk.index]
-                    if tc_chunk.id:
-                        tc["id"] += tc_chunk.id
-                    if tc_chunk.function.name:
-                        tc["function"]["name"] += tc_chunk.function.name
-                    if tc_chunk.function.arguments:
-                        tc["function"]["arguments"] += tc_chunk.function.arguments
-
-        if not stop_event.is_set() and tool_calls:
+                if not tool_calls:
+                    trace.mark("first_token")
+                    trace.mark("tool_start")
+                    chunk_queue.force_put(FillerCue(_tool_filler_category(delta.tool_calls[0])))
+                for tc_chunk in delta.tool_calls:
+                    assembler.feed(tc_chunk)
+
+        if stop_event.is_set():
+            assembler.cancel()
+        elif tool_calls:
             messages.append({"role": "assistant", "tool_calls": tool_calls})
             log_tool_calls(tool_calls)
-            funcs = get_available_functions()
-            for tc in tool_calls:
-                try:
-                    fn, fn_args = get_function_and_args(tc, funcs)
-                    resp = fn(**fn_args)
-                    log_function_call_result(fn.__name__, resp)
-                    messages.append({
-                        "tool_call_id": tc["id"],
-                        "role": "tool",
-                        "name": fn.__name__,
-                        "content": json.dumps(resp)
-                    })
-                except ValueError as e:
-                    messages.append({"role": "assistant", "content": f"[Error]: {str(e)}"})
+            results = await unless_stopped(assembler.finish(), stop_event)
+            trace.mark("tool_end")
+            if results is None:
+                assembler.cancel()
+            for tool_message, result in results or ():
+                log_function_call_result(tool_message["name"], result)
+                messages.append(tool_message)
             if not stop_event.is_set():
-                follow_up = await client.chat.completions.create(
-                    model=model,
+                # Stay on the provider that produced the tool calls when it is healthy.
+                follow_up = await unless_stopped(pool.open_stream(
+                    preferred=response.provider,
                     messages=messages,
-                    stream=True,
                     temperature=0.7,
                     top_p=1.0,
-                )
-                async for fu_chunk in follow_up:
-                    if stop_event.is_set():
-                        try:
-                            await follow_up.close()
-                        except Exception:
-                            pass
-                        break
+                    **usage_request,
+                ), stop_event)
+                async for fu_chunk in until_stopped(follow_up, stop_event):
+                    trace.count_tokens(usage=getattr(fu_chunk, "usage", None))
                     content = extract_content_from_openai_chunk(fu_chunk)
                     if content:
+                        trace.mark("followup_first_token")
+                        trace.mark("last_token", last=True)
+                        trace.count_tokens(deltas=1)
                         yield content
-                    await chunk_queue.put(fu_chunk)
+                        await chunk_queue.put(content)
 
-        await chunk_queue.put(None)
+        chunk_queue.force_put(None)
         await chunk_processor_task
 
     except Exception as e:
-        await chunk_queue.put(None)
+        if assembler is not None:
+            assembler.cancel()
+        chunk_queue.force_put(FillerCue("error"))
+        chunk_queue.force_put(None)
         raise HTTPException(status_code=500, detail=f"OpenAI API error: {e}")
+    finally:
+        # Also reached when the consumer stops iterating early.
+        chunk_queue.force_put(None)
+        if stop_event.is_set():
+            for stream in (response, follow_up):
+                if stream is not None:
+                    await stream.close()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from backend.config.client import CLIENT_MANAGER
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+async def close_stream(stream: Any) -> None:
+    """Close an OpenAI stream, whichever close API this SDK version offers."""
+    try:
+        if hasattr(stream, "close"):
+            await stream.close()
+        elif hasattr(stream, "response"):
+            await stream.response.aclose()
+    except Exception:
+        pass
+
+
+class Provider:
+    """One OpenAI-compatible endpoint and the model to use on it."""
+    def __init__(self, name: str, client: Any, model: str):
+        self.name = name
+        self.client = client
+        self.model = model
+        self.ttft = METRICS.histogram("llm_ttft_seconds", "Time to first streamed chunk", {"provider": name})
+
+    def __repr__(self) -> str:
+        return f"Provider({self.name!r}, model={self.model!r})"
+
+
+class ProviderStream:
+    """A streaming completion that has already produced its first chunk."""
+    def __init__(self, provider: Provider, stream: Any, first_chunk: Any, ttft: float):
+        self.provider = provider
+        self.ttft = ttft
+        self._stream = stream
+        self._first_chunk = first_chunk
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self._first_chunk is not None:
+            first, self._first_chunk = self._first_chunk, None
+            yield first
+        async for chunk in self._stream:
+            yield chunk
+
+    async def close(self) -> None:
+        await close_stream(self._stream)
+
+
+class ProviderPool:
+    """
+    Ordered set of LLM providers built from CONFIG["API_SERVICES"].
+
+    A request goes to the preferred provider first. If it has not produced
+    a first chunk within `hedge_delay` seconds, the same request is sent to
+    the next provider and whichever answers first wins; the other request is
+    cancelled. A provider that errors before its first chunk is failed over
+    to the next one.
+    """
+    def __init__(self, providers: List[Provider], hedge_delay: Optional[float] = None, failover: bool = True):
+        if not providers:
+            raise ValueError("ProviderPool needs at least one provider")
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+        self.failover = failover
+
+    @classmethod
+    def from_config(cls) -> "ProviderPool":
+        settings = CONFIG["API_SETTINGS"]
+        primary = settings["API_HOST"].lower()
+        if primary not in CONFIG["API_SERVICES"]:
+            raise ValueError(f"Unsupported API_HOST: {primary}")
+        names = [primary] + [n.lower() for n in settings.get("FALLBACK_HOSTS", []) if n.lower() != primary]
+
+        providers = []
+        for name in names:
+            service = CONFIG["API_SERVICES"].get(name)
+            if service is None:
+                logger.warning(f"Ignoring unknown fallback host: {name}")
+                continue
+            api_key = os.getenv(service["API_KEY_ENV"])
+            if not api_key and name != primary:
+                logger.info(f"Skipping fallback host {name}: {service['API_KEY_ENV']} is not set")
+                continue
+            client = CLIENT_MANAGER.openai_client(api_key, service["BASE_URL"])
+            providers.append(Provider(name, client, service["MODEL"]))
+
+        hedge_ms = settings.get("HEDGE_AFTER_MS")
+        return cls(providers, hedge_delay=hedge_ms / 1000.0 if hedge_ms else None,
+                   failover=settings.get("FAILOVER", True))
+
+    @classmethod
+    def single(cls, client: Any, model: str, name: str = "default") -> "ProviderPool":
+        return cls([Provider(name, client, model)], failover=False)
+
+    @property
+    def primary(self) -> Provider:
+        return self.providers[0]
+
+    def _ordered(self, preferred: Optional[Provider]) -> List[Provider]:
+        if preferred is None or preferred not in self.providers:
+            return list(self.providers)
+        return [preferred] + [p for p in self.providers if p is not preferred]
+
+    async def _open(self, provider: Provider, request: Dict[str, Any]) -> ProviderStream:
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        stream = await provider.client.chat.completions.create(model=provider.model, stream=True, **request)
+        try:
+            first_chunk = await stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = None
+        except BaseException:
+            await close_stream(stream)
+            raise
+        ttft = loop.time() - start
+        provider.ttft.observe(ttft)
+        return ProviderStream(provider, stream, first_chunk, ttft)
+
+    async def _discard(self, tasks: List[asyncio.Task]) -> None:
+        for task in tasks:
+            task.cancel()
+        for result in await asyncio.gather(*tasks, return_exceptions=True):
+            if isinstance(result, ProviderStream):
+                await result.close()
+
+    async def open_stream(self, preferred: Optional[Provider] = None, **request: Any) -> ProviderStream:
+        """Start a streaming chat completion; `request` is passed to chat.completions.create."""
+        order = self._ordered(preferred)
+        running: Dict[asyncio.Task, Provider] = {}
+        next_index = 0
+        hedged = False
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            nonlocal next_index
+            provider = order[next_index]
+            next_index += 1
+            running[asyncio.create_task(self._open(provider, request))] = provider
+
+        launch()
+        try:
+            while running:
+                can_hedge = self.hedge_delay and not hedged and next_index < len(order)
+                done, _ = await asyncio.wait(
+                    running, timeout=self.hedge_delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    hedged = True
+                    logger.info(f"No first token from {order[next_index - 1].name} after "
+                                f"{self.hedge_delay * 1000:.0f} ms, hedging to {order[next_index].name}")
+                    METRICS.counter("llm_hedged_requests_total", "Requests hedged to a second provider").inc()
+                    launch()
+                    continue
+
+                winner = None
+                for task in done:
+                    provider = running.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"Provider {provider.name} failed: {last_error}")
+                        METRICS.counter("llm_provider_errors_total", "Provider errors before the first token",
+                                        {"provider": provider.name}).inc()
+                    elif winner is None:
+                        winner = task.result()
+                    else:
+                        await task.result().close()
+
+                if winner is not None:
+                    await self._discard(list(running))
+                    running.clear()
+                    METRICS.counter("llm_requests_won_total", "Streams served by each provider",
+                                    {"provider": winner.provider.name}).inc()
+                    return winner
+
+                if not running and self.failover and next_index < len(order):
+                    logger.info(f"Failing over to {order[next_index].name}")
+                    launch()
+        except BaseException:
+            await self._discard(list(running))
+            raise
+
+        raise last_error if last_error else RuntimeError("No LLM provider available")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+import re
+from typing import List, Optional, Sequence
+
+from backend.config.config import CONFIG
+
+
+def compile_delimiter_pattern(delimiters: Sequence[str]) -> Optional[re.Pattern]:
+    if not delimiters:
+        return None
+    sorted_delims = sorted(delimiters, key=len, reverse=True)
+    escaped = map(re.escape, sorted_delims)
+    pattern = "|".join(escaped)
+    return re.compile(pattern)
+
+
+class PhraseSegmenter:
+    """
+    Incrementally splits streamed model text into phrases for TTS.
+
+    Only text that arrived since the last call is scanned. A sentence
+    delimiter is ignored when it closes a known abbreviation or a single
+    initial ("Dr.", "J."); decimals like "3.5" never match because the
+    delimiters require trailing whitespace. Phrase sizes follow a growth
+    schedule: the first phrase may end at a clause boundary as soon as it
+    reaches the first minimum, later phrases wait for a sentence boundary
+    and a larger minimum. `flush_stalled` lets the caller force a
+    clause-level flush when the model stops producing tokens.
+    """
+    def __init__(self, delimiters: Sequence[str], clause_delimiters: Sequence[str],
+                 abbreviations: Sequence[str], size_schedule: Sequence[int],
+                 max_phrase_chars: int):
+        self._sentence_delims = set(delimiters)
+        self._pattern = compile_delimiter_pattern(list(delimiters) + list(clause_delimiters))
+        self._lookback = max((len(d) for d in self._sentence_delims | set(clause_delimiters)), default=1) - 1
+        self._abbreviations = {a.lower().rstrip(".") for a in abbreviations}
+        self._schedule = list(size_schedule) or [0]
+        self._max_phrase_chars = max_phrase_chars
+        self._buffer = ""
+        self._scan_pos = 0
+        self._sentence_end = 0
+        self._clause_end = 0
+        self._phrases_emitted = 0
+
+    @classmethod
+    def from_config(cls) -> "PhraseSegmenter":
+        pipeline = CONFIG["PROCESSING_PIPELINE"]
+        return cls(
+            delimiters=pipeline["DELIMITERS"],
+            clause_delimiters=pipeline["CLAUSE_DELIMITERS"],
+            abbreviations=pipeline["ABBREVIATIONS"],
+            size_schedule=pipeline["PHRASE_SIZE_SCHEDULE"],
+            max_phrase_chars=pipeline["MAX_PHRASE_CHARS"],
+        )
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._buffer.strip())
+
+    def _min_chars(self) -> int:
+        return self._schedule[min(self._phrases_emitted, len(self._schedule) - 1)]
+
+    def _is_abbreviation(self, delim_start: int) -> bool:
+        if self._buffer[delim_start] != ".":
+            return False
+        word_start = delim_start
+        while word_start > 0 and not self._buffer[word_start - 1].isspace():
+            word_start -= 1
+        word = self._buffer[word_start:delim_start].lstrip("(\"'")
+        if not word:
+            return False
+        if len(word) == 1 and word.isalpha() and word.isupper():
+            return True
+        return word.lower() in self._abbreviations
+
+    def _take(self, end: int) -> Optional[str]:
+        phrase = self._buffer[:end].strip()
+        self._buffer = self._buffer[end:]
+        self._scan_pos = 0
+        self._sentence_end = 0
+        self._clause_end = 0
+        if not phrase:
+            return None
+        self._phrases_emitted += 1
+        return phrase
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return any phrases that are ready."""
+        phrases: List[str] = []
+        if not text:
+            return phrases
+        self._buffer += text
+        if self._pattern is None:
+            return phrases
+
+        while True:
+            match = self._pattern.search(self._buffer, self._scan_pos)
+            if match is None:
+                self._scan_pos = max(self._scan_pos, len(self._buffer) - self._lookback)
+                break
+            end = match.end()
+            self._scan_pos = end
+            is_sentence = match.group() in self._sentence_delims
+            if is_sentence and self._is_abbreviation(match.start()):
+                continue
+            if is_sentence:
+                self._sentence_end = end
+            else:
+                self._clause_end = end
+
+            length = len(self._buffer[:end].strip())
+            first_phrase = self._phrases_emitted == 0
+            if length >= self._min_chars() and (is_sentence or first_phrase):
+                phrase = self._take(end)
+                if phrase:
+                    phrases.append(phrase)
+
+        if len(self._buffer) > self._max_phrase_chars:
+            phrase = self._split_long()
+            if phrase:
+                phrases.append(phrase)
+        return phrases
+
+    def _split_long(self) -> Optional[str]:
+        """Cut an over-long buffer at the best boundary seen so far."""
+        end = self._sentence_end or self._clause_end
+        if not end:
+            end = self._buffer.rfind(" ", 0, self._max_phrase_chars) + 1
+        if end <= 0:
+            end = self._max_phrase_chars
+        return self._take(end)
+
+    def flush_stalled(self) -> Optional[str]:
+        """Emit text up to the last sentence or clause boundary, if any."""
+        end = max(self._sentence_end, self._clause_end)
+        if not end:
+            return None
+        return self._take(end)
+
+    def finish(self) -> Optional[str]:
+        """Return whatever text is left once the stream has ended."""
+        return self._take(len(self._buffer))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+import bisect
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from sub-millisecond cache hits to slow provider calls.
+DEFAULT_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 30.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Optional[Dict[str, str]]) -> LabelKey:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (
+        f'{key}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+        for key, value in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing value."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help_text
+        self.labels = dict(labels or {})
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value}
+
+
+class Gauge:
+    """Value that can go up and down; also remembers its high-water mark."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help_text
+        self.labels = dict(labels or {})
+        self.value = 0.0
+        self.max_value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+            self.max_value = max(self.max_value, value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+            self.max_value = max(self.max_value, self.value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"value": self.value, "max": self.max_value}
+
+
+class Histogram:
+    """Fixed-bucket histogram with interpolated quantiles."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None,
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = dict(labels or {})
+        self.buckets: List[float] = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max_value = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.max_value = max(self.max_value, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate the q-quantile by linear interpolation inside its bucket."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = q * self.count
+            seen = 0
+            for idx, bucket_count in enumerate(self.counts):
+                if seen + bucket_count >= rank and bucket_count:
+                    lower = self.buckets[idx - 1] if idx > 0 else 0.0
+                    upper = self.buckets[idx] if idx < len(self.buckets) else self.max_value
+                    fraction = (rank - seen) / bucket_count
+                    return min(lower + (upper - lower) * fraction, self.max_value)
+                seen += bucket_count
+            return self.max_value
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        with self._lock:
+            total = 0
+            result = []
+            for bound, bucket_count in zip(self.buckets + [float("inf")], self.counts):
+                total += bucket_count
+                result.append((bound, total))
+            return result
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max_value,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide registry; metrics are created on first use and shared afterwards."""
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labels: Optional[Dict[str, str]], **kwargs):
+        key = (name, _label_key(labels))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = cls(name, help_text, labels, **kwargs)
+                self._metrics[key] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", labels: Optional[Dict[str, str]] = None,
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labels, buckets=buckets)
+
+    def all(self) -> List[object]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, List[Dict[str, object]]]:
+        result: Dict[str, List[Dict[str, object]]] = {}
+        for metric in self.all():
+            entry = {"labels": metric.labels}
+            entry.update(metric.snapshot())
+            result.setdefault(metric.name, []).append(entry)
+        return result
+
+    def prometheus_text(self) -> str:
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        families: Dict[str, List[object]] = {}
+        for metric in self.all():
+            families.setdefault(metric.name, []).append(metric)
+        lines: List[str] = []
+        for name in sorted(families):
+            metrics = families[name]
+            help_text = next((m.help for m in metrics if m.help), "")
+            if help_text:
+                lines.append(f"# HELP {name} " + help_text.replace("\\", "\\\\").replace("\n", "\\n"))
+            lines.append(f"# TYPE {name} {metrics[0].kind}")
+            for metric in metrics:
+                if isinstance(metric, Histogram):
+                    for bound, total in metric.cumulative_counts():
+                        lines.append(f"{name}_bucket{_format_labels(metric.labels, {'le': _format_value(bound)})} {total}")
+                    lines.append(f"{name}_sum{_format_labels(metric.labels)} {_format_value(metric.sum)}")
+                    lines.append(f"{name}_count{_format_labels(metric.labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_format_labels(metric.labels)} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,116 @@
+import time
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+
+
+class WatermarkQueue:
+    """
+    asyncio queue bounded by high/low watermarks, with depth and wait-time metrics.
+
+    `put()` blocks once the queue holds `high` units and resumes when the
+    consumer has drained it to `low`. Units are items, or `sizeof(item)`
+    bytes for buffers when `sizeof` is given (other objects, such as
+    sentinels, count as zero). `force_put()` never blocks and is for end-of-stream
+    sentinels and cues that must not wait behind a full queue.
+
+    A consumer that stops reading calls `close()`: waiting and later puts
+    return at once and their items are discarded, so producers never hang
+    on a queue nobody reads. Gets on a closed queue return None, the
+    end-of-stream sentinel every consumer already handles.
+    """
+    def __init__(self, name: str, high: int, low: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None):
+        self.name = name
+        self.high = high
+        self.low = high // 4 if low is None else min(low, high)
+        self.sizeof = sizeof
+        self.size = 0
+        self.closed = False
+        self._items: Deque[Any] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        labels = {"queue": name}
+        unit = "bytes" if sizeof else "items"
+        self._depth = METRICS.gauge(f"queue_depth_{unit}", "Units held in per-turn queues", labels)
+        self._put_wait = METRICS.histogram("queue_put_wait_seconds", "Time producers spent blocked at the high watermark", labels)
+        self._get_wait = METRICS.histogram("queue_get_wait_seconds", "Time consumers spent waiting on an empty queue", labels)
+        self._blocked = METRICS.counter("queue_blocked_puts_total", "Puts that hit the high watermark", labels)
+
+    @classmethod
+    def from_config(cls, name: str) -> "WatermarkQueue":
+        settings = CONFIG["QUEUES"][name.upper()]
+        return cls(name, settings["HIGH"], settings["LOW"], len if settings.get("BYTES") else None)
+
+    def _units(self, item: Any) -> int:
+        if self.sizeof is None:
+            return 1
+        return self.sizeof(item) if isinstance(item, (bytes, bytearray, memoryview)) else 0
+
+    def _push(self, item: Any) -> None:
+        if self.closed:
+            return
+        units = self._units(item)
+        self._items.append(item)
+        self.size += units
+        self._depth.inc(units)
+        if self.size >= self.high:
+            self._writable.clear()
+        self._readable.set()
+
+    async def put(self, item: Any) -> None:
+        if not self._writable.is_set() and not self.closed:
+            self._blocked.inc()
+            start = time.perf_counter()
+            await self._writable.wait()
+            self._put_wait.observe(time.perf_counter() - start)
+        self._push(item)
+
+    def force_put(self, item: Any) -> None:
+        self._push(item)
+
+    def _pop(self) -> Any:
+        item = self._items.popleft()
+        units = self._units(item)
+        self.size -= units
+        self._depth.dec(units)
+        if not self._items:
+            self._readable.clear()
+        if self.size <= self.low:
+            self._writable.set()
+        return item
+
+    async def get(self) -> Any:
+        if not self._items:
+            start = time.perf_counter()
+            while not self._items:
+                if self.closed:
+                    return None
+                await self._readable.wait()
+            self._get_wait.observe(time.perf_counter() - start)
+        return self._pop()
+
+    def get_nowait(self) -> Any:
+        if not self._items:
+            raise asyncio.QueueEmpty()
+        return self._pop()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def close(self) -> None:
+        """Drop anything still queued and stop accepting (or blocking) puts."""
+        self.closed = True
+        self._depth.dec(self.size)
+        self._items.clear()
+        self.size = 0
+        # Wake waiting getters; they see `closed` and return None.
+        self._readable.set()
+        self._writable.set()
@@ -0,0 +1,96 @@
+import time
+import uuid
+import logging
+from typing import Any, Dict, Optional
+
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Stages in the order a plain voice turn passes through them; tool turns add
+# tool_start, tool_end and followup_first_token between first_token and the TTS stages.
+TURN_STAGES = (
+    "received",
+    "validated",
+    "llm_request",
+    "first_token",
+    "tool_start",
+    "tool_end",
+    "followup_first_token",
+    "first_phrase",
+    "first_tts_request",
+    "first_tts_byte",
+    "first_audio_frame",
+    "last_audio_frame",
+)
+
+
+class TurnTrace:
+    """
+    Timestamps of one chat turn's stages, relative to the chat message
+    arriving. The first `mark()` of a stage wins, except for stages marked
+    with `last=True` (e.g. the last audio frame). `finish()` feeds each
+    stage into the turn_stage_seconds histogram.
+    """
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {"received": 0.0}
+        self.prompt_tokens: Optional[int] = None
+        self.completion_tokens = 0
+        self.usage_reported = False
+        self._finished = False
+
+    def mark(self, stage: str, last: bool = False) -> None:
+        if last or stage not in self.stages:
+            self.stages[stage] = time.perf_counter() - self.started
+
+    def count_tokens(self, usage: Any = None, deltas: int = 0) -> None:
+        """
+        Token usage from the stream's usage chunk when the provider sends one;
+        otherwise content deltas are counted (about one token each).
+        """
+        if usage is not None:
+            get = usage.get if isinstance(usage, dict) else lambda key: getattr(usage, key, None)
+            self.prompt_tokens = (self.prompt_tokens or 0) + (get("prompt_tokens") or 0)
+            if not self.usage_reported:
+                self.completion_tokens = 0
+            self.completion_tokens += get("completion_tokens") or 0
+            self.usage_reported = True
+        elif not self.usage_reported:
+            self.completion_tokens += deltas
+
+    def tokens_per_second(self) -> Optional[float]:
+        first = self.stages.get("first_token")
+        last = self.stages.get("last_token")
+        if first is None or last is None or last <= first or self.completion_tokens < 2:
+            return None
+        return self.completion_tokens / (last - first)
+
+    def finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        for stage, elapsed in self.stages.items():
+            if stage in TURN_STAGES and stage != "received":
+                METRICS.histogram("turn_stage_seconds", "Time from chat message to each turn stage",
+                                  {"stage": stage}).observe(elapsed)
+        METRICS.counter("llm_completion_tokens_total", "Completion tokens streamed").inc(self.completion_tokens)
+        if self.prompt_tokens:
+            METRICS.counter("llm_prompt_tokens_total", "Prompt tokens reported by providers").inc(self.prompt_tokens)
+        rate = self.tokens_per_second()
+        if rate is not None:
+            METRICS.histogram("llm_tokens_per_second", "Completion tokens per second after the first token",
+                              buckets=(5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500)).observe(rate)
+        logger.info(f"Turn {self.trace_id}: " + ", ".join(
+            f"{stage} {self.stages[stage] * 1000:.0f}ms" for stage in TURN_STAGES if stage in self.stages
+        ) + f", {self.completion_tokens} tokens" + (f" at {rate:.0f}/s" if rate else ""))
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "stages_ms": {stage: round(elapsed * 1000, 1) for stage, elapsed in self.stages.items()},
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second(),
+        }
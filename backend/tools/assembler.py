@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from backend.tools.executor import ToolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCompletionScanner:
+    """
+    Incremental scanner that reports when a streamed top-level JSON object
+    or array is complete. Only brackets outside strings are counted, so
+    each character is looked at exactly once.
+    """
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.complete = False
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> bool:
+        if self.complete:
+            return True
+        for char in text:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self.depth += 1
+                self.started = True
+            elif char in "}]":
+                self.depth -= 1
+                if self.started and self.depth == 0:
+                    self.complete = True
+                    break
+        return self.complete
+
+
+class ToolCallAssembler:
+    """
+    Rebuilds tool calls from streamed `delta.tool_calls` fragments and starts
+    each call as soon as its JSON arguments are complete, while the model is
+    still streaming the rest of the response.
+    """
+    def __init__(self, executor: ToolExecutor, available_functions: Dict[str, Callable]):
+        self.executor = executor
+        self.available_functions = available_functions
+        self.tool_calls: List[Dict[str, Any]] = []
+        self._scanners: List[JsonCompletionScanner] = []
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def feed(self, tc_chunk: Any) -> None:
+        while len(self.tool_calls) <= tc_chunk.index:
+            self.tool_calls.append({"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+            self._scanners.append(JsonCompletionScanner())
+        index = tc_chunk.index
+        if index in self._tasks:
+            return
+        tc = self.tool_calls[index]
+        if tc_chunk.id:
+            tc["id"] += tc_chunk.id
+        function = tc_chunk.function
+        if function is not None and function.name:
+            tc["function"]["name"] += function.name
+        if function is not None and function.arguments:
+            tc["function"]["arguments"] += function.arguments
+            if self._scanners[index].feed(function.arguments):
+                self._dispatch(index)
+
+    def _dispatch(self, index: int, force: bool = False) -> None:
+        tc = self.tool_calls[index]
+        if index in self._tasks or not (tc["function"]["name"] or force):
+            return
+        logger.debug(f"Dispatching tool call {tc['function']['name']} ({tc['id']}) before the stream ended")
+        self._tasks[index] = asyncio.create_task(self.executor.run_tool_call(tc, self.available_functions))
+
+    async def finish(self) -> List[Tuple[Dict[str, Any], Any]]:
+        """Start any calls that never looked complete, then wait for all results in call order."""
+        for index in range(len(self.tool_calls)):
+            self._dispatch(index, force=True)
+        return list(await asyncio.gather(*(self._tasks[i] for i in sorted(self._tasks))))
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
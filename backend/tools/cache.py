@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable
+
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded cache for blocking tool results.
+
+    Fresh entries (younger than `ttl`) are returned directly. Stale entries
+    (younger than `ttl + stale_ttl`) are returned too, while a background
+    thread refreshes them. Concurrent misses for the same key share one
+    in-flight load. The least recently used entry is evicted past `max_entries`.
+    """
+    def __init__(self, name: str, ttl: float, stale_ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{name}-refresh")
+
+    def _count(self, result: str) -> None:
+        METRICS.counter("tool_cache_requests_total", "Tool cache lookups by result",
+                        {"cache": self.name, "result": result}).inc()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, fetched_at = entry
+                age = now - fetched_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._count("hit")
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._count("stale")
+                    if key not in self._inflight:
+                        future = Future()
+                        self._inflight[key] = future
+                        self._refresher.submit(self._refresh, key, loader, future)
+                    return value
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            self._count("coalesced")
+            return future.result()
+        self._count("miss")
+        return self._load(key, loader, future)
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], future: Future) -> Any:
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], future: Future) -> None:
+        try:
+            self._load(key, loader, future)
+        except Exception as e:
+            # Keep serving the stale value; the next lookup will try again.
+            logger.warning(f"Background refresh of {self.name} failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+from backend.tools.helpers import get_function_and_args
+
+logger = logging.getLogger(__name__)
+
+
+class ToolExecutor:
+    """
+    Runs model tool calls without blocking the event loop.
+    Sync tools go to a bounded thread pool, async tools are awaited directly,
+    and every call gets a timeout and a latency sample.
+    """
+    def __init__(self, max_workers: int, default_timeout: float, timeouts: Optional[Dict[str, float]] = None):
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    @classmethod
+    def from_config(cls) -> "ToolExecutor":
+        settings = CONFIG["TOOLS"]
+        return cls(settings["MAX_WORKERS"], settings["TIMEOUT_S"], settings["TIMEOUTS"])
+
+    async def run(self, fn: Callable, args: Dict[str, Any]) -> Any:
+        """Run one tool and return its result; raises on error or timeout."""
+        name = fn.__name__
+        timeout = self.timeouts.get(name, self.default_timeout)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            if inspect.iscoroutinefunction(fn):
+                pending = fn(**args)
+            else:
+                loop = asyncio.get_running_loop()
+                pending = loop.run_in_executor(self._pool, functools.partial(fn, **args))
+            result = await asyncio.wait_for(pending, timeout)
+            outcome = "ok"
+            return result
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise TimeoutError(f"Tool '{name}' timed out after {timeout}s")
+        finally:
+            elapsed = time.perf_counter() - start
+            METRICS.histogram("tool_latency_seconds", "Tool call latency", {"tool": name}).observe(elapsed)
+            METRICS.counter("tool_calls_total", "Tool calls by outcome", {"tool": name, "outcome": outcome}).inc()
+            logger.debug(f"Tool {name} finished in {elapsed * 1000:.1f} ms ({outcome})")
+
+    async def run_tool_call(self, tool_call: Dict[str, Any],
+                            available_functions: Dict[str, Callable]) -> Tuple[Dict[str, Any], Any]:
+        """
+        Run a streamed tool call.
+        Returns the `tool` message for the follow-up request and the raw result;
+        failures are reported to the model as an error payload.
+        """
+        name = tool_call["function"]["name"]
+        try:
+            fn, fn_args = get_function_and_args(tool_call, available_functions)
+            result = await self.run(fn, fn_args)
+            content = json.dumps(result)
+        except Exception as e:
+            logger.warning(f"Tool call {name} failed: {e}")
+            result = {"error": str(e)}
+            content = json.dumps(result)
+        return {
+            "tool_call_id": tool_call["id"],
+            "role": "tool",
+            "name": name,
+            "content": content,
+        }, result
+
+    async def run_tool_calls(self, tool_calls: List[Dict[str, Any]],
+                             available_functions: Dict[str, Callable]) -> List[Tuple[Dict[str, Any], Any]]:
+        """Run independent tool calls concurrently; results keep the order of `tool_calls`."""
+        return await asyncio.gather(*(self.run_tool_call(tc, available_functions) for tc in tool_calls))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+TOOL_EXECUTOR = ToolExecutor.from_config()
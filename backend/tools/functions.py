@@ -1,13 +1,24 @@
 import os
 from datetime import datetime
 import requests
-import pytz
-from timezonefinder import TimezoneFinder
 from dotenv import load_dotenv
 
+from backend.config.config import CONFIG
+from backend.tools.cache import TTLCache
+from backend.tools.registry import TOOL_REGISTRY, tool
+from backend.tools.timezones import TIMEZONE_RESOLVER
+
 load_dotenv()
 
-def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric", lang="en"):
+_WEATHER_CACHE_SETTINGS = CONFIG["TOOL_CACHE"]["fetch_weather"]
+WEATHER_CACHE = TTLCache(
+    "fetch_weather",
+    ttl=_WEATHER_CACHE_SETTINGS["TTL_S"],
+    stale_ttl=_WEATHER_CACHE_SETTINGS["STALE_TTL_S"],
+    max_entries=_WEATHER_CACHE_SETTINGS["MAX_ENTRIES"],
+)
+
+def _request_weather(lat, lon, exclude, units, lang):
     api_key = os.getenv('OPENWEATHER_API_KEY')
     if not api_key:
         raise ValueError("API key not found. Please set OPENWEATHER_API_KEY in your .env file.")
@@ -18,58 +29,50 @@ def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric",
     response.raise_for_status()
     return response.json()
 
+@tool(
+    description="Fetch current weather and forecast data...",
+    parameters={
+        "type": "object",
+        "required": ["lat", "lon", "exclude", "units", "lang"],
+        "properties": {
+            "lat": {"type": "number", "description": "Latitude..."},
+            "lon": {"type": "number", "description": "Longitude..."},
+            "exclude": {"type": "string", "description": "Data to exclude..."},
+            "units": {"type": "string", "description": "Units of measurement..."},
+            "lang": {"type": "string", "description": "Language of the response..."}
+        },
+        "additionalProperties": False
+    },
+)
+def fetch_weather(lat=28.5383, lon=-81.3792, exclude="minutely", units="metric", lang="en"):
+    # Nearby coordinates share one cache entry; see CONFIG["TOOL_CACHE"]["fetch_weather"].
+    precision = _WEATHER_CACHE_SETTINGS["COORD_PRECISION"]
+    lat, lon = round(float(lat), precision), round(float(lon), precision)
+    key = (lat, lon, exclude, units, lang)
+    return WEATHER_CACHE.get_or_load(key, lambda: _request_weather(lat, lon, exclude, units, lang))
+
+@tool(
+    description="Fetch the current time based on location...",
+    parameters={
+        "type": "object",
+        "required": ["lat", "lon"],
+        "properties": {
+            "lat": {"type": "number", "description": "Latitude..."},
+            "lon": {"type": "number", "description": "Longitude..."}
+        },
+        "additionalProperties": False
+    },
+)
 def get_time(lat=28.5383, lon=-81.3792):
-    tf = TimezoneFinder()
-    tz_name = tf.timezone_at(lat=lat, lng=lon)
-    if not tz_name:
+    local_tz = TIMEZONE_RESOLVER.zone(lat, lon)
+    if local_tz is None:
         raise ValueError("Time zone could not be determined for the given coordinates.")
-    local_tz = pytz.timezone(tz_name)
     local_time = datetime.now(local_tz)
     return local_time.strftime("%H:%M:%S")
 
 def get_tools():
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": "fetch_weather",
-                "description": "Fetch current weather and forecast data...",
-                "strict": True,
-                "parameters": {
-                    "type": "object",
-                    "required": ["lat", "lon", "exclude", "units", "lang"],
-                    "properties": {
-                        "lat": {"type": "number", "description": "Latitude..."},
-                        "lon": {"type": "number", "description": "Longitude..."},
-                        "exclude": {"type": "string", "description": "Data to exclude..."},
-                        "units": {"type": "string", "description": "Units of measurement..."},
-                        "lang": {"type": "string", "description": "Language of the response..."}
-                    },
-                    "additionalProperties": False
-                }
-            }
-        },
-        {
-            "type": "function",
-            "function": {
-                "name": "get_time",
-                "description": "Fetch the current time based on location...",
-                "strict": True,
-                "parameters": {
-                    "type": "object",
-                    "required": ["lat", "lon"],
-                    "properties": {
-                        "lat": {"type": "number", "description": "Latitude..."},
-                        "lon": {"type": "number", "description": "Longitude..."}
-                    },
-                    "additionalProperties": False
-                }
-            }
-        }
-    ]
+    """Prebuilt, read-only tool schemas shared by every completion request."""
+    return TOOL_REGISTRY.tools
 
 def get_available_functions():
-    return {
-        "fetch_weather": fetch_weather,
-        "get_time": get_time
-    }
+    return TOOL_REGISTRY.functions
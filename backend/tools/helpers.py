@@ -1,10 +1,16 @@
 import inspect
-from typing import Callable, Dict, Tuple
+from functools import lru_cache
+from typing import Callable, Dict, Mapping, Tuple
 import json
 
+from backend.tools.registry import TOOL_REGISTRY
+
+@lru_cache(maxsize=256)
+def _signature(function: Callable) -> inspect.Signature:
+    return inspect.signature(function)
+
 def check_args(function: Callable, args: dict) -> bool:
-    sig = inspect.signature(function)
-    params = sig.parameters
+    params = _signature(function).parameters
     for name in args:
         if name not in params:
             return False
@@ -13,12 +19,15 @@ def check_args(function: Callable, args: dict) -> bool:
             return False
     return True
 
-def get_function_and_args(tool_call: dict, available_functions: dict) -> Tuple[Callable, dict]:
+def get_function_and_args(tool_call: dict, available_functions: Mapping[str, Callable]) -> Tuple[Callable, dict]:
     function_name = tool_call["function"]["name"]
-    function_args = json.loads(tool_call["function"]["arguments"])
+    function_args = json.loads(tool_call["function"]["arguments"] or "{}")
     if function_name not in available_functions:
         raise ValueError(f"Function '{function_name}' not found")
     function_to_call = available_functions[function_name]
-    if not check_args(function_to_call, function_args):
+    validator = TOOL_REGISTRY.validator_for(function_name, function_to_call)
+    if validator is not None:
+        validator(function_args)
+    elif not check_args(function_to_call, function_args):
         raise ValueError(f"Invalid arguments for function '{function_name}'")
     return function_to_call, function_args
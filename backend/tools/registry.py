@@ -0,0 +1,143 @@
+import copy
+import inspect
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# JSON schema type -> accepted Python types (bool is excluded from numbers below).
+JSON_TYPES = {
+    "number": (int, float),
+    "integer": (int,),
+    "string": (str,),
+    "boolean": (bool,),
+    "array": (list,),
+    "object": (dict,),
+    "null": (type(None),),
+}
+
+
+class ReadOnlyDict(dict):
+    """A dict that refuses mutation, so it still serializes as a JSON object."""
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Tool schemas are shared by every request and are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of a JSON-like value: dicts become ReadOnlyDict, lists tuples."""
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ArgumentValidator:
+    """
+    Argument check for one tool, compiled once from its schema and signature.
+    Calling it only does set and isinstance checks; no reflection per call.
+    """
+    def __init__(self, name: str, function: Callable, parameters: Dict[str, Any]):
+        self.name = name
+        signature = inspect.signature(function)
+        accepts_kwargs = any(p.kind is p.VAR_KEYWORD for p in signature.parameters.values())
+        properties = parameters.get("properties", {})
+        self.allowed = None if accepts_kwargs else frozenset(signature.parameters)
+        self.required = frozenset(parameters.get("required", ())) | frozenset(
+            n for n, p in signature.parameters.items()
+            if p.default is p.empty and p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+        )
+        self.types = {}
+        for prop, spec in properties.items():
+            declared = spec.get("type")
+            names = declared if isinstance(declared, list) else [declared]
+            accepted = tuple(t for n in names for t in JSON_TYPES.get(n, ()))
+            if accepted:
+                self.types[prop] = (accepted, "boolean" not in names)
+
+    def __call__(self, args: Any) -> None:
+        if not isinstance(args, dict):
+            raise ValueError(f"Invalid arguments for function '{self.name}'")
+        if self.allowed is not None and not self.allowed.issuperset(args):
+            raise ValueError(f"Invalid arguments for function '{self.name}'")
+        if not self.required.issubset(args):
+            raise ValueError(f"Invalid arguments for function '{self.name}'")
+        for prop, value in args.items():
+            expected = self.types.get(prop)
+            if expected is None:
+                continue
+            accepted, reject_bool = expected
+            if not isinstance(value, accepted) or (reject_bool and isinstance(value, bool)):
+                raise ValueError(f"Invalid type for '{prop}' in function '{self.name}'")
+
+
+class ToolSpec:
+    def __init__(self, name: str, function: Callable, description: str,
+                 parameters: Dict[str, Any], strict: bool):
+        self.name = name
+        self.function = function
+        self.schema = freeze({
+            "type": "function",
+            "function": {
+                "name": name,
+                "description": description,
+                "strict": strict,
+                "parameters": copy.deepcopy(parameters),
+            },
+        })
+        self.validator = ArgumentValidator(name, function, parameters)
+
+
+class ToolRegistry:
+    """
+    Tools declare their schema once with the `tool` decorator.
+    The `tools` payload for completion requests and the name -> function
+    map are built at import time and shared by every request, so both are
+    immutable.
+    """
+    def __init__(self):
+        self._specs: Dict[str, ToolSpec] = {}
+        self._tools_payload: Tuple[Mapping[str, Any], ...] = ()
+        self._functions: Mapping[str, Callable] = MappingProxyType({})
+        self._validators: Mapping[str, ArgumentValidator] = MappingProxyType({})
+
+    def register(self, function: Callable, description: str, parameters: Dict[str, Any],
+                 name: Optional[str] = None, strict: bool = True) -> Callable:
+        spec = ToolSpec(name or function.__name__, function, description, parameters, strict)
+        self._specs[spec.name] = spec
+        self._tools_payload = tuple(s.schema for s in self._specs.values())
+        self._functions = MappingProxyType({n: s.function for n, s in self._specs.items()})
+        self._validators = MappingProxyType({n: s.validator for n, s in self._specs.items()})
+        return function
+
+    def tool(self, description: str, parameters: Dict[str, Any],
+             name: Optional[str] = None, strict: bool = True) -> Callable[[Callable], Callable]:
+        def decorator(function: Callable) -> Callable:
+            return self.register(function, description, parameters, name=name, strict=strict)
+        return decorator
+
+    @property
+    def tools(self) -> Tuple[Mapping[str, Any], ...]:
+        return self._tools_payload
+
+    @property
+    def functions(self) -> Mapping[str, Callable]:
+        return self._functions
+
+    def validator_for(self, name: str, function: Callable) -> Optional[ArgumentValidator]:
+        """The precompiled validator, if `function` is the one registered under `name`."""
+        spec = self._specs.get(name)
+        if spec is None or spec.function is not function:
+            return None
+        return self._validators[name]
+
+
+TOOL_REGISTRY = ToolRegistry()
+tool = TOOL_REGISTRY.tool
@@ -0,0 +1,61 @@
+import threading
+from functools import lru_cache
+from typing import Optional
+
+import pytz
+from timezonefinder import TimezoneFinder
+
+from backend.config.config import CONFIG
+
+
+@lru_cache(maxsize=64)
+def get_zone(tz_name: str):
+    """Cached pytz zone object for a timezone name."""
+    return pytz.timezone(tz_name)
+
+
+class TimezoneResolver:
+    """
+    Process-wide lat/lon -> timezone lookup.
+    The TimezoneFinder (and its polygon data) is loaded once, ideally at
+    startup via `warm()`, and results are cached per rounded coordinate.
+    """
+    def __init__(self, precision: int, cache_size: int, in_memory: bool = True):
+        self.precision = precision
+        self.in_memory = in_memory
+        self._finder: Optional[TimezoneFinder] = None
+        self._lock = threading.Lock()
+        self._lookup = lru_cache(maxsize=cache_size)(self._lookup_uncached)
+
+    def _get_finder(self) -> TimezoneFinder:
+        if self._finder is None:
+            self._finder = TimezoneFinder(in_memory=self.in_memory)
+        return self._finder
+
+    def _lookup_uncached(self, lat: float, lon: float) -> Optional[str]:
+        # TimezoneFinder is not safe to share between tool threads.
+        with self._lock:
+            return self._get_finder().timezone_at(lat=lat, lng=lon)
+
+    def warm(self, lat: float = 28.5383, lon: float = -81.3792) -> None:
+        """Load the polygon data and prime the cache for the home location."""
+        tz_name = self.timezone_name(lat, lon)
+        if tz_name:
+            get_zone(tz_name)
+
+    def timezone_name(self, lat: float, lon: float) -> Optional[str]:
+        return self._lookup(round(float(lat), self.precision), round(float(lon), self.precision))
+
+    def zone(self, lat: float, lon: float):
+        tz_name = self.timezone_name(lat, lon)
+        return get_zone(tz_name) if tz_name else None
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+
+TIMEZONE_RESOLVER = TimezoneResolver(
+    precision=CONFIG["TIMEZONE_RESOLVER"]["COORD_PRECISION"],
+    cache_size=CONFIG["TIMEZONE_RESOLVER"]["CACHE_SIZE"],
+    in_memory=CONFIG["TIMEZONE_RESOLVER"]["IN_MEMORY"],
+)
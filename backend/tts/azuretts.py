@@ -1,51 +1,19 @@
 import os
+import time
 import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
 import azure.cognitiveservices.speech as speechsdk
 from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
 
-class AzureTTS:
-    def __init__(self):
-        self.speech_config = speechsdk.SpeechConfig(
-            subscription=os.getenv("AZURE_SPEECH_KEY"),
-            region=os.getenv("AZURE_SPEECH_REGION")
-        )
-        self.audio_format = getattr(
-            speechsdk.SpeechSynthesisOutputFormat,
-            CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
-        )
-        self.speech_config.set_speech_synthesis_output_format(self.audio_format)
-        
-    async def stream_to_audio(self, text):
-        audio_queue = asyncio.Queue()
-        stop_event = asyncio.Event()
-        
-        push_stream_callback = PushAudioOutputStreamCallback(audio_queue, stop_event)
-        push_stream = speechsdk.audio.PushAudioOutputStream(push_stream_callback)
-        audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
-        
-        synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=self.speech_config, 
-            audio_config=audio_cfg
-        )
-        
-        ssml = self._create_ssml(text)
-        result_future = synthesizer.speak_ssml_async(ssml)
-        
-        try:
-            await asyncio.get_event_loop().run_in_executor(None, result_future.get)
-            while True:
-                chunk = await audio_queue.get()
-                if chunk is None:
-                    break
-                yield chunk
-        except Exception:
-            stop_event.set()
-            yield None
-            
-    def _create_ssml(self, text):
-        voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
-        prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
-        return f"""
+logger = logging.getLogger(__name__)
+
+
+def build_ssml(text: str, voice: str, prosody: Dict[str, str]) -> str:
+    return f"""
 <speak version='1.0' xml:lang='en-US'>
     <voice name='{voice}'>
         <prosody rate='{prosody["rate"]}' pitch='{prosody["pitch"]}' volume='{prosody["volume"]}'>
@@ -55,67 +23,234 @@ class AzureTTS:
 </speak>
 """
 
-class PushAudioOutputStreamCallback(speechsdk.audio.PushAudioOutputStreamCallback):
-    def __init__(self, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
-        super().__init__()
-        self.audio_queue = audio_queue
-        self.stop_event = stop_event
-        self.loop = asyncio.get_event_loop()
-
-    def write(self, data: memoryview) -> int:
-        if self.stop_event.is_set():
-            return 0
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, data.tobytes())
-        return len(data)
-
-    def close(self):
-        self.loop.call_soon_threadsafe(self.audio_queue.put_nowait, None)
-
-async def azure_text_to_speech_processor(phrase_queue: asyncio.Queue,
-                                           audio_queue: asyncio.Queue,
-                                           stop_event: asyncio.Event):
-    try:
+
+class PooledSynthesizer:
+    """
+    A long-lived SpeechSynthesizer with no audio output device. Audio arrives
+    through the `synthesizing` event and is handed to whichever sink the
+    current phrase installed, so one synthesizer (and its service
+    connection) serves many phrases.
+    """
+    def __init__(self, speech_config: speechsdk.SpeechConfig):
+        self.synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=None)
+        self.connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
+        self.connected = False
+        self.sink: Optional[Callable[[bytes], None]] = None
+        self.connection.connected.connect(lambda evt: setattr(self, "connected", True))
+        self.connection.disconnected.connect(lambda evt: setattr(self, "connected", False))
+        self.synthesizer.synthesizing.connect(self._on_synthesizing)
+
+    def _on_synthesizing(self, evt) -> None:
+        sink = self.sink
+        if sink is not None and evt.result.audio_data:
+            sink(evt.result.audio_data)
+
+    def preconnect(self) -> None:
+        if not self.connected:
+            self.connection.open(True)
+
+    def speak(self, ssml: str) -> speechsdk.SpeechSynthesisResult:
+        return self.synthesizer.speak_ssml_async(ssml).get()
+
+    def close(self) -> None:
+        """Close the service connection and release the SDK objects (blocking)."""
+        self.sink = None
+        try:
+            self.synthesizer.synthesizing.disconnect_all()
+            self.connection.close()
+        except Exception as e:
+            logger.debug(f"Closing Azure synthesizer failed: {e}")
+        self.connection = None
+        self.synthesizer = None
+
+    def stop(self) -> None:
+        """Ask the service to stop the current phrase; does not block."""
+        try:
+            self.synthesizer.stop_speaking_async()
+        except Exception as e:
+            logger.debug(f"stop_speaking failed: {e}")
+
+
+class AzureSynthesizerPool:
+    """
+    Up to `size` pooled synthesizers for one voice and output format, all
+    driven from a dedicated executor so blocking SDK calls never wait
+    behind unrelated work in the default executor.
+    """
+    def __init__(self, voice: str, audio_format: str, size: int):
+        self.voice = voice
+        self.audio_format = audio_format
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="azure-tts")
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._created = 0
+        labels = {"voice": voice}
+        self.setup_seconds = METRICS.histogram("azure_tts_setup_seconds",
+                                               "Time to get a connected synthesizer for a phrase", labels)
+        self.first_audio_seconds = METRICS.histogram("azure_tts_first_audio_seconds",
+                                                     "Time from speak to first audio chunk", labels)
+        self.synthesis_seconds = METRICS.histogram("azure_tts_synthesis_seconds",
+                                                   "Time from speak to end of phrase audio", labels)
+
+    def _speech_config(self) -> speechsdk.SpeechConfig:
         speech_config = speechsdk.SpeechConfig(
             subscription=os.getenv("AZURE_SPEECH_KEY"),
             region=os.getenv("AZURE_SPEECH_REGION")
         )
-        prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
-        voice = CONFIG["TTS_MODELS"]["AZURE_TTS"]["TTS_VOICE"]
-        audio_format = getattr(
-            speechsdk.SpeechSynthesisOutputFormat,
-            CONFIG["TTS_MODELS"]["AZURE_TTS"]["AUDIO_FORMAT"]
+        speech_config.set_speech_synthesis_output_format(
+            getattr(speechsdk.SpeechSynthesisOutputFormat, self.audio_format)
         )
-        speech_config.set_speech_synthesis_output_format(audio_format)
+        return speech_config
 
-        while True:
-            if stop_event.is_set():
-                await audio_queue.put(None)
-                return
+    def _create(self) -> PooledSynthesizer:
+        synthesizer = PooledSynthesizer(self._speech_config())
+        try:
+            synthesizer.preconnect()
+        except Exception:
+            synthesizer.close()
+            raise
+        return synthesizer
 
-            phrase = await phrase_queue.get()
-            if phrase is None or phrase.strip() == "":
-                await audio_queue.put(None)
-                return
+    async def warm(self, count: Optional[int] = None) -> None:
+        """Create synthesizers and open their service connections ahead of the first phrase."""
+        loop = asyncio.get_running_loop()
+        count = min(count or self.size, self.size - self._created)
+        if count <= 0:
+            return
+        self._created += count
+        results = await asyncio.gather(*(loop.run_in_executor(self.executor, self._create) for _ in range(count)),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._created -= 1
+                logger.warning(f"Could not pre-connect Azure synthesizer: {result}")
+            else:
+                self._idle.put_nowait(result)
 
+    async def _acquire(self) -> PooledSynthesizer:
+        loop = asyncio.get_running_loop()
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
             try:
-                ssml_phrase = f"""
-<speak version='1.0' xml:lang='en-US'>
-    <voice name='{voice}'>
-        <prosody rate='{prosody["rate"]}' pitch='{prosody["pitch"]}' volume='{prosody["volume"]}'>
-            {phrase}
-        </prosody>
-    </voice>
-</speak>
-"""
-                push_stream_callback = PushAudioOutputStreamCallback(audio_queue, stop_event)
-                push_stream = speechsdk.audio.PushAudioOutputStream(push_stream_callback)
-                audio_cfg = speechsdk.audio.AudioOutputConfig(stream=push_stream)
-                synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_cfg)
-                result_future = synthesizer.speak_ssml_async(ssml_phrase)
-                await asyncio.get_event_loop().run_in_executor(None, result_future.get)
+                return await loop.run_in_executor(self.executor, self._create)
+            except BaseException:
+                self._created -= 1
+                raise
+        synthesizer = await self._idle.get()
+        if not synthesizer.connected:
+            await loop.run_in_executor(self.executor, synthesizer.preconnect)
+        return synthesizer
+
+    def _release(self, synthesizer: PooledSynthesizer) -> None:
+        synthesizer.sink = None
+        self._idle.put_nowait(synthesizer)
+
+    def _discard(self, synthesizer: PooledSynthesizer) -> None:
+        self._created -= 1
+        try:
+            # Closing blocks on the SDK; it runs on the pool's thread like every other call.
+            asyncio.get_running_loop().run_in_executor(self.executor, synthesizer.close)
+        except RuntimeError:
+            synthesizer.close()  # executor already shut down
+
+    async def synthesize(self, ssml: str, stop_event: Optional[asyncio.Event] = None) -> AsyncIterator[bytes]:
+        """Yield PCM chunks for `ssml` as the service streams them."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        synthesizer = await self._acquire()
+        chunks: asyncio.Queue = asyncio.Queue()
+        synthesizer.sink = lambda data: loop.call_soon_threadsafe(chunks.put_nowait, data)
+
+        speak_at = time.perf_counter()
+        setup = speak_at - started
+        self.setup_seconds.observe(setup)
+        future = loop.run_in_executor(self.executor, synthesizer.speak, ssml)
+        future.add_done_callback(lambda _: chunks.put_nowait(None))
+
+        first_audio = None
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    break
+                if first_audio is None:
+                    first_audio = time.perf_counter() - speak_at
+                    self.first_audio_seconds.observe(first_audio)
+                yield chunk
+
+            if future.done():
+                result = future.result()
+                if result.reason == speechsdk.ResultReason.Canceled:
+                    details = result.cancellation_details
+                    raise RuntimeError(f"Azure synthesis canceled: {details.reason} {details.error_details}")
+                synthesis = time.perf_counter() - speak_at
+                self.synthesis_seconds.observe(synthesis)
+                logger.debug(f"Azure phrase timing: setup {setup * 1000:.0f} ms, "
+                             f"first audio {(first_audio or 0) * 1000:.0f} ms, synthesis {synthesis * 1000:.0f} ms")
+        finally:
+            synthesizer.sink = None
+            if not future.done():
+                synthesizer.stop()
+            healthy = False
+            try:
+                await asyncio.shield(future)
+                healthy = True
             except Exception:
-                await audio_queue.put(None)
-                return
+                pass
+            finally:
+                if healthy:
+                    self._release(synthesizer)
+                else:
+                    # Drop synthesizers whose phrase failed; the next acquire builds a fresh one.
+                    self._discard(synthesizer)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+_POOLS: Dict[Tuple[str, str], AzureSynthesizerPool] = {}
+
+
+def get_synthesizer_pool(voice: Optional[str] = None, audio_format: Optional[str] = None) -> AzureSynthesizerPool:
+    """Shared synthesizer pool for a voice/format (defaults from CONFIG)."""
+    settings = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+    key = (voice or settings["TTS_VOICE"], audio_format or settings["AUDIO_FORMAT"])
+    pool = _POOLS.get(key)
+    if pool is None:
+        pool = AzureSynthesizerPool(key[0], key[1], settings["POOL_SIZE"])
+        _POOLS[key] = pool
+    return pool
+
+
+def shutdown_synthesizer_pools() -> None:
+    for pool in _POOLS.values():
+        pool.shutdown()
+    _POOLS.clear()
+
+
+class AzureTTS:
+    def __init__(self):
+        self.pool = get_synthesizer_pool()
+
+    async def stream_to_audio(self, text):
+        try:
+            async for chunk in self.pool.synthesize(self._create_ssml(text)):
+                yield chunk
+        except Exception:
+            yield None
+
+    def _create_ssml(self, text):
+        return build_ssml(text, self.pool.voice, CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"])
+
+
+def azure_phrase_synthesizer() -> Callable[[str, asyncio.Event], AsyncIterator[bytes]]:
+    """Per-phrase synthesis function for the TTS pipeline in processor.py."""
+    pool = get_synthesizer_pool()
+    prosody = CONFIG["TTS_MODELS"]["AZURE_TTS"]["PROSODY"]
+
+    def synthesize(phrase: str, stop_event: asyncio.Event) -> AsyncIterator[bytes]:
+        return pool.synthesize(build_ssml(phrase, pool.voice, prosody), stop_event)
 
-    except Exception:
-        await audio_queue.put(None)
+    return synthesize
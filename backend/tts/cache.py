@@ -0,0 +1,314 @@
+import os
+import mmap
+import json
+import struct
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+# Index record: key digest, segment id, offset, length.
+INDEX_RECORD = struct.Struct("<16sIQI")
+
+
+def phrase_key(provider: str, voice: str, prosody, audio_format: str, text: str) -> bytes:
+    """Content address of a synthesized phrase."""
+    normalized = " ".join(text.split())
+    material = json.dumps([provider, voice, prosody, audio_format, normalized], sort_keys=True)
+    return hashlib.blake2b(material.encode("utf-8"), digest_size=16).digest()
+
+
+class _Inflight:
+    """A synthesis shared by every request for the same phrase while it runs."""
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.consumers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+
+class PhraseCache:
+    """
+    On-disk cache of raw PCM per phrase.
+
+    Audio is appended to segment files of at most `segment_bytes` and read
+    back through mmap. The index maps a 16-byte key to (segment, offset,
+    length) and is kept as an append-only file of fixed-size records, so an
+    insert costs one small write. Entries are evicted least recently used
+    once live audio exceeds `max_bytes`; a segment file is deleted when it no
+    longer holds a live entry, and the index is rewritten compactly on close.
+    """
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int, read_chunk_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.read_chunk_bytes = read_chunk_bytes
+        self._entries: "OrderedDict[bytes, Tuple[int, int, int]]" = OrderedDict()
+        self._segment_live: Dict[int, int] = {}
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._inflight: Dict[bytes, _Inflight] = {}
+        # `_lock` guards the index and maps and is only held briefly, since
+        # lookups take it on the event loop. `_write_lock` serializes the
+        # disk appends of `store` (thread pool) and is taken first.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._unlinked: List[str] = []
+        self._live_bytes = 0
+        self._active_segment = 0
+        self._index_file = None
+        self._opened = False
+        self._size_gauge = METRICS.gauge("tts_cache_bytes", "Live PCM bytes in the phrase cache")
+
+    @classmethod
+    def from_config(cls) -> "PhraseCache":
+        settings = CONFIG["TTS_CACHE"]
+        return cls(settings["DIRECTORY"], settings["MAX_BYTES"], settings["SEGMENT_BYTES"],
+                   settings["READ_CHUNK_BYTES"])
+
+    # -- storage ---------------------------------------------------------
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:06d}.pcm")
+
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, "index.bin")
+
+    def open(self) -> None:
+        with self._write_lock, self._lock:
+            if self._opened:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            sizes = {}
+            for name in os.listdir(self.directory):
+                if name.startswith("segment-") and name.endswith(".pcm"):
+                    segment = int(name[len("segment-"):-len(".pcm")])
+                    sizes[segment] = os.path.getsize(os.path.join(self.directory, name))
+            if os.path.exists(self._index_path()):
+                with open(self._index_path(), "rb") as f:
+                    data = f.read()
+                usable = len(data) - len(data) % INDEX_RECORD.size
+                for key, segment, offset, length in INDEX_RECORD.iter_unpack(data[:usable]):
+                    if offset + length <= sizes.get(segment, -1):
+                        self._add_entry(key, (segment, offset, length))
+            self._active_segment = max(sizes, default=0)
+            if sizes.get(self._active_segment, 0) >= self.segment_bytes:
+                self._active_segment += 1
+            for segment in sizes:
+                if not self._segment_live.get(segment) and segment != self._active_segment:
+                    os.remove(self._segment_path(segment))
+            self._evict()
+            self._write_index()
+            self._index_file = open(self._index_path(), "ab")
+            self._opened = True
+            logger.info(f"TTS phrase cache: {len(self._entries)} phrases, {self._live_bytes} bytes")
+        self._delete_unlinked()
+
+    def _add_entry(self, key: bytes, location: Tuple[int, int, int]) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._drop_location(previous)
+        self._entries[key] = location
+        self._segment_live[location[0]] = self._segment_live.get(location[0], 0) + 1
+        self._live_bytes += location[2]
+
+    def _drop_location(self, location: Tuple[int, int, int]) -> None:
+        segment = location[0]
+        self._live_bytes -= location[2]
+        self._segment_live[segment] -= 1
+        if self._segment_live[segment] == 0 and segment != self._active_segment:
+            self._remove_segment(segment)
+
+    def _unmap(self, segment: int) -> None:
+        mapped = self._maps.pop(segment, None)
+        if mapped is not None:
+            try:
+                mapped.close()
+            except BufferError:
+                pass  # a replay still holds a view; the map is freed with it
+
+    def _remove_segment(self, segment: int) -> None:
+        # The file is deleted by _delete_unlinked, outside `_lock`.
+        self._segment_live.pop(segment, None)
+        self._unmap(segment)
+        self._unlinked.append(self._segment_path(segment))
+
+    def _delete_unlinked(self) -> None:
+        with self._lock:
+            paths, self._unlinked = self._unlinked, []
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _evict(self) -> None:
+        while self._live_bytes > self.max_bytes and self._entries:
+            _, location = self._entries.popitem(last=False)
+            self._drop_location(location)
+        self._size_gauge.set(self._live_bytes)
+
+    def _write_index(self) -> None:
+        tmp = self._index_path() + ".tmp"
+        with open(tmp, "wb") as f:
+            for key, (segment, offset, length) in self._entries.items():
+                f.write(INDEX_RECORD.pack(key, segment, offset, length))
+        os.replace(tmp, self._index_path())
+
+    def store(self, key: bytes, pcm: bytes) -> None:
+        """Append a phrase's audio and index it (blocking; call from a thread)."""
+        if not pcm or len(pcm) > self.max_bytes:
+            return
+        with self._write_lock:
+            if not self._opened:
+                return
+            segment = self._active_segment
+            path = self._segment_path(segment)
+            offset = os.path.getsize(path) if os.path.exists(path) else 0
+            if offset and offset + len(pcm) > self.segment_bytes:
+                with self._lock:
+                    self._active_segment = segment = segment + 1
+                    if not self._segment_live.get(segment - 1):
+                        self._remove_segment(segment - 1)
+                path, offset = self._segment_path(segment), 0
+            with open(path, "ab") as f:
+                f.write(pcm)
+            location = (segment, offset, len(pcm))
+            with self._lock:
+                # The active segment grew; remap it on next read.
+                self._unmap(segment)
+                self._add_entry(key, location)
+                self._evict()
+            self._index_file.write(INDEX_RECORD.pack(key, *location))
+            self._index_file.flush()
+        self._delete_unlinked()
+
+    def lookup(self, key: bytes) -> Optional[memoryview]:
+        """Cached PCM for `key` as a view into the segment's mmap, or None."""
+        with self._lock:
+            location = self._entries.get(key)
+            if location is None:
+                return None
+            self._entries.move_to_end(key)
+            segment, offset, length = location
+            mapped = self._maps.get(segment)
+            if mapped is None:
+                with open(self._segment_path(segment), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[segment] = mapped
+            return memoryview(mapped)[offset:offset + length]
+
+    def close(self) -> None:
+        with self._write_lock, self._lock:
+            if not self._opened:
+                return
+            self._index_file.close()
+            self._write_index()
+            for segment in list(self._maps):
+                self._unmap(segment)
+            self._opened = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # -- streaming -------------------------------------------------------
+
+    def _count(self, result: str) -> None:
+        METRICS.counter("tts_cache_requests_total", "Phrase cache lookups by result", {"result": result}).inc()
+
+    async def _produce(self, key: bytes, inflight: _Inflight,
+                       synthesize: Callable[[str, asyncio.Event], AsyncIterator[bytes]], phrase: str) -> None:
+        # Runs independently of any one turn's stop event; it is cancelled
+        # when every consumer has gone away. It stays in `_inflight` until the
+        # audio is stored, so a request in between replays these chunks
+        # instead of synthesizing again.
+        chunks = synthesize(phrase, asyncio.Event())
+        try:
+            try:
+                async for chunk in chunks:
+                    if chunk:
+                        async with inflight.changed:
+                            inflight.chunks.append(chunk)
+                            inflight.changed.notify_all()
+            except asyncio.CancelledError as e:
+                inflight.error = e
+                raise
+            except Exception as e:
+                inflight.error = e
+            finally:
+                await chunks.aclose()
+                async with inflight.changed:
+                    inflight.done = True
+                    inflight.changed.notify_all()
+            if inflight.error is None:
+                try:
+                    await asyncio.to_thread(self.store, key, b"".join(inflight.chunks))
+                except Exception as e:
+                    logger.warning(f"Could not store phrase in TTS cache: {e}")
+        finally:
+            if self._inflight.get(key) is inflight:
+                del self._inflight[key]
+
+    async def _follow(self, key: bytes, inflight: _Inflight, stop_event: asyncio.Event) -> AsyncIterator[bytes]:
+        inflight.consumers += 1
+        try:
+            index = 0
+            while not stop_event.is_set():
+                async with inflight.changed:
+                    await inflight.changed.wait_for(lambda: index < len(inflight.chunks) or inflight.done)
+                    chunk = inflight.chunks[index] if index < len(inflight.chunks) else None
+                if chunk is not None:
+                    index += 1
+                    yield chunk
+                elif inflight.error is not None:
+                    raise inflight.error
+                else:
+                    return
+        finally:
+            inflight.consumers -= 1
+            if inflight.consumers == 0 and not inflight.done and inflight.task is not None:
+                inflight.task.cancel()
+
+    async def _replay(self, view: memoryview, stop_event: asyncio.Event) -> AsyncIterator[bytes]:
+        try:
+            for start in range(0, len(view), self.read_chunk_bytes):
+                if stop_event.is_set():
+                    return
+                yield bytes(view[start:start + self.read_chunk_bytes])
+        finally:
+            view.release()
+
+    def wrap(self, synthesize: Callable[[str, asyncio.Event], AsyncIterator[bytes]],
+             provider: str, voice: str, prosody, audio_format: str
+             ) -> Callable[[str, asyncio.Event], AsyncIterator[bytes]]:
+        """Put the cache in front of a per-phrase synthesis function."""
+        self.open()
+
+        def cached_synthesize(phrase: str, stop_event: asyncio.Event) -> AsyncIterator[bytes]:
+            key = phrase_key(provider, voice, prosody, audio_format, phrase)
+            view = self.lookup(key)
+            if view is not None:
+                self._count("hit")
+                return self._replay(view, stop_event)
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self._count("coalesced")
+            else:
+                self._count("miss")
+                inflight = _Inflight()
+                self._inflight[key] = inflight
+                inflight.task = asyncio.create_task(self._produce(key, inflight, synthesize, phrase))
+            return self._follow(key, inflight, stop_event)
+
+        return cached_synthesize
+
+
+PHRASE_CACHE = PhraseCache.from_config()
@@ -0,0 +1,79 @@
+import logging
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MULAW_BIAS = 0x84
+
+
+def _build_mulaw_tables():
+    # G.711 µ-law (same segment search as the reference 14-bit coder),
+    # computed once for every int16 value.
+    x = np.arange(-32768, 32768, dtype=np.int32)
+    v = x >> 2
+    mask = np.where(v < 0, 0x7F, 0xFF)
+    v = np.minimum(np.abs(v), 8159) + (MULAW_BIAS >> 2)
+    segment = np.searchsorted(np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), v)
+    codes = np.where(segment >= 8, 0x7F, (segment << 4) | ((v >> (segment + 1)) & 0x0F)) ^ mask
+    encode = np.empty(65536, dtype=np.uint8)
+    # Index by the int16 bit pattern read as uint16.
+    encode[x.astype(np.int16).view(np.uint16)] = codes.astype(np.uint8)
+
+    b = (~np.arange(256, dtype=np.int32)) & 0xFF
+    exponent = (b >> 4) & 0x07
+    mantissa = b & 0x0F
+    magnitude = (((mantissa << 3) + MULAW_BIAS) << exponent) - MULAW_BIAS
+    decode = np.where(b & 0x80, -magnitude, magnitude).astype("<i2")
+    return encode, decode
+
+
+MULAW_ENCODE, MULAW_DECODE = _build_mulaw_tables()
+
+
+def mulaw_encode(pcm: bytes) -> bytes:
+    """16-bit little-endian PCM to 8-bit µ-law (one table lookup per sample)."""
+    usable = len(pcm) - len(pcm) % 2
+    return MULAW_ENCODE[np.frombuffer(pcm[:usable], dtype="<u2")].tobytes()
+
+
+def mulaw_decode(data: bytes) -> bytes:
+    """8-bit µ-law to 16-bit little-endian PCM."""
+    return MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+# name -> encoder; "pcm" sends audio as is.
+CODECS: Dict[str, Optional[Callable[[bytes], bytes]]] = {
+    "pcm": None,
+    "mulaw": mulaw_encode,
+}
+
+
+def negotiate_codec(offered: Optional[Sequence[str]], allowed: Sequence[str], sample_format: str) -> str:
+    """
+    First codec in the client's preference order that the server allows.
+    µ-law encodes 16-bit samples, so it is only chosen for int16 sinks.
+    """
+    for name in offered or ():
+        if name == "pcm":
+            return "pcm"
+        if name in allowed and name in CODECS and sample_format == "int16":
+            return name
+    return "pcm"
+
+
+class AudioEncoder:
+    """Per-connection codec stage between audio_queue and the socket."""
+    def __init__(self, codec: str):
+        self.codec = codec
+        self._encode = CODECS[codec]
+        self._remainder = b""
+
+    def encode(self, pcm: bytes) -> bytes:
+        if self._encode is None:
+            return pcm
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % 2
+        self._remainder = data[usable:]
+        return self._encode(data[:usable])
@@ -0,0 +1,72 @@
+import random
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class FillerCue:
+    """
+    Placed on the phrase queue in place of text to ask the TTS pipeline for
+    a canned clip (e.g. "Let me check the weather.") at that point in the turn.
+    """
+    def __init__(self, category: str):
+        self.category = category
+
+    def __repr__(self) -> str:
+        return f"FillerCue({self.category!r})"
+
+
+class CannedAudio:
+    """
+    Short phrases synthesized once at startup with the configured TTS provider
+    and held as PCM, so they can be played without any provider round trip.
+    """
+    def __init__(self, phrases: Dict[str, List[str]]):
+        self.phrases = phrases
+        self._clips: Dict[str, List[bytes]] = {}
+
+    @classmethod
+    def from_config(cls) -> "CannedAudio":
+        return cls(CONFIG["FILLERS"]["PHRASES"])
+
+    async def _synthesize_clip(self, synthesize: Callable[[str, asyncio.Event], AsyncIterator[bytes]],
+                               text: str) -> bytes:
+        return b"".join([chunk async for chunk in synthesize(text, asyncio.Event()) if chunk])
+
+    async def warm(self, synthesize: Callable[[str, asyncio.Event], AsyncIterator[bytes]]) -> None:
+        """Pre-synthesize every configured phrase; failures leave that phrase out."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for category, texts in self.phrases.items():
+            clips = []
+            for text in texts:
+                try:
+                    clip = await self._synthesize_clip(synthesize, text)
+                except Exception as e:
+                    logger.warning(f"Could not pre-synthesize filler {text!r}: {e}")
+                    continue
+                if clip:
+                    clips.append(clip)
+            if clips:
+                self._clips[category] = clips
+        logger.info(f"Pre-synthesized {sum(map(len, self._clips.values()))} filler clips "
+                    f"in {loop.time() - start:.1f}s")
+
+    def has(self, category: str) -> bool:
+        return category in self._clips
+
+    def pick(self, category: str, fallback: Optional[str] = None) -> Optional[bytes]:
+        clips = self._clips.get(category) or (self._clips.get(fallback) if fallback else None)
+        if not clips:
+            return None
+        METRICS.counter("tts_fillers_played_total", "Canned clips played by category",
+                        {"category": category if category in self._clips else fallback}).inc()
+        return random.choice(clips)
+
+
+CANNED_AUDIO = CannedAudio.from_config()
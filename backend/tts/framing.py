@@ -0,0 +1,54 @@
+import struct
+from typing import Optional
+
+LEGACY_PREFIX = b"audio:"
+
+# Protocol v2 header, followed directly by the payload:
+# magic, version, flags, turn id, sequence, sample rate, codec id, channels, reserved.
+FRAME_MAGIC = b"AF"
+FRAME_VERSION = 2
+FRAME_HEADER = struct.Struct("<2sBBIIIBBH")
+
+FLAG_END_OF_STREAM = 0x01
+FLAG_FIRST = 0x02
+
+CODEC_IDS = {"pcm": 0, "mulaw": 1}
+
+
+class AudioFramer:
+    """
+    Builds the binary audio messages for one turn on one connection.
+
+    Protocol 1 is the legacy `audio:` prefix with an empty payload as
+    end-of-stream. Protocol 2 prefixes each payload with FRAME_HEADER, so
+    the client can drop frames from a cancelled turn by turn id without
+    looking at the audio. Each message is built in one preallocated buffer;
+    the payload is copied into it once.
+    """
+    def __init__(self, protocol: int = 1, turn_id: int = 0, codec: str = "pcm",
+                 sample_rate: int = 0, channels: int = 1):
+        self.protocol = protocol
+        self.turn_id = turn_id
+        self.codec_id = CODEC_IDS[codec]
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.seq = 0
+
+    def frame(self, payload: Optional[bytes] = None, end_of_stream: bool = False) -> bytearray:
+        payload = payload or b""
+        if self.protocol < 2:
+            message = bytearray(len(LEGACY_PREFIX) + len(payload))
+            message[:len(LEGACY_PREFIX)] = LEGACY_PREFIX
+            message[len(LEGACY_PREFIX):] = payload
+            return message
+
+        flags = (FLAG_END_OF_STREAM if end_of_stream else 0) | (FLAG_FIRST if self.seq == 0 else 0)
+        message = bytearray(FRAME_HEADER.size + len(payload))
+        FRAME_HEADER.pack_into(message, 0, FRAME_MAGIC, FRAME_VERSION, flags, self.turn_id, self.seq,
+                               self.sample_rate, self.codec_id, self.channels, 0)
+        memoryview(message)[FRAME_HEADER.size:] = payload
+        self.seq += 1
+        return message
+
+    def end_of_stream(self) -> bytearray:
+        return self.frame(b"", end_of_stream=True)
@@ -1,12 +1,19 @@
 import os
 import asyncio
 import openai
-from typing import Optional
+from typing import AsyncIterator, Callable, Optional
 from ..config.config import CONFIG
+from ..config.client import CLIENT_MANAGER
+from .pcm import pcm_sample_rate
+
+
+def shared_tts_client() -> openai.AsyncOpenAI:
+    """OpenAI client on the shared, pre-warmed connection pool."""
+    return CLIENT_MANAGER.openai_client(os.getenv("OPENAI_API_KEY"), CONFIG["API_SERVICES"]["openai"]["BASE_URL"])
 
 class OpenAITTS:
     def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.client = shared_tts_client()
         self.model = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_MODEL"]
         self.voice = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_VOICE"]
         self.speed = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_SPEED"]
@@ -31,72 +38,47 @@ class OpenAITTS:
         except Exception:
             yield None
 
-async def openai_text_to_speech_processor(phrase_queue: asyncio.Queue,
-                                          audio_queue: asyncio.Queue,
-                                          stop_event: asyncio.Event,
-                                          openai_client: Optional[openai.AsyncOpenAI] = None):
-    openai_client = openai_client or openai.AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    try:
-        model = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_MODEL"]
-        voice = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_VOICE"]
-        speed = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_SPEED"]
-        response_format = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["AUDIO_RESPONSE_FORMAT"]
-        chunk_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["TTS_CHUNK_SIZE"]
-        buffer_size = CONFIG["TTS_MODELS"]["OPENAI_TTS"]["BUFFER_SIZE"]
-    except KeyError:
-        await audio_queue.put(None)
-        return
+def openai_phrase_synthesizer(openai_client: Optional[openai.AsyncOpenAI] = None
+                              ) -> Callable[[str, asyncio.Event], AsyncIterator[bytes]]:
+    """Per-phrase synthesis function for the TTS pipeline in processor.py."""
+    openai_client = openai_client or shared_tts_client()
+    settings = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+    model = settings["TTS_MODEL"]
+    voice = settings["TTS_VOICE"]
+    speed = settings["TTS_SPEED"]
+    response_format = settings["AUDIO_RESPONSE_FORMAT"]
+    chunk_size = settings["TTS_CHUNK_SIZE"]
+    buffer_size = settings["BUFFER_SIZE"]
+    # The PCM stage adds the gap between phrases only when it shapes this output.
+    shaped = CONFIG["PCM_PROCESSING"]["ENABLED"] and pcm_sample_rate("openai") is not None
 
-    try:
+    async def synthesize(phrase: str, stop_event: asyncio.Event) -> AsyncIterator[bytes]:
         audio_buffer = bytearray()
-        
-        while True:
-            if stop_event.is_set():
-                await audio_queue.put(None)
-                return
+        async with openai_client.audio.speech.with_streaming_response.create(
+            model=model,
+            voice=voice,
+            input=phrase.strip(),
+            speed=speed,
+            response_format=response_format
+        ) as response:
+            async for audio_chunk in response.iter_bytes(chunk_size):
+                if stop_event.is_set():
+                    return
+
+                # Add chunk to buffer
+                audio_buffer.extend(audio_chunk)
 
-            phrase = await phrase_queue.get()
-            if phrase is None:
-                await audio_queue.put(None)
-                return
+                # When buffer reaches threshold, send it
+                if len(audio_buffer) >= buffer_size:
+                    yield bytes(audio_buffer)
+                    audio_buffer.clear()
 
-            stripped_phrase = phrase.strip()
-            if not stripped_phrase:
-                continue
+        # Send any remaining buffered audio
+        if audio_buffer:
+            yield bytes(audio_buffer)
 
-            try:
-                async with openai_client.audio.speech.with_streaming_response.create(
-                    model=model,
-                    voice=voice,
-                    input=stripped_phrase,
-                    speed=speed,
-                    response_format=response_format
-                ) as response:
-                    async for audio_chunk in response.iter_bytes(chunk_size):
-                        if stop_event.is_set():
-                            break
-                            
-                        # Add chunk to buffer
-                        audio_buffer.extend(audio_chunk)
-                        
-                        # When buffer reaches threshold, send it
-                        if len(audio_buffer) >= buffer_size:
-                            await audio_queue.put(bytes(audio_buffer))
-                            audio_buffer.clear()
-                    
-                    # Send any remaining buffered audio
-                    if audio_buffer:
-                        await audio_queue.put(bytes(audio_buffer))
-                        audio_buffer.clear()
-                        
-                    # Add a small silence gap between phrases
-                    await audio_queue.put(b'\x00' * chunk_size)
-                    
-            except Exception as e:
-                print(f"Error in OpenAI TTS streaming: {e}")
-                await audio_queue.put(None)
-                return
+        # Add a small silence gap between phrases
+        if not shaped:
+            yield b'\x00' * chunk_size
 
-    except Exception as e:
-        print(f"Error in OpenAI TTS processor: {e}")
-        await audio_queue.put(None)
+    return synthesize
@@ -0,0 +1,192 @@
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+from backend.config.config import CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def dbfs_to_linear(db: float) -> float:
+    return float(10.0 ** (db / 20.0))
+
+
+class LoudnessTracker:
+    """
+    Running RMS of speech frames for one TTS provider. It is kept across
+    turns, so a provider's level is already known when a new turn starts.
+    """
+    def __init__(self, smoothing: float):
+        self.smoothing = smoothing
+        self.rms: Optional[float] = None
+
+    def update(self, speech_rms: np.ndarray) -> None:
+        if speech_rms.size == 0:
+            return
+        if self.rms is None:
+            self.rms = float(speech_rms[0])
+        # Exponential moving average over all frames at once.
+        decay = 1.0 - self.smoothing
+        weights = self.smoothing * decay ** np.arange(speech_rms.size - 1, -1, -1)
+        self.rms = float(decay ** speech_rms.size * self.rms + np.dot(weights, speech_rms))
+
+
+_TRACKERS: Dict[str, LoudnessTracker] = {}
+
+
+def loudness_tracker(provider: str) -> LoudnessTracker:
+    tracker = _TRACKERS.get(provider)
+    if tracker is None:
+        tracker = LoudnessTracker(CONFIG["PCM_PROCESSING"]["LOUDNESS_SMOOTHING"])
+        _TRACKERS[provider] = tracker
+    return tracker
+
+
+class PhraseShaper:
+    """
+    Streaming post-processing for 16-bit mono PCM, applied phrase by phrase
+    in playback order:
+
+    - leading silence is dropped (keeping a short pre-roll) and trailing
+      silence is cut down to `trailing_keep_ms`, by per-frame RMS energy;
+    - each phrase fades in and out over `crossfade_ms` and is followed by
+      `gap_ms` of silence, replacing the provider's own padding;
+    - gain is steered towards `target_dbfs` from a running speech loudness
+      estimate, ramped per chunk and limited to avoid clipping.
+
+    Only silence after the last loud frame, a partial frame and the fade-out
+    tail are held back, so speech is delayed by a few milliseconds at most.
+    """
+    def __init__(self, sample_rate: int, tracker: LoudnessTracker, frame_ms: float = 10,
+                 silence_threshold_dbfs: float = -45, preroll_ms: float = 20, trailing_keep_ms: float = 40,
+                 gap_ms: float = 120, crossfade_ms: float = 5, target_dbfs: float = -20,
+                 max_gain_db: float = 12, min_gain_db: float = -12, max_held_silence_ms: float = 2000):
+        self.sample_rate = sample_rate
+        self.tracker = tracker
+        self.frame = max(1, int(sample_rate * frame_ms / 1000))
+        self.threshold = dbfs_to_linear(silence_threshold_dbfs)
+        self.preroll = int(sample_rate * preroll_ms / 1000)
+        self.trailing_keep = int(sample_rate * trailing_keep_ms / 1000)
+        self.gap = np.zeros(int(sample_rate * gap_ms / 1000), dtype=np.int16).tobytes()
+        self.crossfade = max(1, int(sample_rate * crossfade_ms / 1000))
+        self.target = dbfs_to_linear(target_dbfs)
+        self.max_gain = dbfs_to_linear(max_gain_db)
+        self.min_gain = dbfs_to_linear(min_gain_db)
+        self.max_held = int(sample_rate * max_held_silence_ms / 1000)
+        self.gain = 1.0
+        self._fade_in = np.linspace(0.0, 1.0, self.crossfade, dtype=np.float32)
+        self._reset()
+
+    @classmethod
+    def from_config(cls, sample_rate: int, provider: str) -> "PhraseShaper":
+        settings = CONFIG["PCM_PROCESSING"]
+        return cls(
+            sample_rate,
+            loudness_tracker(provider),
+            frame_ms=settings["FRAME_MS"],
+            silence_threshold_dbfs=settings["SILENCE_THRESHOLD_DBFS"],
+            preroll_ms=settings["PREROLL_MS"],
+            trailing_keep_ms=settings["TRAILING_KEEP_MS"],
+            gap_ms=settings["GAP_MS"],
+            crossfade_ms=settings["CROSSFADE_MS"],
+            target_dbfs=settings["TARGET_DBFS"],
+            max_gain_db=settings["MAX_GAIN_DB"],
+            min_gain_db=settings["MIN_GAIN_DB"],
+        )
+
+    def _reset(self) -> None:
+        self._remainder = b""
+        self._started = False
+        self._preroll_buf = np.zeros(0, dtype=np.float32)
+        self._held = np.zeros(0, dtype=np.float32)
+        self._tail = np.zeros(0, dtype=np.float32)
+
+    def _apply_gain(self, samples: np.ndarray) -> np.ndarray:
+        if self.tracker.rms:
+            target_gain = min(self.max_gain, max(self.min_gain, self.target / self.tracker.rms))
+        else:
+            target_gain = 1.0
+        ramp = np.linspace(self.gain, target_gain, samples.size, dtype=np.float32)
+        self.gain = target_gain
+        return np.clip(samples * ramp, -1.0, 1.0)
+
+    def _emit(self, samples: np.ndarray, final: bool = False) -> bytes:
+        # Hold back the last `crossfade` samples so the phrase end can be faded out.
+        samples = np.concatenate((self._tail, samples))
+        if final:
+            self._tail = np.zeros(0, dtype=np.float32)
+            fade = min(self.crossfade, samples.size)
+            if fade:
+                samples[-fade:] *= self._fade_in[::-1][-fade:]
+        else:
+            split = max(0, samples.size - self.crossfade)
+            samples, self._tail = samples[:split], samples[split:]
+        if samples.size == 0:
+            return b""
+        return (self._apply_gain(samples) * 32767.0).astype(np.int16).tobytes()
+
+    def process(self, chunk: bytes) -> bytes:
+        """Feed raw PCM for the current phrase; returns the audio ready to play."""
+        data = self._remainder + chunk
+        usable = (len(data) // (2 * self.frame)) * 2 * self.frame
+        self._remainder = data[usable:]
+        if not usable:
+            return b""
+        samples = np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+        frames = samples.reshape(-1, self.frame)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        loud = np.flatnonzero(rms > self.threshold)
+        self.tracker.update(rms[loud])
+
+        if not self._started:
+            if loud.size == 0:
+                self._preroll_buf = np.concatenate((self._preroll_buf, samples))[-self.preroll:] \
+                    if self.preroll else self._preroll_buf
+                return b""
+            self._started = True
+            start, end = loud[0] * self.frame, (loud[-1] + 1) * self.frame
+            speech = np.concatenate((self._preroll_buf, samples[start:end]))
+            self._preroll_buf = np.zeros(0, dtype=np.float32)
+            fade = min(self.crossfade, speech.size)
+            speech[:fade] *= self._fade_in[:fade]
+            self._held = samples[end:]
+            return self._emit(speech)
+
+        if loud.size == 0:
+            self._held = np.concatenate((self._held, samples))
+            if self._held.size > self.max_held:
+                # A long pause inside a phrase: let the older part of it through.
+                excess = self._held.size - self.max_held
+                out, self._held = self._held[:excess], self._held[excess:]
+                return self._emit(out)
+            return b""
+        end = (loud[-1] + 1) * self.frame
+        out = np.concatenate((self._held, samples[:end]))
+        self._held = samples[end:]
+        return self._emit(out)
+
+    def end_phrase(self) -> bytes:
+        """Finish the current phrase: trailing silence trimmed, faded out, gap appended."""
+        started = self._started
+        out = self._emit(self._held[:self.trailing_keep], final=True) if started else b""
+        self._reset()
+        return out + self.gap if started else b""
+
+    def shape(self, pcm: bytes) -> bytes:
+        """Process a complete phrase in one call."""
+        return self.process(pcm) + self.end_phrase()
+
+
+def pcm_sample_rate(provider: str) -> Optional[int]:
+    """Sample rate of the provider's output if it is raw 16-bit mono PCM, else None."""
+    if provider == "azure":
+        settings = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+        audio_format = settings["AUDIO_FORMAT"]
+        if audio_format.startswith("Raw") and audio_format.endswith("16BitMonoPcm"):
+            return settings["AUDIO_FORMAT_RATES"].get(audio_format)
+    elif provider == "openai":
+        settings = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+        if settings["AUDIO_RESPONSE_FORMAT"] == "pcm":
+            return settings["AUDIO_FORMAT_RATES"]["pcm"]
+    return None
@@ -1,21 +1,242 @@
+import copy
 import asyncio
 import logging
-from typing import Optional, Callable
+from typing import AsyncIterator, Callable, List, Optional
 
 from backend.config.config import CONFIG
+from backend.telemetry.metrics import METRICS
+from backend.telemetry.queues import WatermarkQueue
+from backend.telemetry.tracing import TurnTrace
+from backend.tts.cache import PHRASE_CACHE
+from backend.tts.fillers import CANNED_AUDIO, CannedAudio, FillerCue
+from backend.tts.pcm import PhraseShaper, pcm_sample_rate
+from backend.tts.framing import AudioFramer, LEGACY_PREFIX
 
 logger = logging.getLogger(__name__)
 
 def format_audio_message(audio_data: bytes) -> bytes:
     """Ensures consistent audio message formatting with the 'audio:' prefix"""
     if audio_data is None:
-        return b'audio:'  # End of stream marker
-    return b'audio:' + audio_data if not audio_data.startswith(b'audio:') else audio_data
+        return AudioFramer().end_of_stream()  # End of stream marker
+    return audio_data if audio_data.startswith(LEGACY_PREFIX) else AudioFramer().frame(audio_data)
 
-async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queue, stop_event: asyncio.Event):
+class BufferBudget:
+    """
+    Caps the audio held for phrases that are not yet playing. The phrase
+    currently being forwarded (the head) is never held back, so the
+    pipeline cannot deadlock on its own buffers.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.head: Optional[object] = None
+        self._changed = asyncio.Condition()
+        self._gauge = METRICS.gauge("tts_pipeline_buffered_bytes", "Audio buffered ahead of playback")
+
+    async def reserve(self, owner: object, size: int) -> None:
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: owner is self.head or self.used == 0 or self.used + size <= self.max_bytes
+            )
+            self.used += size
+            self._gauge.set(self.used)
+
+    async def release(self, size: int) -> None:
+        async with self._changed:
+            self.used -= size
+            self._gauge.set(self.used)
+            self._changed.notify_all()
+
+    async def set_head(self, owner: object) -> None:
+        async with self._changed:
+            self.head = owner
+            self._changed.notify_all()
+
+
+class PhraseJob:
+    """One phrase synthesis; chunks are buffered until the phrase's turn to play."""
+    DONE = object()
+
+    def __init__(self, phrase: str, cue: Optional[FillerCue] = None, max_bytes: int = 0):
+        self.phrase = phrase
+        self.cue = cue
+        # Bounded so the playing phrase, which BufferBudget never holds back,
+        # still stops reading from the provider when audio_queue is full.
+        self.chunks = WatermarkQueue("tts_phrase", max(1, max_bytes), sizeof=len)
+        self.task: Optional[asyncio.Task] = None
+        # Budget held by this phrase's chunks that have not been forwarded yet.
+        self.reserved = 0
+
+
+async def pipeline_tts(phrase_queue: WatermarkQueue, audio_queue: WatermarkQueue, stop_event: asyncio.Event,
+                       synthesize: Callable[[str, asyncio.Event], AsyncIterator[bytes]],
+                       lookahead: int, max_buffered_bytes: int,
+                       fillers: Optional[CannedAudio] = None, filler_after: Optional[float] = None,
+                       shaper: Optional[PhraseShaper] = None, trace: Optional[TurnTrace] = None) -> None:
+    """
+    Synthesize up to `lookahead` phrases concurrently and forward their audio
+    to `audio_queue` strictly in phrase order. The first phrase streams as it
+    arrives; later phrases buffer (up to `max_buffered_bytes`) until it is
+    their turn. Setting `stop_event` cancels all in-flight synthesis.
+    When `audio_queue` is full, forwarding pauses and synthesis stops
+    reading provider audio until it drains.
+
+    With `fillers`, one canned clip per turn is played when no audio has
+    gone out `filler_after` seconds into the turn, or where a FillerCue
+    appears on the phrase queue (e.g. when a tool call starts).
+
+    With `shaper`, each phrase's PCM is trimmed, gapped and level-matched
+    on its way out. With `trace`, the first TTS request and byte are marked.
+    """
+    slots = asyncio.Semaphore(max(1, lookahead))
+    budget = BufferBudget(max_buffered_bytes)
+    jobs: asyncio.Queue = asyncio.Queue()
+    started: List[PhraseJob] = []
+    in_flight = METRICS.gauge("tts_phrases_in_flight", "Phrase syntheses running concurrently")
+
+    async def run_job(job: PhraseJob) -> None:
+        in_flight.inc()
+        if trace is not None:
+            trace.mark("first_tts_request")
+        chunks = synthesize(job.phrase, stop_event)
+        try:
+            async for chunk in chunks:
+                if chunk:
+                    if trace is not None:
+                        trace.mark("first_tts_byte")
+                    await budget.reserve(job, len(chunk))
+                    job.reserved += len(chunk)
+                    await job.chunks.put(chunk)
+        except Exception as e:
+            job.chunks.force_put(e)
+        finally:
+            await chunks.aclose()
+            in_flight.dec()
+            job.chunks.force_put(PhraseJob.DONE)
+            slots.release()
+
+    async def schedule() -> None:
+        while True:
+            phrase = await phrase_queue.get()
+            if phrase is None:
+                break
+            if isinstance(phrase, FillerCue):
+                jobs.put_nowait(PhraseJob("", cue=phrase))
+                continue
+            if not phrase.strip():
+                continue
+            await slots.acquire()
+            job = PhraseJob(phrase, max_bytes=max_buffered_bytes)
+            job.task = asyncio.create_task(run_job(job))
+            started.append(job)
+            jobs.put_nowait(job)
+        jobs.put_nowait(None)
+
+    loop = asyncio.get_running_loop()
+    filler_deadline = loop.time() + filler_after if fillers is not None and filler_after else None
+    filler_played = fillers is None
+    # Fillers can cut in mid-phrase; a shaper of their own keeps the head
+    # phrase's trim/fade state intact while sharing its loudness tracker.
+    filler_shaper = copy.copy(shaper) if shaper is not None and fillers is not None else None
+
+    async def play_filler(category: str, fallback: Optional[str] = None) -> None:
+        nonlocal filler_played
+        filler_played = True
+        clip = fillers.pick(category, fallback)
+        if clip and filler_shaper is not None:
+            clip = filler_shaper.shape(clip)
+        if clip:
+            await audio_queue.put(clip)
+
+    async def next_item(queue):
+        # Until the first audio goes out, waiting past the deadline plays a filler.
+        if filler_played or filler_deadline is None:
+            return await queue.get()
+        try:
+            return await asyncio.wait_for(queue.get(), max(0.0, filler_deadline - loop.time()))
+        except asyncio.TimeoutError:
+            await play_filler("acknowledge")
+            return await queue.get()
+
+    async def forward() -> None:
+        nonlocal filler_deadline
+        while True:
+            job = await next_item(jobs)
+            if job is None:
+                return
+            if job.cue is not None:
+                if not filler_played or job.cue.category == "error":
+                    await play_filler(job.cue.category, "tool")
+                continue
+            await budget.set_head(job)
+            while True:
+                item = await next_item(job.chunks)
+                if isinstance(item, Exception):
+                    # One failed phrase is skipped; the phrases behind it still play.
+                    logger.error(f"TTS failed for phrase {job.phrase!r}: {item}")
+                    METRICS.counter("tts_phrase_failures_total", "Phrases skipped after a synthesis error").inc()
+                    await budget.release(job.reserved)
+                    job.reserved = 0
+                    item = PhraseJob.DONE
+                if item is PhraseJob.DONE:
+                    if shaper is not None:
+                        tail = shaper.end_phrase()
+                        if tail:
+                            await audio_queue.put(tail)
+                    break
+                job.reserved -= len(item)
+                await budget.release(len(item))
+                audio = shaper.process(item) if shaper is not None else item
+                if audio:
+                    await audio_queue.put(audio)
+                    filler_deadline = None
+
+    scheduler = asyncio.create_task(schedule())
+    forwarder = asyncio.create_task(forward())
+    stopper = asyncio.create_task(stop_event.wait())
+    try:
+        done, _ = await asyncio.wait({forwarder, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        if forwarder in done:
+            forwarder.result()
+    finally:
+        pending = [scheduler, forwarder, stopper] + [job.task for job in started if job.task]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for job in started:
+            job.chunks.close()
+
+
+def build_phrase_synthesizer() -> Optional[Callable[[str, asyncio.Event], AsyncIterator[bytes]]]:
+    """Per-phrase synthesis for the configured provider, behind the phrase cache."""
+    provider = CONFIG["TTS_MODELS"]["PROVIDER"].lower()
+    if provider == "azure":
+        from backend.tts.azuretts import azure_phrase_synthesizer
+        synthesize = azure_phrase_synthesizer()
+        settings = CONFIG["TTS_MODELS"]["AZURE_TTS"]
+        voice_params = (settings["TTS_VOICE"], settings["PROSODY"], settings["AUDIO_FORMAT"])
+    elif provider == "openai":
+        from backend.tts.openaitts import openai_phrase_synthesizer
+        synthesize = openai_phrase_synthesizer()
+        settings = CONFIG["TTS_MODELS"]["OPENAI_TTS"]
+        voice_params = (settings["TTS_VOICE"], {"model": settings["TTS_MODEL"], "speed": settings["TTS_SPEED"]},
+                        settings["AUDIO_RESPONSE_FORMAT"])
+    else:
+        logger.error(f"Unknown TTS provider: {provider}")
+        return None
+
+    if CONFIG["TTS_CACHE"]["ENABLED"]:
+        synthesize = PHRASE_CACHE.wrap(synthesize, provider, *voice_params)
+    return synthesize
+
+
+async def process_streams(phrase_queue: WatermarkQueue, audio_queue: WatermarkQueue, stop_event: asyncio.Event,
+                          synthesize: Optional[Callable[[str, asyncio.Event], AsyncIterator[bytes]]] = None,
+                          trace: Optional[TurnTrace] = None):
     """
     Orchestrates TTS tasks, with an external stop_event.
     Ensures that a termination signal is sent to the audio_queue.
+    `synthesize` defaults to the configured provider behind the phrase cache.
     """
     logger.debug(f"TTS enabled: {CONFIG['GENERAL_AUDIO']['TTS_ENABLED']}")
     logger.debug(f"TTS provider: {CONFIG['TTS_MODELS']['PROVIDER']}")
@@ -26,31 +247,36 @@ async def process_streams(phrase_queue: asyncio.Queue, audio_queue: asyncio.Queu
             phrase = await phrase_queue.get()
             if phrase is None:
                 break
-        await audio_queue.put(None)
+        audio_queue.force_put(None)
         return
 
     try:
-        provider = CONFIG["TTS_MODELS"]["PROVIDER"].lower()
-        if provider == "azure":
-            from backend.tts.azuretts import azure_text_to_speech_processor
-            tts_task = azure_text_to_speech_processor(phrase_queue, audio_queue, stop_event)
-        elif provider == "openai":
-            from backend.tts.openaitts import openai_text_to_speech_processor
-            tts_task = openai_text_to_speech_processor(phrase_queue, audio_queue, stop_event)
-        else:
-            logger.error(f"Unknown TTS provider: {provider}")
+        synthesize = synthesize or build_phrase_synthesizer()
+        if synthesize is None:
             return
 
         # Process TTS and send audio to frontend
         logger.debug("Processing TTS for frontend playback")
-        await tts_task
+        settings = CONFIG["TTS_PIPELINE"]
+        filler_settings = CONFIG["FILLERS"]
+        provider = CONFIG["TTS_MODELS"]["PROVIDER"].lower()
+        sample_rate = pcm_sample_rate(provider)
+        shaper = None
+        if CONFIG["PCM_PROCESSING"]["ENABLED"] and sample_rate:
+            shaper = PhraseShaper.from_config(sample_rate, provider)
+        await pipeline_tts(phrase_queue, audio_queue, stop_event, synthesize,
+                           settings["LOOKAHEAD"], settings["MAX_BUFFERED_BYTES"],
+                           fillers=CANNED_AUDIO if filler_settings["ENABLED"] else None,
+                           filler_after=filler_settings["TTFA_THRESHOLD_MS"] / 1000.0,
+                           shaper=shaper, trace=trace)
 
     except Exception as e:
         logger.error(f"Error in process_streams: {e}")
     finally:
-        # Signal termination
+        # Signal termination; phrases still arriving after a stop are discarded.
         logger.debug("Signaling audio queue termination")
-        await audio_queue.put(None)
+        phrase_queue.close()
+        audio_queue.force_put(None)
 
 from backend.tts.azuretts import AzureTTS
 from backend.tts.openaitts import OpenAITTS
@@ -0,0 +1,157 @@
+import math
+import logging
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Wire sample formats: numpy dtype and full-scale value.
+SAMPLE_FORMATS = {
+    "int16": (np.dtype("<i2"), 32768.0),
+    "int32": (np.dtype("<i4"), 2147483648.0),
+    "float32": (np.dtype("<f4"), 1.0),
+    "uint8": (np.dtype("u1"), 128.0),
+}
+
+
+class AudioFormat:
+    """Sample rate, channel count and sample format of a PCM stream."""
+    def __init__(self, sample_rate: int, channels: int = 1, sample_format: str = "int16"):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Unsupported sample format: {sample_format}")
+        if not 1 <= int(channels) <= 8 or not 4000 <= int(sample_rate) <= 192000:
+            raise ValueError(f"Unsupported audio format: {sample_rate} Hz, {channels} channels")
+        self.sample_rate = int(sample_rate)
+        self.channels = int(channels)
+        self.sample_format = sample_format
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AudioFormat":
+        return cls(data["sample_rate"], data.get("channels", 1), data.get("sample_format", "int16"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"sample_rate": self.sample_rate, "channels": self.channels, "sample_format": self.sample_format}
+
+    @property
+    def frame_bytes(self) -> int:
+        return self.channels * SAMPLE_FORMATS[self.sample_format][0].itemsize
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AudioFormat) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"AudioFormat({self.sample_rate}, channels={self.channels}, {self.sample_format!r})"
+
+
+class StreamingResampler:
+    """
+    Polyphase windowed-sinc resampler for a mono float stream.
+
+    The rate ratio is reduced to up/down integers. Each output sample uses
+    one `taps`-long phase of the filter, and a chunk's outputs are computed
+    together as one gather plus a row-wise dot product. The last `taps - 1`
+    input samples are carried to the next chunk, so chunk boundaries are
+    seamless.
+    """
+    def __init__(self, in_rate: int, out_rate: int, taps: int = 24, cutoff: float = 0.95):
+        g = math.gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        self.taps = taps
+        # Low-pass at the lower of the two Nyquist rates, designed at the upsampled rate.
+        length = taps * self.up
+        n = np.arange(length) - (length - 1) / 2.0
+        fc = cutoff / max(self.up, self.down)
+        prototype = fc * np.sinc(fc * n) * np.kaiser(length, 8.0)
+        prototype *= self.up / prototype.sum()
+        # phases[p, j] = h[p + j * up]; tap j multiplies x[base - j].
+        self.phases = prototype.reshape(taps, self.up).T.astype(np.float32)
+        self._history = np.zeros(taps - 1, dtype=np.float32)
+        self._position = 0  # next output on the upsampled grid, relative to the first new sample
+
+    def reset(self) -> None:
+        self._history = np.zeros(self.taps - 1, dtype=np.float32)
+        self._position = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        x = np.concatenate((self._history, samples.astype(np.float32, copy=False)))
+        keep = self.taps - 1
+        # Output k sits at t = start + k*down on the upsampled grid (relative to x[0])
+        # and needs the `taps` input samples ending at x[t // up].
+        start = self._position + keep * self.up
+        count = max(0, -(-(x.size * self.up - start) // self.down))
+        out = np.zeros(0, dtype=np.float32)
+        if count:
+            t = start + np.arange(count) * self.down
+            base, phase = t // self.up, t % self.up
+            window = base[:, None] - np.arange(self.taps)[None, :]
+            out = np.einsum("ij,ij->i", x[window], self.phases[phase])
+        # Keep the last `keep` samples and re-base the position onto them.
+        consumed = x.size - keep
+        self._position = start + count * self.down - keep * self.up - consumed * self.up
+        self._history = x[consumed:]
+        return out
+
+
+class AudioConverter:
+    """
+    Converts a TTS stream to a client's declared sink format: sample rate
+    (via StreamingResampler), channel count (down-mix or duplicate) and
+    sample format. When the formats already match, chunks pass through
+    untouched.
+    """
+    def __init__(self, source: AudioFormat, target: AudioFormat):
+        self.source = source
+        self.target = target
+        self.passthrough = source == target
+        self._remainder = b""
+        self._resamplers = None
+        if source.sample_rate != target.sample_rate:
+            self._resamplers = [StreamingResampler(source.sample_rate, target.sample_rate)
+                                for _ in range(min(source.channels, target.channels))]
+
+    def convert(self, data: bytes) -> bytes:
+        if self.passthrough or not data:
+            return data
+        data = self._remainder + data
+        usable = len(data) - len(data) % self.source.frame_bytes
+        self._remainder = data[usable:]
+        dtype, scale = SAMPLE_FORMATS[self.source.sample_format]
+        samples = np.frombuffer(data[:usable], dtype=dtype).astype(np.float32)
+        if self.source.sample_format == "uint8":
+            samples -= 128.0
+        samples = (samples / scale).reshape(-1, self.source.channels)
+
+        if self.target.channels < self.source.channels:
+            samples = samples.mean(axis=1, keepdims=True) if self.target.channels == 1 \
+                else samples[:, :self.target.channels]
+
+        if self._resamplers is not None:
+            columns = [r.process(samples[:, i]) for i, r in enumerate(self._resamplers)]
+            samples = np.stack(columns, axis=1)
+
+        if self.target.channels > samples.shape[1]:
+            samples = np.repeat(samples, self.target.channels, axis=1) if samples.shape[1] == 1 \
+                else np.pad(samples, ((0, 0), (0, self.target.channels - samples.shape[1])))
+
+        dtype, scale = SAMPLE_FORMATS[self.target.sample_format]
+        if self.target.sample_format == "float32":
+            return np.clip(samples, -1.0, 1.0).astype(dtype).tobytes()
+        scaled = np.clip(samples * scale, -scale, scale - 1)
+        if self.target.sample_format == "uint8":
+            scaled += 128.0
+        return np.round(scaled).astype(dtype).tobytes()
+
+    def reset(self) -> None:
+        self._remainder = b""
+        for resampler in self._resamplers or ():
+            resampler.reset()
+
+
+def make_converter(source_rate: Optional[int], target: Optional[AudioFormat]) -> Optional[AudioConverter]:
+    """Converter from mono int16 TTS output at `source_rate` to `target`, if one is needed."""
+    if source_rate is None or target is None:
+        return None
+    converter = AudioConverter(AudioFormat(source_rate), target)
+    return None if converter.passthrough else converter
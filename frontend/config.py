@@ -4,6 +4,17 @@ SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8000
 WEBSOCKET_PATH = "/ws/chat"
 HTTP_BASE_URL = f"http://{SERVER_HOST}:{SERVER_PORT}"
+# Preferred audio sink format; the server converts TTS audio to whatever format the sink ends up using.
+AUDIO_SAMPLE_RATE = 24000
+AUDIO_CHANNELS = 1
+AUDIO_SAMPLE_FORMAT = "int16"
+# Audio codecs to offer the server, in order of preference; empty means raw PCM.
+# ["mulaw"] halves TTS bandwidth, which helps on congested Wi-Fi.
+AUDIO_CODECS = []
+# Playback buffer bounds: above HIGH the client stops reading from the server
+# until playback drains it to LOW, so a stalled sink backs up to the server.
+AUDIO_BUFFER_HIGH_MS = 20000
+AUDIO_BUFFER_LOW_MS = 5000
 def setup_logger(name=__name__, level=logging.INFO):
     logger = logging.getLogger(name)
     logger.setLevel(level)
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+import numpy as np
+
+
+def _build_mulaw_decode_table():
+    b = (~np.arange(256, dtype=np.int32)) & 0xFF
+    exponent = (b >> 4) & 0x07
+    mantissa = b & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(b & 0x80, -magnitude, magnitude).astype("<i2")
+
+
+MULAW_DECODE = _build_mulaw_decode_table()
+
+
+def mulaw_decode(data):
+    """8-bit G.711 µ-law to 16-bit little-endian PCM"""
+    return MULAW_DECODE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+# Codec name -> decoder; raw PCM needs none.
+DECODERS = {
+    "pcm": None,
+    "mulaw": mulaw_decode,
+}
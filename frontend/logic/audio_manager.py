@@ -5,7 +5,15 @@ import logging
 from PySide6.QtCore import QMutex, QMutexLocker, QIODevice
 from PySide6.QtMultimedia import QAudioFormat, QAudioSink, QMediaDevices, QAudio
 
-from frontend.config import logger
+from frontend.config import (AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_SAMPLE_FORMAT,
+                             AUDIO_BUFFER_HIGH_MS, AUDIO_BUFFER_LOW_MS, logger)
+
+SAMPLE_FORMATS = {
+    "uint8": QAudioFormat.SampleFormat.UInt8,
+    "int16": QAudioFormat.SampleFormat.Int16,
+    "int32": QAudioFormat.SampleFormat.Int32,
+    "float32": QAudioFormat.SampleFormat.Float,
+}
 
 class QueueAudioDevice(QIODevice):
     """
@@ -52,6 +60,10 @@ class QueueAudioDevice(QIODevice):
         with QMutexLocker(self.mutex):
             return len(self.audio_buffer) + super().bytesAvailable()
 
+    def buffered_bytes(self):
+        with QMutexLocker(self.mutex):
+            return len(self.audio_buffer)
+
     def isSequential(self):
         return True
 
@@ -78,9 +90,13 @@ class AudioManager:
     """
     def __init__(self):
         self._audio_queue = asyncio.Queue()
+        self._queued_bytes = 0
         self._running = True
         self.tts_audio_playing = False
         self.setup_audio()
+        bytes_per_ms = self.audio_format.bytesPerFrame() * self.audio_format.sampleRate() / 1000
+        self._high_bytes = int(AUDIO_BUFFER_HIGH_MS * bytes_per_ms)
+        self._low_bytes = int(AUDIO_BUFFER_LOW_MS * bytes_per_ms)
 
     def setup_audio(self):
         """Set up audio devices and sink"""
@@ -88,21 +104,39 @@ class AudioManager:
         self.audioDevice.open(QIODevice.ReadOnly)
         
         audio_format = QAudioFormat()
-        audio_format.setSampleRate(24000)
-        audio_format.setChannelCount(1)
-        audio_format.setSampleFormat(QAudioFormat.SampleFormat.Int16)
+        audio_format.setSampleRate(AUDIO_SAMPLE_RATE)
+        audio_format.setChannelCount(AUDIO_CHANNELS)
+        audio_format.setSampleFormat(SAMPLE_FORMATS[AUDIO_SAMPLE_FORMAT])
 
         device = QMediaDevices.defaultAudioOutput()
         if device is None:
             logger.error("[AudioManager] No audio output device found!")
         else:
             logger.info("[AudioManager] Default audio output device found.")
+            if not device.isFormatSupported(audio_format):
+                # Play whatever the device prefers; the server converts to it.
+                preferred = device.preferredFormat()
+                if preferred.sampleFormat() in SAMPLE_FORMATS.values():
+                    audio_format = preferred
+                logger.info(f"[AudioManager] Preferred format not supported, using "
+                            f"{audio_format.sampleRate()} Hz, {audio_format.channelCount()} channel(s)")
+        self.audio_format = audio_format
 
         self.audioSink = QAudioSink(device, audio_format)
         self.audioSink.setVolume(1.0)
         self.audioSink.start(self.audioDevice)
         logger.info("[AudioManager] Audio sink started with audio device")
 
+    def sink_format(self):
+        """The PCM format the sink plays, as declared to the server at connect"""
+        sample_format = next(name for name, value in SAMPLE_FORMATS.items()
+                             if value == self.audio_format.sampleFormat())
+        return {
+            "sample_rate": self.audio_format.sampleRate(),
+            "channels": self.audio_format.channelCount(),
+            "sample_format": sample_format,
+        }
+
     def handle_audio_state_changed(self, state):
         """Handle audio state changes"""
         logger.info(f"[AudioManager] Audio state changed to: {state}")
@@ -121,6 +155,8 @@ class AudioManager:
         while self._running:
             try:
                 pcm_chunk = await self._audio_queue.get()
+                if pcm_chunk is not None:
+                    self._queued_bytes -= len(pcm_chunk)
                 if pcm_chunk is None:
                     logger.info("[AudioManager] Received end-of-stream marker.")
                     await asyncio.to_thread(self.audioDevice.mark_end_of_stream)
@@ -158,19 +194,38 @@ class AudioManager:
 
     async def process_audio_data(self, audio_data):
         """Process incoming audio data"""
-        if audio_data == b'' or len(audio_data) == 0:
+        if len(audio_data) == 0:
             logger.info("[AudioManager] Received empty audio message, marking end-of-stream")
             await self._audio_queue.put(None)
             self.tts_audio_playing = False
             return False  # Return False to indicate end of stream
         else:
             # Process audio data
+            self._queued_bytes += len(audio_data)
             await self._audio_queue.put(audio_data)
             # If first chunk, indicate TTS has started
             if not self.tts_audio_playing:
                 self.tts_audio_playing = True
             return True  # Return True to indicate active audio
 
+    def buffered_bytes(self):
+        """Audio waiting to play: queued chunks plus the device buffer"""
+        return self._queued_bytes + self.audioDevice.buffered_bytes()
+
+    async def wait_for_room(self):
+        """
+        Flow control for the WebSocket reader: once HIGH is buffered, wait
+        until playback has drained it to LOW before reading more.
+        """
+        if self.buffered_bytes() < self._high_bytes:
+            return
+        start = asyncio.get_running_loop().time()
+        logger.info(f"[AudioManager] Playback buffer full ({self.buffered_bytes()} bytes), pausing reads")
+        while self._running and self.buffered_bytes() > self._low_bytes:
+            await asyncio.sleep(0.05)
+        logger.info(f"[AudioManager] Resuming reads after "
+                    f"{asyncio.get_running_loop().time() - start:.2f}s")
+
     async def resume_after_audio(self):
         """
         Wait for audio to finish playing
@@ -205,6 +260,7 @@ class AudioManager:
                 self._audio_queue.get_nowait()
             except asyncio.QueueEmpty:
                 break
+        self._queued_bytes = 0
         self._audio_queue.put_nowait(None)
         logger.info("[AudioManager] End-of-stream marker placed in audio queue; audio resources cleaned up")
 
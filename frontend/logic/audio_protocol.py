@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import struct
+
+# Mirrors backend/tts/framing.py.
+LEGACY_PREFIX = b"audio:"
+FRAME_MAGIC = b"AF"
+FRAME_VERSION = 2
+FRAME_HEADER = struct.Struct("<2sBBIIIBBH")
+FLAG_END_OF_STREAM = 0x01
+CODEC_NAMES = {0: "pcm", 1: "mulaw"}
+
+
+class AudioFrame:
+    """A parsed audio message; `payload` is a memoryview into the received buffer"""
+    __slots__ = ("turn_id", "seq", "flags", "sample_rate", "codec", "channels", "payload")
+
+    def __init__(self, turn_id, seq, flags, sample_rate, codec, channels, payload):
+        self.turn_id = turn_id
+        self.seq = seq
+        self.flags = flags
+        self.sample_rate = sample_rate
+        self.codec = codec
+        self.channels = channels
+        self.payload = payload
+
+    @property
+    def end_of_stream(self):
+        return bool(self.flags & FLAG_END_OF_STREAM)
+
+
+def parse_audio_message(raw_msg):
+    """
+    Parse a binary message without copying the audio.
+    Returns an AudioFrame for v2 frames, the payload view for legacy
+    "audio:" frames, or None for anything else.
+    """
+    view = memoryview(raw_msg)
+    if len(view) >= FRAME_HEADER.size and view[:2] == FRAME_MAGIC:
+        _, version, flags, turn_id, seq, sample_rate, codec_id, channels, _ = FRAME_HEADER.unpack_from(view)
+        if version == FRAME_VERSION:
+            return AudioFrame(turn_id, seq, flags, sample_rate, CODEC_NAMES.get(codec_id), channels,
+                              view[FRAME_HEADER.size:])
+    if view[:len(LEGACY_PREFIX)] == LEGACY_PREFIX:
+        return view[len(LEGACY_PREFIX):]
+    return None
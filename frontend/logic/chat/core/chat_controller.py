@@ -38,6 +38,8 @@ class ChatController(QObject):
         super().__init__(parent)
         self._running = True
         self._connected = False
+        # Last conversation version acknowledged by the server, keyed by conversation id
+        self._conversation_versions = {}
         
         # Get the event loop but don't start tasks immediately
         self._loop = asyncio.get_event_loop()
@@ -54,6 +56,8 @@ class ChatController(QObject):
         self.message_handler = MessageHandler()
         self.chat_history_manager = get_chat_history_manager()
         self.websocket_client = WebSocketClient()
+        self.websocket_client.set_audio_format(self.audio_manager.sink_format())
+        self.websocket_client.set_flow_control(self.audio_manager.wait_for_room)
         self.tts_controller = TTSController(parent)
         self.service_manager = ServiceManager()
         
@@ -89,6 +93,10 @@ class ChatController(QObject):
         self.websocket_client.connectionStatusChanged.connect(self._handle_connection_change)
         self.websocket_client.messageReceived.connect(self._handle_websocket_message)
         self.websocket_client.audioReceived.connect(self._handle_audio_data_signal)
+        self.websocket_client.sessionIdChanged.connect(self.service_manager.set_session_id)
+        self.websocket_client.sessionIdChanged.connect(self.tts_controller.set_session_id)
+        self.websocket_client.ttsStateReceived.connect(self.tts_controller.set_tts_state)
+        self.tts_controller.set_control_channel(self.websocket_client)
         
         # Speech manager signals
         self.speech_manager.sttTextReceived.connect(self.sttTextReceived)
@@ -119,6 +127,9 @@ class ChatController(QObject):
     def _handle_connection_change(self, connected):
         """Handle WebSocket connection status changes"""
         self._connected = connected
+        if not connected:
+            # A reconnect may land on a restarted server, so resync on the next send
+            self._conversation_versions.clear()
         self.connectionStatusChanged.emit(connected)
 
     def _handle_websocket_message(self, data):
@@ -139,6 +150,31 @@ class ChatController(QObject):
             is_listening = data.get("is_listening", False)
             logger.debug(f"[ChatController] Updating STT state: listening = {is_listening}")
             self.sttStateChanged.emit(is_listening)
+        elif msg_type == "conversation":
+            conversation_id = data.get("conversation_id")
+            if conversation_id and data.get("version") is None:
+                # The server dropped its copy (stopped or failed turn); resync on the next send
+                self._conversation_versions.pop(conversation_id, None)
+                logger.debug(f"[ChatController] Server dropped conversation {conversation_id}")
+            elif conversation_id:
+                self._conversation_versions[conversation_id] = data.get("version", 0)
+                logger.debug(f"[ChatController] Server conversation {conversation_id} at version {data.get('version')}")
+        elif msg_type == "error":
+            logger.error(f"[ChatController] Server error for this turn: {data.get('message')}")
+            self.message_handler.mark_response_as_interrupted()
+            self.message_handler.reset_current_response()
+        elif msg_type == "resync":
+            conversation_id = data.get("conversation_id")
+            logger.info(f"[ChatController] Server requested resync of conversation {conversation_id}")
+            self._conversation_versions.pop(conversation_id, None)
+            if conversation_id == self.chat_history_manager.get_current_conversation_id():
+                payload = {
+                    "action": "chat",
+                    "conversation_id": conversation_id,
+                    "resync": True,
+                    "messages": self.chat_history_manager.get_messages()
+                }
+                self.task_manager.schedule_coroutine(self.websocket_client.send_message(payload))
         else:
             # Process the message through the message handler for streaming
             result = self.message_handler.process_message(data)
@@ -222,11 +258,24 @@ class ChatController(QObject):
             # Clear the interrupted state now that we're continuing
             self.message_handler.clear_interrupted_response()
         
-        # Prepare payload
-        payload = {
-            "action": "chat",
-            "messages": self.chat_history_manager.get_messages()
-        }
+        # Prepare payload. Once the server holds a copy of this conversation only the
+        # new message is uploaded; otherwise the full history is sent as a resync.
+        conversation_id = self.chat_history_manager.get_current_conversation_id()
+        server_version = self._conversation_versions.get(conversation_id)
+        if server_version is not None:
+            payload = {
+                "action": "chat",
+                "conversation_id": conversation_id,
+                "base_version": server_version,
+                "messages": [{"sender": "user", "text": text}]
+            }
+        else:
+            payload = {
+                "action": "chat",
+                "conversation_id": conversation_id,
+                "resync": True,
+                "messages": self.chat_history_manager.get_messages()
+            }
         
         # If we're continuing from an interrupted response, tell the server
         if has_interrupted:
@@ -262,15 +311,17 @@ class ChatController(QObject):
         current_tts_state = self.tts_controller.get_tts_enabled()
         logger.info(f"[ChatController] Current TTS state before stopping: {current_tts_state}")
         
-        # Stop server-side operations
-        await self.service_manager.stop_all_services()
+        # Stop server-side operations: one in-band frame, or the HTTP endpoints when disconnected
+        if not await self.websocket_client.send_control("stop"):
+            await self.service_manager.stop_all_services()
         
         # Restore TTS state if needed
         if current_tts_state:
             logger.info("[ChatController] Restoring TTS state to enabled")
             await self.tts_controller.restore_tts_state(current_tts_state)
 
-        # Stop client-side audio playback
+        # Stop client-side audio playback; frames still in flight for this turn are dropped
+        self.websocket_client.drop_current_audio()
         await self.audio_manager.stop_playback()
         logger.info("[ChatController] Audio resources cleaned up")
 
@@ -279,6 +330,8 @@ class ChatController(QObject):
         """Clear the chat history"""
         logger.info("[ChatController] Clearing chat history.")
         self.chat_history_manager.clear_history()
+        # The server's copy still holds the old messages
+        self._conversation_versions.pop(self.chat_history_manager.get_current_conversation_id(), None)
         
     @Slot()
     def newConversation(self):
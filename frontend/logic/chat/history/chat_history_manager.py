@@ -187,6 +187,10 @@ class ChatHistoryManager(QObject):
         logger.info(f"[ChatHistoryManager] Added message from {sender}, length: {len(text)}")
         self.historyChanged.emit()
     
+    def get_current_conversation_id(self) -> Optional[str]:
+        """Get the ID of the current conversation"""
+        return self._current_conversation_id
+
     def get_messages(self) -> List[Dict[str, Any]]:
         """Get all messages in the current conversation"""
         conversation = self._get_current_conversation()
@@ -12,13 +12,25 @@ class ServiceManager:
     """
     def __init__(self):
         self._loop = asyncio.get_event_loop()
+        self._session_id = None
         logger.info("[ServiceManager] Initialized")
+
+    def set_session_id(self, session_id):
+        """Scope stop requests to this client's WebSocket session"""
+        self._session_id = session_id or None
+        logger.info(f"[ServiceManager] Using session id: {self._session_id}")
+
+    def _endpoint(self, name):
+        """Build a stop endpoint URL, scoped to our session when one is known"""
+        if self._session_id:
+            return f"{HTTP_BASE_URL}/api/sessions/{self._session_id}/{name}"
+        return f"{HTTP_BASE_URL}/api/{name}"
         
     async def stop_generation(self):
         """Stop ongoing message generation on the server"""
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.post(f"{HTTP_BASE_URL}/api/stop-generation") as resp:
+                async with session.post(self._endpoint("stop-generation")) as resp:
                     resp_data = await resp.json()
                     logger.info(f"[ServiceManager] Stop generation response: {resp_data}")
             return True
@@ -37,13 +49,13 @@ class ServiceManager:
             # Create a client session for both requests
             async with aiohttp.ClientSession() as session:
                 # Stop audio first
-                async with session.post(f"{HTTP_BASE_URL}/api/stop-audio") as resp1:
+                async with session.post(self._endpoint("stop-audio")) as resp1:
                     resp1_data = await resp1.json()
                     results["audio_stopped"] = resp1_data.get("success", False)
                     logger.info(f"[ServiceManager] Stop audio response: {resp1_data}")
 
                 # Then stop generation
-                async with session.post(f"{HTTP_BASE_URL}/api/stop-generation") as resp2:
+                async with session.post(self._endpoint("stop-generation")) as resp2:
                     resp2_data = await resp2.json()
                     results["generation_stopped"] = resp2_data.get("success", False)
                     logger.info(f"[ServiceManager] Stop generation response: {resp2_data}")
@@ -3,7 +3,7 @@ import asyncio
 import aiohttp
 import logging
 
-from PySide6.QtCore import QObject, Signal, QTimer
+from PySide6.QtCore import QObject, Signal
 
 from frontend.config import HTTP_BASE_URL, logger
 
@@ -18,36 +18,25 @@ class TTSController(QObject):
         super().__init__(parent)
         self._ttsEnabled = False
         self.is_toggling_tts = False
-        self._loop = asyncio.get_event_loop()
-        
-        # Query TTS state at startup
-        tts_timer = QTimer(self)
-        tts_timer.setSingleShot(True)
-        tts_timer.setInterval(1000)  # 1 second delay
-        tts_timer.timeout.connect(lambda: self._loop.create_task(self._queryTTSState()))
-        tts_timer.start()
-        
+        self._session_id = None
+        # WebSocketClient for in-band control; the initial state arrives from its get-state on connect.
+        self._control = None
         logger.info("[TTSController] Initialized")
 
-    async def _queryTTSState(self):
-        """Query the current TTS state from the server"""
-        logger.info("[TTSController] Querying initial TTS state from server")
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{HTTP_BASE_URL}/api/tts-state") as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        self._ttsEnabled = data.get("tts_enabled", False)
-                        logger.info(f"[TTSController] Initial TTS state from server: {self._ttsEnabled}")
-                        self.ttsStateChanged.emit(self._ttsEnabled)
-                    else:
-                        logger.warning(f"[TTSController] Failed to get TTS state: {resp.status}")
-                        self._ttsEnabled = False
-                        self.ttsStateChanged.emit(self._ttsEnabled)
-        except Exception as e:
-            logger.error(f"[TTSController] Error querying TTS state: {e}")
-            self._ttsEnabled = False
-            self.ttsStateChanged.emit(self._ttsEnabled)
+    def set_session_id(self, session_id):
+        """Scope stop requests to this client's WebSocket session"""
+        self._session_id = session_id or None
+
+    def set_control_channel(self, websocket_client):
+        """Send toggle/stop requests over the chat WebSocket instead of HTTP when connected"""
+        self._control = websocket_client
+
+    def set_tts_state(self, enabled):
+        """Apply the TTS state reported by the server"""
+        if enabled != self._ttsEnabled:
+            logger.info(f"[TTSController] TTS state from server: {enabled}")
+        self._ttsEnabled = enabled
+        self.ttsStateChanged.emit(self._ttsEnabled)
 
     async def toggleTTS(self):
         """
@@ -58,6 +47,9 @@ class TTSController(QObject):
             
         self.is_toggling_tts = True
         try:
+            # The new state comes back as a "state" message (see set_tts_state).
+            if self._control is not None and await self._control.send_control("toggle-tts"):
+                return
             async with aiohttp.ClientSession() as session:
                 async with session.post(f"{HTTP_BASE_URL}/api/toggle-tts") as resp:
                     data = await resp.json()
@@ -72,8 +64,14 @@ class TTSController(QObject):
     async def stop_tts(self):
         """Stop TTS playback on the server"""
         try:
+            if self._control is not None and await self._control.send_control("stop-audio"):
+                return True
+            if self._session_id:
+                url = f"{HTTP_BASE_URL}/api/sessions/{self._session_id}/stop-audio"
+            else:
+                url = f"{HTTP_BASE_URL}/api/stop-audio"
             async with aiohttp.ClientSession() as session:
-                async with session.post(f"{HTTP_BASE_URL}/api/stop-audio") as resp:
+                async with session.post(url) as resp:
                     resp_data = await resp.json()
                     logger.info(f"[TTSController] Stop TTS response: {resp_data}")
             return True
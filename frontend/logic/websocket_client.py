@@ -6,7 +6,9 @@ import logging
 
 from PySide6.QtCore import QObject, Signal
 
-from frontend.config import SERVER_HOST, SERVER_PORT, WEBSOCKET_PATH, logger
+from frontend.config import SERVER_HOST, SERVER_PORT, WEBSOCKET_PATH, AUDIO_CODECS, logger
+from frontend.logic.audio_codec import DECODERS
+from frontend.logic.audio_protocol import AudioFrame, FRAME_VERSION, parse_audio_message
 
 class WebSocketClient(QObject):
     """
@@ -15,13 +17,24 @@ class WebSocketClient(QObject):
     # Signals
     connectionStatusChanged = Signal(bool)  # Emitted when WebSocket connects/disconnects
     messageReceived = Signal(dict)          # Emitted when a JSON message is received
-    audioReceived = Signal(bytes)           # Emitted when audio data is received
+    audioReceived = Signal(object)          # Emitted with PCM audio (bytes or memoryview); empty = end of stream
+    sessionIdChanged = Signal(str)          # Emitted when the server assigns a session id
+    ttsStateReceived = Signal(bool)         # Emitted with the server's TTS state after a control message
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self._running = True
         self._connected = False
         self._ws = None
+        self._session_id = None
+        self._audio_format = None
+        self._flow_control = None     # coroutine function awaited after each audio frame
+        self._codec = "pcm"          # codec of legacy frames, as confirmed by the server
+        self._audio_turn = -1        # newest turn id seen in v2 audio frames
+        self._last_seq = -1
+        self._dropped_turn = -1      # audio of turns up to this id is discarded after a stop
+        self._dropping = False       # after a stop, every turn is dropped until the next chat is sent
+        self.stale_frames_dropped = 0
         self._ws_url = f"ws://{SERVER_HOST}:{SERVER_PORT}{WEBSOCKET_PATH}"
         logger.info(f"[WebSocketClient] Initialized with URL: {self._ws_url}")
 
@@ -37,11 +50,26 @@ class WebSocketClient(QObject):
                     self._ws = ws
                     self.connectionStatusChanged.emit(True)
                     logger.info("[WebSocketClient] Connected.")
+                    # Raw PCM until the server confirms a codec for this connection.
+                    self._codec = "pcm"
+                    self._audio_turn, self._last_seq, self._dropped_turn = -1, -1, -1
+                    self._dropping = False
+                    if self._audio_format:
+                        await ws.send(json.dumps({
+                            "action": "hello",
+                            "audio_format": self._audio_format,
+                            "codecs": AUDIO_CODECS,
+                            "audio_protocol": FRAME_VERSION,
+                        }))
+                    await ws.send(json.dumps({"action": "get-state"}))
 
                     while self._running:
                         try:
                             raw_msg = await ws.recv()
                             await self._process_message(raw_msg)
+                            if self._flow_control is not None and isinstance(raw_msg, bytes):
+                                # Not reading lets TCP push back on the server's audio sends.
+                                await self._flow_control()
                         except Exception as e:
                             logger.error(f"[WebSocketClient] Message processing error: {e}")
                             await asyncio.sleep(0.1)
@@ -73,26 +101,75 @@ class WebSocketClient(QObject):
     async def _process_message(self, raw_msg):
         """Process incoming messages from WebSocket"""
         if isinstance(raw_msg, bytes):
-            if raw_msg.startswith(b'audio:'):
-                audio_data = raw_msg[len(b'audio:'):]
-                logger.debug(f"[WebSocketClient] Received audio chunk of size: {len(audio_data)} bytes")
-                # FIXED: Using synchronous emit for the signal
-                # The ChatController will handle scheduling the actual async work
-                self.audioReceived.emit(audio_data)
+            frame = parse_audio_message(raw_msg)
+            if isinstance(frame, AudioFrame):
+                self._handle_audio_frame(frame)
+            elif frame is not None:
+                logger.debug(f"[WebSocketClient] Received legacy audio chunk of size: {len(frame)} bytes")
+                self._emit_audio(frame, self._codec)
             else:
                 logger.warning("[WebSocketClient] Unknown binary message format")
-                # Emit as audio anyway with proper prefix
-                audio_data = raw_msg
-                self.audioReceived.emit(audio_data)
+                # Emit as audio anyway
+                self.audioReceived.emit(raw_msg)
         else:
             try:
                 data = json.loads(raw_msg)
                 logger.debug(f"[WebSocketClient] Received message: {data}")
+                if data.get("type") == "session":
+                    self._session_id = data.get("session_id")
+                    logger.info(f"[WebSocketClient] Assigned session id: {self._session_id}")
+                    self.sessionIdChanged.emit(self._session_id or "")
+                    return
+                if data.get("type") == "audio_format":
+                    logger.info(f"[WebSocketClient] Server audio format: {data.get('audio_format')}, "
+                                f"codec: {data.get('codec')}")
+                    self._codec = data.get("codec") or "pcm"
+                    return
+                if data.get("type") == "state":
+                    # Reply to an in-band control message (stop, toggle-tts, get-state).
+                    logger.info(f"[WebSocketClient] Server state after {data.get('action')}: "
+                                f"turn_active={data.get('turn_active')}, tts_enabled={data.get('tts_enabled')}")
+                    if data.get("action") == "stop" and data.get("turn_count") is not None:
+                        # Covers a stopped turn whose audio has not reached us yet.
+                        self._dropped_turn = max(self._dropped_turn, data["turn_count"])
+                    self.ttsStateReceived.emit(bool(data.get("tts_enabled")))
+                    return
                 self.messageReceived.emit(data)
             except json.JSONDecodeError:
                 logger.error("[WebSocketClient] Failed to parse JSON message")
                 logger.error(f"[WebSocketClient] Raw message: {raw_msg}")
 
+    def _emit_audio(self, payload, codec):
+        """Decode (if needed) and hand audio to the controller; an empty payload ends the stream"""
+        decode = DECODERS.get(codec)
+        if decode is not None and len(payload):
+            payload = decode(payload)
+        self.audioReceived.emit(payload)
+
+    def _handle_audio_frame(self, frame):
+        """Drop frames from stopped or superseded turns by header alone"""
+        if self._dropping:
+            self._dropped_turn = max(self._dropped_turn, frame.turn_id)
+        if frame.turn_id < self._audio_turn or frame.turn_id <= self._dropped_turn:
+            self.stale_frames_dropped += 1
+            return
+        if frame.turn_id > self._audio_turn:
+            self._audio_turn, self._last_seq = frame.turn_id, -1
+        if frame.seq <= self._last_seq:
+            self.stale_frames_dropped += 1
+            return
+        self._last_seq = frame.seq
+        if frame.end_of_stream:
+            self.audioReceived.emit(b'')
+            return
+        self._emit_audio(frame.payload, frame.codec)
+
+    def drop_current_audio(self):
+        """Discard audio still arriving for the stopped turn, and any turn before the next chat message"""
+        self._dropped_turn = max(self._dropped_turn, self._audio_turn)
+        self._dropping = True
+        logger.info(f"[WebSocketClient] Dropping remaining audio through turn {self._dropped_turn}")
+
     async def send_message(self, data):
         """
         Send a message over the WebSocket connection.
@@ -105,12 +182,24 @@ class WebSocketClient(QObject):
             return False
             
         try:
+            if data.get("action") == "chat":
+                # Turns the server starts from here on were asked for after the stop.
+                self._dropping = False
             await self._ws.send(json.dumps(data))
             return True
         except Exception as e:
             logger.error(f"[WebSocketClient] Error sending message: {e}")
             return False
 
+    async def send_control(self, action):
+        """
+        Send an in-band control message ("stop", "stop-audio", "toggle-tts", "get-state").
+        Returns False when not connected, so callers can fall back to the HTTP API.
+        """
+        if not self._connected or not self._ws:
+            return False
+        return await self.send_message({"action": action})
+
     async def send_playback_complete(self):
         """Notify the server that playback is complete"""
         if self._connected and self._ws:
@@ -119,6 +208,18 @@ class WebSocketClient(QObject):
             return True
         return False
 
+    def set_audio_format(self, audio_format):
+        """Sink format (sample_rate, channels, sample_format) to declare on every connect"""
+        self._audio_format = audio_format
+
+    def set_flow_control(self, wait):
+        """Coroutine function that pauses reading while the playback buffer is full"""
+        self._flow_control = wait
+
+    def get_session_id(self):
+        """Return the session id assigned by the server for this connection"""
+        return self._session_id
+
     def is_connected(self):
         """Return the current connection status"""
         return self._connected